@@ -1,15 +1,25 @@
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, jsonify, request, send_file, Response, stream_with_context, make_response
 from flask_cors import CORS
 import pymongo
 from config import Config
+import db
+from render_cache import RenderCache
+from downsampling import lttb_indices
+from live_feed import LiveFeed
+from launch_ids import LaunchIdAllocator
+from plot_renderer import PlotRendererPool, RendererBusy, RenderTimeout
+import trajectory_format
+import http_cache
+import export
 import json
 from bson import ObjectId
 from datetime import datetime
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 import io
+import os
 import base64
+import functools
+import threading
 
 class JSONEncoder(json.JSONEncoder):
     def default(self, o):
@@ -18,208 +28,355 @@ class JSONEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, o)
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'ETag'])
 app.json_encoder = JSONEncoder
 
 config = Config()
+render_cache = RenderCache(max_items=config.RENDER_CACHE_SIZE, cache_dir=config.RENDER_CACHE_DIR)
+live_feed = LiveFeed(config)
+plot_renderer = PlotRendererPool(
+    workers=config.PLOT_RENDER_WORKERS,
+    max_queue=config.PLOT_RENDER_MAX_QUEUE,
+    timeout=config.PLOT_RENDER_TIMEOUT
+)
 
 def get_db_connection():
+    """Devuelve la colección de lanzamientos usando el MongoClient compartido del proceso"""
     try:
-        client = pymongo.MongoClient(
-            config.MONGODB_URI,
-            username=config.MONGO_INITDB_ROOT_USERNAME,
-            password=config.MONGO_INITDB_ROOT_PASSWORD,
-            authSource='admin'
-        )
-        db = client[config.MONGODB_DB]
-        return db[config.MONGODB_COLLECTION]
+        return db.get_collection()
     except Exception as e:
         print(f"MongoDB connection error: {e}")
         return None
 
-def generate_3d_plot(launch_data):
-    """Genera un gráfico 3D de la trayectoria usando Matplotlib"""
+# Campos de resumen de un lanzamiento. point_count y bounds los mantiene el subscriber;
+# para documentos anteriores se calculan a partir del array variables
+SUMMARY_BOUND_FIELDS = ('timestamp', 'latitude', 'longitude', 'altitude')
+LAUNCH_SUMMARY_PROJECTION = {
+    '_id': 0,
+    'launch_id': 1,
+    'start_date': 1,
+    'end_date': 1,
+    'point_count': {'$ifNull': ['$point_count', {'$size': {'$ifNull': ['$variables', []]}}]},
+    'bounds': {'$ifNull': ['$bounds', {
+        field: {'min': {'$min': f'$variables.{field}'}, 'max': {'$max': f'$variables.{field}'}}
+        for field in SUMMARY_BOUND_FIELDS
+    }]}
+}
+
+def stream_json_array(documents):
+    """Serializa un cursor como array JSON documento a documento, sin armar la lista completa"""
+    yield '['
+    first = True
+    for document in documents:
+        if not first:
+            yield ','
+        yield json.dumps(document, cls=JSONEncoder)
+        first = False
+    yield ']'
+
+def get_bucket_collection():
+    return db.get_collection(config.MONGODB_BUCKET_COLLECTION)
+
+launch_id_allocator = None
+
+def get_launch_id_allocator(collection):
+    """Allocator compartido del proceso (prepara índice y contador en el primer uso)"""
+    global launch_id_allocator
+    if launch_id_allocator is None:
+        launch_id_allocator = LaunchIdAllocator(collection, db.get_collection(config.MONGODB_COUNTERS_COLLECTION))
+    return launch_id_allocator
+
+def load_launch(collection, launch_id):
+    """Devuelve el lanzamiento con su array variables completo, reensamblando los
+    buckets si el lanzamiento usa layout 'bucketed'"""
+    launch = collection.find_one({'launch_id': launch_id}, {'_id': 0})
+    if not launch or launch.get('layout') != 'bucketed':
+        return launch
+    
+    # Puntos que quedaron embebidos antes de pasar a buckets + buckets en orden
+    variables = launch.get('variables') or []
+    buckets = get_bucket_collection().find(
+        {'launch_id': launch_id}, {'_id': 0, 'variables': 1}
+    ).sort('bucket_start', pymongo.ASCENDING)
+    for bucket in buckets:
+        variables.extend(bucket.get('variables', []))
+    
+    launch['variables'] = variables
+    launch.pop('layout', None)
+    return launch
+
+def get_launch_version(collection, launch_id):
+    """Versión de datos del lanzamiento sin traer el array variables; None si no existe"""
+    result = list(collection.aggregate([
+        {'$match': {'launch_id': launch_id}},
+        {'$limit': 1},
+        {'$project': {
+            '_id': 0,
+            'data_version': {'$ifNull': ['$data_version', 0]},
+            'points': {'$ifNull': ['$point_count', {'$size': {'$ifNull': ['$variables', []]}}]},
+            'ended': {'$gt': [{'$ifNull': ['$end_date', None]}, None]}
+        }}
+    ]))
+    return result[0] if result else None
+
+def launch_cache(view):
+    """ETag por versión de datos del lanzamiento: If-None-Match coincidente se responde 304
+    sin ejecutar la vista"""
+    @functools.wraps(view)
+    def wrapper(launch_id, **kwargs):
+        collection = get_db_connection()
+        version = get_launch_version(collection, launch_id) if collection is not None else None
+        if version is None:
+            return view(launch_id, **kwargs)
+        
+        ended = bool(version.get('ended'))
+        etag = f"launch-{launch_id}-{version['data_version']}-{version['points']}-{1 if ended else 0}"
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = make_response(view(launch_id, **kwargs))
+            if response.status_code != 200:
+                return response
+        return http_cache.set_cache_headers(response, etag)
+    return wrapper
+
+@app.after_request
+def compress_response(response):
+    """gzip/brotli para respuestas JSON o binarias grandes (no streaming)"""
+    return http_cache.compress_response(response, request.accept_encodings, min_size=config.COMPRESS_MIN_BYTES)
+
+def trajectory_columns(launch_data):
+    """Columnas (longitudes, latitudes, altitudes) de los puntos con GPS completo"""
     if not launch_data or 'variables' not in launch_data:
         return None
     
-    variables = launch_data['variables']
-    
     # Filtrar puntos con coordenadas GPS válidas
     gps_points = [
-        v for v in variables 
+        v for v in launch_data['variables']
         if v.get('latitude') is not None and v.get('longitude') is not None and v.get('altitude') is not None
     ]
     
     if len(gps_points) < 2:
         return None
     
-    # Extraer coordenadas
-    latitudes = [point['latitude'] for point in gps_points]
-    longitudes = [point['longitude'] for point in gps_points]
-    altitudes = [point['altitude'] for point in gps_points]
-    timestamps = [point['timestamp'] for point in gps_points]
-    
-    # Crear figura 3D
-    fig = plt.figure(figsize=(12, 8))
-    ax = fig.add_subplot(111, projection='3d')
-    
-    # Crear colores basados en el tiempo (gradiente)
-    colors = plt.cm.viridis(np.linspace(0, 1, len(gps_points)))
-    
-    # Graficar puntos
-    scatter = ax.scatter(longitudes, latitudes, altitudes, 
-                        c=colors, s=50, alpha=0.8, cmap='viridis')
-    
-    # Graficar línea de trayectoria
-    line = ax.plot(longitudes, latitudes, altitudes, 
-                  'b-', alpha=0.6, linewidth=2, label='Trayectoria')
-    
-    # Marcar punto inicial y final
-    ax.scatter(longitudes[0], latitudes[0], altitudes[0], 
-              c='green', s=200, marker='o', label='Inicio', edgecolors='white')
-    ax.scatter(longitudes[-1], latitudes[-1], altitudes[-1], 
-              c='red', s=200, marker='s', label='Fin', edgecolors='white')
-    
-    # Configurar etiquetas y título
-    ax.set_xlabel('Longitud', fontsize=12, labelpad=10)
-    ax.set_ylabel('Latitud', fontsize=12, labelpad=10)
-    ax.set_zlabel('Altitud (m)', fontsize=12, labelpad=10)
+    return (
+        [point['longitude'] for point in gps_points],
+        [point['latitude'] for point in gps_points],
+        [point['altitude'] for point in gps_points]
+    )
+
+def get_plot_metadata(collection, launch_id):
+    """Versión de datos y cantidad de puntos GPS del lanzamiento, sin traer el array variables"""
+    result = list(collection.aggregate([
+        {'$match': {'launch_id': launch_id}},
+        {'$limit': 1},
+        {'$project': {
+            '_id': 0,
+            'data_version': {'$ifNull': ['$data_version', 0]},
+            'end_date': 1,
+            'layout': 1,
+            'points': {'$size': {'$ifNull': ['$variables', []]}},
+            'gps_points': {'$size': {'$filter': {
+                'input': {'$ifNull': ['$variables', []]},
+                'as': 'v',
+                'cond': {'$and': ['$$v.latitude', '$$v.longitude', '$$v.altitude']}
+            }}}
+        }}
+    ]))
+    if not result:
+        return None
     
-    title = f"Trayectoria 3D - Lanzamiento {launch_data.get('launch_id', 'N/A')}"
-    ax.set_title(title, fontsize=14, pad=20)
+    metadata = result[0]
+    if metadata.get('layout') == 'bucketed':
+        # Sumar también los puntos guardados en buckets
+        for totals in get_bucket_collection().aggregate([
+            {'$match': {'launch_id': launch_id}},
+            {'$group': {
+                '_id': None,
+                'points': {'$sum': {'$size': '$variables'}},
+                'gps_points': {'$sum': {'$size': {'$filter': {
+                    'input': '$variables',
+                    'as': 'v',
+                    'cond': {'$and': ['$$v.latitude', '$$v.longitude', '$$v.altitude']}
+                }}}}
+            }}
+        ]):
+            metadata['points'] += totals['points']
+            metadata['gps_points'] += totals['gps_points']
     
-    # Añadir leyenda
-    ax.legend(loc='upper left', bbox_to_anchor=(0, 1))
+    # Documentos anteriores a data_version: la cantidad de puntos y end_date distinguen versiones
+    metadata['version'] = f"{metadata['data_version']}-{metadata['points']}-{1 if metadata.get('end_date') else 0}"
+    return metadata
+
+def render_3d_plot_png(collection, launch_id):
+    """Devuelve (metadata, png) usando la cache de renders; png es None si no hay datos GPS suficientes"""
+    metadata = get_plot_metadata(collection, launch_id)
+    if metadata is None:
+        return None, None
     
-    # Añadir grid
-    ax.grid(True, alpha=0.3)
+    png = render_cache.get(launch_id, metadata['version'])
+    if png is not None:
+        return metadata, png
     
-    # Configurar vista inicial
-    ax.view_init(elev=30, azim=45)
+    launch = load_launch(collection, launch_id)
     
-    # Ajustar diseño
-    plt.tight_layout()
+    columns = trajectory_columns(launch)
+    if not columns:
+        return metadata, None
     
-    return fig
+    # Render en el pool de procesos (Agg, fuera del hilo del request)
+    png = plot_renderer.render(launch_id, metadata['version'], *columns)
+    render_cache.put(launch_id, metadata['version'], png)
+    return metadata, png
 
 @app.route('/launch_cansat/launch/<int:launch_id>/3d-plot', methods=['GET'])
+@launch_cache
 def get_3d_plot(launch_id):
     """Genera y devuelve un gráfico 3D de la trayectoria"""
     try:
         collection = get_db_connection()
-        launch = collection.find_one({'launch_id': launch_id}, {'_id': 0})
+        metadata, png = render_3d_plot_png(collection, launch_id)
         
-        if not launch:
+        if not metadata:
             return jsonify({'error': 'Launch not found'}), 404
         
-        # Generar el gráfico 3D
-        fig = generate_3d_plot(launch)
-        
-        if not fig:
+        if not png:
             return jsonify({'error': 'No hay datos GPS suficientes para generar el gráfico 3D'}), 400
         
-        # Convertir figura a imagen PNG en memoria
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
-        
-        # Limpiar la figura para liberar memoria
-        plt.close(fig)
-        
         # Devolver la imagen
-        return send_file(img_buffer, mimetype='image/png', 
+        return send_file(io.BytesIO(png), mimetype='image/png', 
                         as_attachment=False, 
                         download_name=f'trayectoria_3d_lanzamiento_{launch_id}.png')
         
+    except RendererBusy:
+        return jsonify({'error': 'Plot renderer busy, retry later'}), 503, {'Retry-After': '1'}
+    except RenderTimeout as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/launch_cansat/launch/<int:launch_id>/3d-plot-base64', methods=['GET'])
+@launch_cache
 def get_3d_plot_base64(launch_id):
     """Genera y devuelve un gráfico 3D en base64 para usar directamente en el frontend"""
     try:
         collection = get_db_connection()
-        launch = collection.find_one({'launch_id': launch_id}, {'_id': 0})
+        metadata, png = render_3d_plot_png(collection, launch_id)
         
-        if not launch:
+        if not metadata:
             return jsonify({'error': 'Launch not found'}), 404
         
-        # Generar el gráfico 3D
-        fig = generate_3d_plot(launch)
-        
-        if not fig:
+        if not png:
             return jsonify({'error': 'No hay datos GPS suficientes para generar el gráfico 3D'}), 400
         
-        # Convertir figura a base64
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
-        
-        # Codificar en base64
-        img_base64 = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-        
-        # Limpiar la figura
-        plt.close(fig)
+        # Codificar en base64 los mismos bytes cacheados que sirve /3d-plot
+        img_base64 = base64.b64encode(png).decode('utf-8')
         
         return jsonify({
             'image': f'data:image/png;base64,{img_base64}',
             'launch_id': launch_id,
-            'points_count': len([v for v in launch.get('variables', []) 
-                               if v.get('latitude') and v.get('longitude') and v.get('altitude')])
+            'points_count': metadata['gps_points']
         })
         
+    except RendererBusy:
+        return jsonify({'error': 'Plot renderer busy, retry later'}), 503, {'Retry-After': '1'}
+    except RenderTimeout as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Tus endpoints existentes permanecen igual...
 @app.route('/launch_cansat/cansat_req_id', methods=['POST'])
 def assign_launch_id():
-    """Asigna un nuevo ID de lanzamiento para CANSAT"""
+    """Asigna un nuevo ID de lanzamiento para CANSAT.
+    
+    ?count=N reserva un bloque contiguo de N ids (assigned_ids); assigned_id es el primero"""
     try:
+        count = request.args.get('count', 1, type=int)
+        if not 1 <= count <= config.LAUNCH_ID_MAX_BATCH:
+            return jsonify({'error': f'count must be between 1 and {config.LAUNCH_ID_MAX_BATCH}'}), 400
+        
         collection = get_db_connection()
         if collection is None:
             return jsonify({'error': 'Database connection failed'}), 500
         
-        # Buscar el máximo ID existente
-        max_launch = collection.find_one(sort=[("launch_id", pymongo.DESCENDING)])
-        next_id = 1
-        
-        if max_launch and 'launch_id' in max_launch:
-            next_id = max_launch['launch_id'] + 1
+        launch_ids = get_launch_id_allocator(collection).allocate(count)
         
-        # Crear documento base para el nuevo lanzamiento
-        new_launch = {
-            'launch_id': next_id,
-            'start_date': None,
-            'end_date': None,
-            'variables': []
+        response = {
+            'assigned_id': launch_ids[0],
+            'status': 'success'
         }
+        if 'count' in request.args:
+            response['assigned_ids'] = launch_ids
+        return jsonify(response)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+@app.route('/launch_cansat/cansat_req_id/release', methods=['POST'])
+def release_launch_ids():
+    """Devuelve ids reservados que no se usaron (p.ej. el pool de publisher_tx al detenerse).
+    Body: {"launch_ids": [...]}; solo se borran los lanzamientos que siguen vacíos"""
+    try:
+        body = request.get_json(silent=True) or {}
+        launch_ids = body.get('launch_ids')
+        if not isinstance(launch_ids, list) or not all(isinstance(launch_id, int) for launch_id in launch_ids):
+            return jsonify({'error': 'launch_ids must be a list of integers'}), 400
         
-        # Insertar en la base de datos
-        collection.insert_one(new_launch)
+        collection = get_db_connection()
+        if collection is None:
+            return jsonify({'error': 'Database connection failed'}), 500
         
-        return jsonify({
-            'assigned_id': next_id,
-            'status': 'success'
-        })
+        released = get_launch_id_allocator(collection).release(launch_ids) if launch_ids else 0
+        return jsonify({'released': released, 'status': 'success'})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
 @app.route('/launch_cansat/launches', methods=['GET'])
 def get_all_launches():
+    """Lista paginada con keyset sobre launch_id (descendente).
+    
+    Por defecto solo devuelve el resumen (?view=full para documentos completos).
+    ?limit=N tamaño de página, ?before=<launch_id> continúa desde el cursor que
+    viene en el header X-Next-Cursor. La respuesta se envía en streaming."""
     try:
+        limit = request.args.get('limit', config.LAUNCHES_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, config.LAUNCHES_MAX_PAGE_SIZE))
+        before = request.args.get('before', type=int)
+        full = request.args.get('view', 'summary') == 'full'
+        
         collection = get_db_connection()
-        launches = list(collection.find({}, {'_id': 0}).sort('launch_id', pymongo.DESCENDING))
-        return jsonify(launches)
+        query = {'launch_id': {'$lt': before}} if before is not None else {}
+        
+        # Cursor de la página siguiente: consulta cubierta por el índice de launch_id
+        boundary = list(collection.find(query, {'_id': 0, 'launch_id': 1})
+                        .sort('launch_id', pymongo.DESCENDING).skip(limit - 1).limit(2))
+        next_cursor = boundary[0]['launch_id'] if len(boundary) == 2 else None
+        
+        if full:
+            launches = collection.find(query, {'_id': 0}).sort('launch_id', pymongo.DESCENDING).limit(limit)
+        else:
+            launches = collection.aggregate([
+                {'$match': query},
+                {'$sort': {'launch_id': pymongo.DESCENDING}},
+                {'$limit': limit},
+                {'$project': LAUNCH_SUMMARY_PROJECTION}
+            ])
+        
+        headers = {}
+        if next_cursor is not None:
+            headers['X-Next-Cursor'] = str(next_cursor)
+        return Response(stream_json_array(launches), mimetype='application/json', headers=headers)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/launch_cansat/launch/<int:launch_id>', methods=['GET'])
+@launch_cache
 def get_launch_by_id(launch_id):
     try:
         collection = get_db_connection()
-        launch = collection.find_one({'launch_id': launch_id}, {'_id': 0})
+        launch = load_launch(collection, launch_id)
         
         if not launch:
             return jsonify({'error': 'Launch not found'}), 404
@@ -228,44 +385,243 @@ def get_launch_by_id(launch_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+VARIABLE_TYPES = ('temperature', 'humidity', 'latitude', 'longitude', 'altitude')
+
+@app.route('/launch_cansat/launch/<int:launch_id>/stats', methods=['GET'])
+@launch_cache
+def get_launch_stats(launch_id):
+    """Estadísticas por variable (count, min, max, mean, variance, std) que el subscriber
+    mantiene en 'summary'; solo lee ese subdocumento. Lanzamientos anteriores no lo tienen"""
+    try:
+        collection = get_db_connection()
+        launch = collection.find_one(
+            {'launch_id': launch_id},
+            {'_id': 0, 'launch_id': 1, 'start_date': 1, 'end_date': 1, 'point_count': 1, 'summary': 1}
+        )
+        if not launch:
+            return jsonify({'error': 'Launch not found'}), 404
+        
+        stats = {}
+        for field, summary in (launch.get('summary') or {}).items():
+            stats[field] = {key: summary.get(key) for key in ('count', 'min', 'max', 'mean', 'variance')}
+            stats[field]['std'] = float(np.sqrt(summary['variance'])) if summary.get('variance') is not None else None
+        
+        return jsonify({
+            'launch_id': launch_id,
+            'start_date': launch.get('start_date'),
+            'end_date': launch.get('end_date'),
+            'point_count': launch.get('point_count'),
+            'stats': stats
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def variable_series_expression(field):
+    """Expresión de agregación: [{timestamp, value}] de los puntos de $variables con field no nulo"""
+    return {'$map': {
+        'input': {'$filter': {
+            'input': {'$ifNull': ['$variables', []]},
+            'as': 'v',
+            # $gt null: el campo existe y no es null
+            'cond': {'$gt': [f'$$v.{field}', None]}
+        }},
+        'as': 'v',
+        'in': {'timestamp': '$$v.timestamp', 'value': f'$$v.{field}'}
+    }}
+
+def load_variable_series(collection, launch_id, field):
+    """Serie de una sola variable filtrada en MongoDB; None si el lanzamiento no existe"""
+    series_expression = variable_series_expression(field)
+    result = list(collection.aggregate([
+        {'$match': {'launch_id': launch_id}},
+        {'$limit': 1},
+        {'$project': {'_id': 0, 'layout': 1, 'data': series_expression}}
+    ]))
+    if not result:
+        return None
+    
+    data = result[0]['data']
+    if result[0].get('layout') == 'bucketed':
+        for bucket in get_bucket_collection().aggregate([
+            {'$match': {'launch_id': launch_id}},
+            {'$sort': {'bucket_start': pymongo.ASCENDING}},
+            {'$project': {'_id': 0, 'data': series_expression}}
+        ]):
+            data.extend(bucket['data'])
+    return data
+
+def downsample_series(data, max_points):
+    """Reduce la serie a max_points con LTTB, ordenada por timestamp"""
+    if not max_points or len(data) <= max_points:
+        return data
+    
+    data = [point for point in data if point.get('timestamp') is not None]
+    timestamps = np.array([point['timestamp'] for point in data], dtype=np.float64)
+    values = np.array([point['value'] for point in data], dtype=np.float64)
+    order = np.argsort(timestamps, kind='stable')
+    
+    indices = lttb_indices(timestamps[order], values[order], max_points)
+    return [data[i] for i in order[indices]]
+
 @app.route('/launch_cansat/launch/<int:launch_id>/variables', methods=['GET'])
+@launch_cache
 def get_launch_variables(launch_id):
+    """Serie de una variable (?type=temperature|humidity|latitude|longitude|altitude) filtrada
+    en MongoDB; ?max_points=N la reduce con LTTB. Sin type devuelve todos los puntos"""
     try:
         variable_type = request.args.get('type', 'all')
+        max_points = request.args.get('max_points', type=int)
         collection = get_db_connection()
-        launch = collection.find_one({'launch_id': launch_id}, {'_id': 0})
         
-        if not launch or 'variables' not in launch:
+        if variable_type not in VARIABLE_TYPES:
+            launch = load_launch(collection, launch_id)
+            if not launch or 'variables' not in launch:
+                return jsonify({'error': 'Launch not found or no variables'}), 404
+            return jsonify(launch['variables'])
+        
+        data = load_variable_series(collection, launch_id, variable_type)
+        if data is None:
             return jsonify({'error': 'Launch not found or no variables'}), 404
         
-        variables = launch['variables']
+        if max_points is not None and max_points < 3:
+            return jsonify({'error': 'max_points must be at least 3'}), 400
         
-        # Filtrar por tipo de variable
-        if variable_type == 'temperature':
-            data = [{'timestamp': v['timestamp'], 'value': v.get('temperature', 0)} 
-                   for v in variables if v.get('temperature') is not None]
-        elif variable_type == 'humidity':
-            data = [{'timestamp': v['timestamp'], 'value': v.get('humidity', 0)} 
-                   for v in variables if v.get('humidity') is not None]
-        elif variable_type == 'latitude':
-            data = [{'timestamp': v['timestamp'], 'value': v.get('latitude', 0)} 
-                   for v in variables if v.get('latitude') is not None]
-        elif variable_type == 'longitude':
-            data = [{'timestamp': v['timestamp'], 'value': v.get('longitude', 0)} 
-                   for v in variables if v.get('longitude') is not None]
-        elif variable_type == 'altitude':
-            data = [{'timestamp': v['timestamp'], 'value': v.get('altitude', 0)} 
-                   for v in variables if v.get('altitude') is not None]
-        else:
-            data = variables
-            
-        return jsonify(data)
+        return jsonify(downsample_series(data, max_points))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+TRAJECTORY_FIELDS = ('timestamp', 'latitude', 'longitude', 'altitude')
+
+def trajectory_expression():
+    """Expresión de agregación: [{timestamp, latitude, longitude, altitude}] de los puntos con GPS completo"""
+    return {'$map': {
+        'input': {'$filter': {
+            'input': {'$ifNull': ['$variables', []]},
+            'as': 'v',
+            'cond': {'$and': [{'$gt': [f'$$v.{field}', None]} for field in TRAJECTORY_FIELDS]}
+        }},
+        'as': 'v',
+        'in': {field: f'$$v.{field}' for field in TRAJECTORY_FIELDS}
+    }}
+
+def load_trajectory(collection, launch_id):
+    """Puntos con GPS completo filtrados en MongoDB; None si el lanzamiento no existe"""
+    expression = trajectory_expression()
+    result = list(collection.aggregate([
+        {'$match': {'launch_id': launch_id}},
+        {'$limit': 1},
+        {'$project': {'_id': 0, 'layout': 1, 'data': expression}}
+    ]))
+    if not result:
+        return None
+    
+    data = result[0]['data']
+    if result[0].get('layout') == 'bucketed':
+        for bucket in get_bucket_collection().aggregate([
+            {'$match': {'launch_id': launch_id}},
+            {'$sort': {'bucket_start': pymongo.ASCENDING}},
+            {'$project': {'_id': 0, 'data': expression}}
+        ]):
+            data.extend(bucket['data'])
+    return data
+
+@app.route('/launch_cansat/launch/<int:launch_id>/trajectory', methods=['GET'])
+@launch_cache
+def get_launch_trajectory(launch_id):
+    """Trayectoria (timestamp, lat, lon, alt) en columnas binarias little-endian para
+    dibujarla en el cliente (ver trajectory_format.py). ?precision=f32|f64 para lat/lon/alt,
+    ?max_points=N la reduce con LTTB sobre la altitud"""
+    try:
+        precision = request.args.get('precision', 'f32')
+        max_points = request.args.get('max_points', type=int)
+        if precision not in trajectory_format.COORDINATE_DTYPES:
+            return jsonify({'error': 'precision must be f32 or f64'}), 400
+        if max_points is not None and max_points < 3:
+            return jsonify({'error': 'max_points must be at least 3'}), 400
+        
+        collection = get_db_connection()
+        points = load_trajectory(collection, launch_id)
+        if points is None:
+            return jsonify({'error': 'Launch not found'}), 404
+        
+        columns = np.array(
+            [[point[field] for field in TRAJECTORY_FIELDS] for point in points], dtype=np.float64
+        ).reshape(-1, len(TRAJECTORY_FIELDS))
+        columns = columns[np.argsort(columns[:, 0], kind='stable')]
+        if max_points and len(columns) > max_points:
+            columns = columns[lttb_indices(columns[:, 0], columns[:, 3], max_points)]
+        
+        payload = trajectory_format.pack_trajectory(
+            columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3], precision
+        )
+        return Response(payload, mimetype=trajectory_format.MIME_TYPE)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def export_response(launch_ids, start, end, filename):
+    """Respuesta en streaming con los puntos en ?format=csv|arrow|parquet, leídos del
+    cursor en lotes de EXPORT_CHUNK_SIZE (memoria constante sin importar el tamaño)"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in export.FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(export.FORMATS)}"}), 400
+    if export_format not in export.available_formats():
+        return jsonify({'error': f'{export_format} export requires pyarrow'}), 501
+    
+    mimetype, extension = export.FORMATS[export_format]
+    chunks = export.export_stream(
+        get_db_connection(), get_bucket_collection(), export_format,
+        launch_ids=launch_ids, start=start, end=end, chunk_size=config.EXPORT_CHUNK_SIZE
+    )
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/launch_cansat/launch/<int:launch_id>/export', methods=['GET'])
+def export_launch(launch_id):
+    """Puntos de un lanzamiento como archivo; ?from=&to= (timestamp) recorta el rango"""
+    try:
+        collection = get_db_connection()
+        if not collection.find_one({'launch_id': launch_id}, {'_id': 1}):
+            return jsonify({'error': 'Launch not found'}), 404
+        start = request.args.get('from', type=float)
+        end = request.args.get('to', type=float)
+        return export_response([launch_id], start, end, f'launch_{launch_id}')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/launch_cansat/export', methods=['GET'])
+def export_launches():
+    """Puntos de varios lanzamientos (?launch_id= repetido) o de todos los que tienen
+    puntos en ?from=&to=, en un solo archivo con la columna launch_id"""
+    try:
+        launch_ids = request.args.getlist('launch_id', type=int)
+        start = request.args.get('from', type=float)
+        end = request.args.get('to', type=float)
+        if not launch_ids and start is None and end is None:
+            return jsonify({'error': 'launch_id or a from/to range is required'}), 400
+        return export_response(launch_ids, start, end, 'launches')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/launch_cansat/launch/<int:launch_id>/live', methods=['GET'])
+def stream_live_launch(launch_id):
+    """Server-Sent Events con cada paquete del lanzamiento a medida que llega a Redis"""
+    queue = live_feed.subscribe(launch_id)
+    response = Response(
+        stream_with_context(live_feed.stream_events(queue)),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/launch_cansat/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'service': 'CANSAT API'})
 
 if __name__ == '__main__':
+    # Con el reloader de debug solo el proceso hijo atiende requests: ahí se precalienta el pool
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        threading.Thread(target=plot_renderer.start, daemon=True).start()
     app.run(host='0.0.0.0', port=config.FLASK_PORT, debug=True)
\ No newline at end of file
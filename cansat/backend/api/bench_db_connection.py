@@ -0,0 +1,64 @@
+"""Benchmark de latencia por request: MongoClient nuevo por request vs cliente compartido.
+
+Uso:
+    python bench_db_connection.py --requests 200 --launch-id 1
+
+Usa el test client de Flask contra la MongoDB configurada en el entorno, así que mide
+el costo real de handshake + autenticación que se evita con el pool compartido.
+"""
+import argparse
+import statistics
+import time
+import pymongo
+import app as api
+import db
+
+def per_request_connection():
+    """Comportamiento anterior de get_db_connection: un MongoClient por request"""
+    client = pymongo.MongoClient(
+        api.config.MONGODB_URI,
+        username=api.config.MONGO_INITDB_ROOT_USERNAME,
+        password=api.config.MONGO_INITDB_ROOT_PASSWORD,
+        authSource='admin'
+    )
+    return client[api.config.MONGODB_DB][api.config.MONGODB_COLLECTION]
+
+def measure(client, url, requests):
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(url)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 500:
+            raise RuntimeError(f"{url} -> {response.status_code}: {response.get_data(as_text=True)}")
+    return latencies
+
+def print_stats(title, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{title:<28} mean={statistics.mean(latencies):8.2f}ms "
+          f"p50={statistics.median(latencies):8.2f}ms p95={p95:8.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--launch-id', type=int, default=1)
+    args = parser.parse_args()
+
+    url = f'/launch_cansat/launch/{args.launch_id}'
+    client = api.app.test_client()
+    pooled = api.get_db_connection
+
+    api.get_db_connection = per_request_connection
+    try:
+        print_stats("MongoClient per request", measure(client, url, args.requests))
+    finally:
+        api.get_db_connection = pooled
+
+    # Calentar el pool antes de medir
+    client.get(url)
+    print_stats("Shared pooled MongoClient", measure(client, url, args.requests))
+    db.get_client().close()
+
+if __name__ == "__main__":
+    main()
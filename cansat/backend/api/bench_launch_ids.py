@@ -0,0 +1,129 @@
+"""Prueba de concurrencia de POST /cansat_req_id: contador atómico vs find_one + insert_one.
+
+Uso:
+    python bench_launch_ids.py --threads 32 --requests 50 [--max-count 5] [--skip-legacy]
+
+Lanza --threads hilos que piden ids en paralelo con el test client de Flask contra la
+MongoDB configurada en el entorno, usando colecciones propias (--collection, se borran
+al terminar). Cada request pide entre 1 y --max-count ids (?count=N).
+
+Verifica que ningún id se entregue dos veces, que cada bloque sea contiguo y que haya
+un documento por id. El modo anterior (find_one del máximo + insert_one) se corre
+primero para mostrar las colisiones; sale con código 1 si el contador falla.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+import pymongo
+import app as api
+import db
+
+class LegacyAllocator:
+    """assign_launch_id anterior: máximo + 1 en dos round trips, sin atomicidad"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def allocate(self, count=1):
+        launch_ids = []
+        for _ in range(count):
+            max_launch = self.collection.find_one(sort=[("launch_id", pymongo.DESCENDING)])
+            next_id = max_launch['launch_id'] + 1 if max_launch and 'launch_id' in max_launch else 1
+            self.collection.insert_one({'launch_id': next_id, 'start_date': None, 'end_date': None, 'variables': []})
+            launch_ids.append(next_id)
+        return launch_ids
+
+def hammer(threads, requests, max_count, seed):
+    """Devuelve (bloques asignados, errores, segundos)"""
+    blocks = []
+    errors = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = api.app.test_client()
+        start.wait()
+        for _ in range(requests):
+            count = rng.randint(1, max_count)
+            response = client.post(f'/launch_cansat/cansat_req_id?count={count}')
+            with lock:
+                if response.status_code == 200:
+                    blocks.append((count, response.get_json()['assigned_ids']))
+                else:
+                    errors[response.status_code] += 1
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return blocks, errors, time.perf_counter() - started
+
+def report(title, collection, blocks, errors, elapsed):
+    """Imprime el resultado y devuelve la lista de problemas encontrados"""
+    assigned = Counter(launch_id for _, launch_ids in blocks for launch_id in launch_ids)
+    duplicates = sum(n - 1 for n in assigned.values() if n > 1)
+    problems = []
+    if duplicates:
+        problems.append(f"{duplicates} ids handed out more than once")
+    if errors:
+        problems.append(f"failed requests: {dict(errors)}")
+    broken = [launch_ids for count, launch_ids in blocks
+              if len(launch_ids) != count or launch_ids != list(range(launch_ids[0], launch_ids[0] + count))]
+    if broken:
+        problems.append(f"{len(broken)} blocks not contiguous, e.g. {broken[0]}")
+    stored = Counter(doc['launch_id'] for doc in collection.find({}, {'_id': 0, 'launch_id': 1}))
+    if any(n > 1 for n in stored.values()) or set(stored) != set(assigned):
+        problems.append(f"{len(stored)} documents for {len(assigned)} distinct ids")
+
+    print(f"{title:<18} {len(blocks) + sum(errors.values()):>6} requests {len(assigned):>7} ids "
+          f"{len(blocks) / elapsed:>9.0f} req/s  {'OK' if not problems else '; '.join(problems)}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=50, help='requests por hilo')
+    parser.add_argument('--max-count', type=int, default=5, help='ids por request: 1..N')
+    parser.add_argument('--collection', default='launches_bench_ids')
+    parser.add_argument('--skip-legacy', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    db.config.MONGODB_COLLECTION = args.collection
+    api.config.MONGODB_COUNTERS_COLLECTION = f'{args.collection}_counters'
+    collection = db.get_collection()
+    counters = db.get_collection(api.config.MONGODB_COUNTERS_COLLECTION)
+    allocator_factory = api.get_launch_id_allocator
+
+    def reset():
+        collection.drop()
+        counters.drop()
+        api.launch_id_allocator = None
+
+    try:
+        if not args.skip_legacy:
+            reset()
+            api.get_launch_id_allocator = LegacyAllocator
+            try:
+                report("find_one+insert", collection, *hammer(args.threads, args.requests, args.max_count, args.seed))
+            finally:
+                api.get_launch_id_allocator = allocator_factory
+
+        reset()
+        problems = report("atomic counter", collection, *hammer(args.threads, args.requests, args.max_count, args.seed))
+        counter = counters.find_one({'_id': 'launch_id'})
+        print(f"counter seq={counter['seq'] if counter else None}, unique index: "
+              f"{collection.index_information().get('launch_id_1', {}).get('unique', False)}")
+    finally:
+        reset()
+        db.get_client().close()
+
+    raise SystemExit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Codec del mensaje de telemetría entre publisher_rx y subscriber (canal/stream de Redis).
+
+Este archivo existe en publisher/, subscriber/ y api/ (cada servicio se construye por
+separado): cualquier cambio debe hacerse en las tres copias.
+
+Formato binario v1 (little-endian):
+
+    B   magic (0xC5)
+    B   versión
+    B   acción (ACTIONS)
+    B   flags de campos opcionales presentes (OPTIONAL_FIELDS, bit i = campo i)
+    I   launch_id
+    d   timestamp
+    d   received_at
+    d*  un double por cada flag activo, en el orden de OPTIONAL_FIELDS
+    B   largo de admin_key
+    s   admin_key (utf-8)
+
+decode() también acepta los formatos anteriores: str(dict) y 'key-id-action-ts-...'.
+
+Las tramas de texto de la radio ('*' de publisher_rx, '-' del publisher original) se
+parsean con un único parser definido por tablas (FrameSchema: RX_FRAME, DASH_FRAME) que
+devuelve un TelemetryFrame (namedtuple) en lugar de un dict.
+"""
+import ast
+import json
+import struct
+import time
+from collections import namedtuple
+
+MAGIC = 0xC5
+VERSION = 1
+
+ACTIONS = ('', 'start', 'launch', 'end')
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+OPTIONAL_FIELDS = ('temperature', 'humidity', 'latitude', 'longitude', 'altitude')
+
+HEADER = struct.Struct('<BBBBIdd')
+KEY_LENGTH = struct.Struct('<B')
+
+# Un Struct precompilado por combinación de flags (hay 2^5)
+_OPTIONAL_STRUCTS = [
+    struct.Struct('<' + 'd' * bin(flags).count('1'))
+    for flags in range(1 << len(OPTIONAL_FIELDS))
+]
+_FLAG_FIELDS = [
+    tuple(field for bit, field in enumerate(OPTIONAL_FIELDS) if flags & (1 << bit))
+    for flags in range(1 << len(OPTIONAL_FIELDS))
+]
+
+# --- Tramas de texto de la radio ---
+
+FRAME_FIELDS = ('admin_key', 'launch_id', 'action', 'timestamp') + OPTIONAL_FIELDS + ('received_at',)
+TelemetryFrame = namedtuple('TelemetryFrame', FRAME_FIELDS, defaults=(None,) * len(OPTIONAL_FIELDS) + (0.0,))
+
+GPS_FIELDS = ('latitude', 'longitude', 'altitude')
+
+class FrameSchema:
+    """Formato de una trama de texto: separador, campos (nombre, conversión) en orden,
+    cuántos de ellos son obligatorios y grupos de campos que valen todos o ninguno.
+
+    Una trama completa (el caso normal) se convierte en un solo try con una expresión
+    armada una vez por esquema (como hace namedtuple). Si algo falla, o faltan campos, se
+    usa la tabla de campos a convertir armada de antemano para cada cantidad de campos
+    (sin los grupos incompletos): un opcional vacío o inválido queda en None (con todo su
+    grupo) y un obligatorio inválido descarta la trama. parse() devuelve un TelemetryFrame
+    o None; nunca lanza ni imprime.
+    """
+
+    def __init__(self, separator, fields, required, groups=()):
+        self.separator = separator
+        self.fields = fields
+        self.required = required
+        self.groups = groups
+        self._group_positions = [[FRAME_FIELDS.index(name) for name in group] for group in groups]
+        self._defaults = [None] * len(FRAME_FIELDS)
+        self._defaults[FRAME_FIELDS.index('action')] = ''
+        self._plans = {count: self._plan(count) for count in range(required, len(fields) + 1)}
+        self._parse_complete = self._complete_parser()
+
+    def _complete_parser(self):
+        """Función (parts, received_at) -> TelemetryFrame para tramas con todos los campos,
+        con las conversiones en línea. tuple(map(...)) sobre las conversiones resulta más
+        lento: cada campo pasa por una llamada genérica a su conversión"""
+        names = [name for name, _ in self.fields]
+        namespace = {'_new': tuple.__new__, '_Frame': TelemetryFrame}
+        items = []
+        for position, name in enumerate(FRAME_FIELDS):
+            if name == 'received_at':
+                items.append('received_at')
+            elif name in names:
+                index = names.index(name)
+                namespace[f'_convert{index}'] = self.fields[index][1]
+                items.append(f'_convert{index}(parts[{index}])')
+            else:
+                items.append(repr(self._defaults[position]))
+        return eval(f"lambda parts, received_at: _new(_Frame, ({', '.join(items)}))", namespace)
+
+    def _plan(self, count):
+        """(índice en la trama, posición en TelemetryFrame, conversión) de los campos a
+        convertir en tramas con count campos; los de un grupo incompleto quedan en None"""
+        present = [name for name, _ in self.fields[:count]]
+        for group in self.groups:
+            if not all(name in present for name in group):
+                present = [name for name in present if name not in group]
+        return tuple(
+            (index, FRAME_FIELDS.index(name), converter)
+            for index, (name, converter) in enumerate(self.fields[:count])
+            if name in present
+        )
+
+    def parse(self, line, received_at=None):
+        if not line:
+            return None
+        parts = line.strip().split(self.separator)
+        if received_at is None:
+            received_at = time.time()
+        if len(parts) >= len(self.fields):
+            try:
+                return self._parse_complete(parts, received_at)  # campos de más: se ignoran
+            except ValueError:
+                pass
+
+        plan = self._plans.get(len(parts))
+        if plan is None:
+            if len(parts) < self.required:
+                return None
+            plan = self._plans[len(self.fields)]  # campos de más: se ignoran
+
+        values = self._defaults[:]
+        values[-1] = received_at
+        invalid = False
+        for index, position, converter in plan:
+            try:
+                values[position] = converter(parts[index])
+            except ValueError:
+                if index < self.required:
+                    return None
+                invalid = True
+
+        if invalid:
+            # Un opcional inválido anula todo su grupo
+            for positions in self._group_positions:
+                if any(values[position] is None for position in positions):
+                    for position in positions:
+                        values[position] = None
+        # tuple.__new__ directo: evita la llamada Python de TelemetryFrame._make
+        return tuple.__new__(TelemetryFrame, values)
+
+_SENSOR_FIELDS = tuple((name, float) for name in OPTIONAL_FIELDS)
+
+# publisher_rx: admin_key*launch_id*timestamp*temp*hum*lat*lon*alt
+RX_FRAME = FrameSchema('*', (
+    ('admin_key', str), ('launch_id', int), ('timestamp', float)
+) + _SENSOR_FIELDS, required=3, groups=(GPS_FIELDS,))
+
+# publisher original / subscriber: admin_key-launch_id-action-timestamp-temp-hum-lat-lon-alt
+DASH_FRAME = FrameSchema('-', (
+    ('admin_key', str), ('launch_id', int), ('action', str), ('timestamp', float)
+) + _SENSOR_FIELDS, required=4, groups=(GPS_FIELDS,))
+
+def encode(data):
+    """Empaqueta un dict (o TelemetryFrame) de telemetría en un registro binario v1"""
+    if isinstance(data, TelemetryFrame):
+        data = data._asdict()
+    flags = 0
+    values = []
+    for bit, field in enumerate(OPTIONAL_FIELDS):
+        value = data.get(field)
+        if value is not None:
+            flags |= 1 << bit
+            values.append(value)
+
+    admin_key = str(data.get('admin_key') or '').encode('utf-8')
+    if len(admin_key) > 255:
+        raise ValueError("admin_key too long for wire format")
+
+    return b''.join((
+        HEADER.pack(
+            MAGIC, VERSION,
+            ACTION_CODES.get(str(data.get('action', '')).lower(), 0),
+            flags,
+            data['launch_id'],
+            data['timestamp'],
+            data.get('received_at') or time.time()
+        ),
+        _OPTIONAL_STRUCTS[flags].pack(*values),
+        KEY_LENGTH.pack(len(admin_key)),
+        admin_key
+    ))
+
+def decode_binary(payload):
+    """Desempaqueta un registro binario. Los opcionales ausentes quedan en None"""
+    if len(payload) < HEADER.size:
+        raise ValueError(f"Binary record too short: {len(payload)} bytes")
+
+    magic, version, action, flags, launch_id, timestamp, received_at = HEADER.unpack_from(payload)
+    if magic != MAGIC:
+        raise ValueError(f"Bad magic byte: {magic:#x}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported wire format version: {version}")
+    if action >= len(ACTIONS) or flags >= len(_OPTIONAL_STRUCTS):
+        raise ValueError(f"Corrupt header: action={action}, flags={flags:#x}")
+
+    offset = HEADER.size
+    optional = _OPTIONAL_STRUCTS[flags]
+    values = optional.unpack_from(payload, offset)
+    offset += optional.size
+
+    (key_length,) = KEY_LENGTH.unpack_from(payload, offset)
+    offset += KEY_LENGTH.size
+    if offset + key_length != len(payload):
+        raise ValueError("Corrupt record: admin_key length does not match payload")
+
+    data = {
+        'admin_key': bytes(payload[offset:offset + key_length]).decode('utf-8'),
+        'launch_id': launch_id,
+        'action': ACTIONS[action],
+        'timestamp': timestamp,
+        'received_at': received_at,
+    }
+    for field in OPTIONAL_FIELDS:
+        data[field] = None
+    data.update(zip(_FLAG_FIELDS[flags], values))
+    return data
+
+def decode_dict_string(message):
+    """Formato anterior: str(dict) de Python (comillas simples, None)"""
+    try:
+        # Camino rápido para el caso común (sin None ni comillas dentro de los valores)
+        data = json.loads(message.replace("'", '"'))
+    except ValueError:
+        data = ast.literal_eval(message)
+    if not isinstance(data, dict):
+        raise ValueError("Message is not a dict literal")
+    return data
+
+def decode_dash_frame(message):
+    """Formato anterior: admin_key-launch_id-action-timestamp-temp-humidity-lat-lon-alt"""
+    frame = DASH_FRAME.parse(message)
+    if frame is None:
+        raise ValueError(f"Invalid frame: {message!r}")
+    return frame._asdict()
+
+def decode(payload):
+    """Decodifica un mensaje en cualquiera de los formatos soportados (bytes o str)"""
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        if len(payload) and payload[0] == MAGIC:
+            return decode_binary(payload)
+        payload = bytes(payload).decode('utf-8')
+
+    message = payload.strip()
+    if not message or message == 'None':
+        raise ValueError("Empty message")
+    if message.startswith('{') and message.endswith('}'):
+        return decode_dict_string(message)
+    return decode_dash_frame(message)
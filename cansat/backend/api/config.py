@@ -9,4 +9,49 @@ class Config:
     MONGODB_COLLECTION = os.getenv('MONGODB_COLLECTION', 'launches')
     MONGO_INITDB_ROOT_USERNAME = os.getenv('MONGO_INITDB_ROOT_USERNAME')
     MONGO_INITDB_ROOT_PASSWORD = os.getenv('MONGO_INITDB_ROOT_PASSWORD')
-    FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
\ No newline at end of file
+    FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
+
+    # Pool de conexiones compartido por proceso
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+
+    # Cache de gráficos 3D renderizados (LRU en memoria + disco)
+    RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', 32))
+    RENDER_CACHE_DIR = os.getenv('RENDER_CACHE_DIR', '/tmp/cansat_render_cache')
+
+    # Buckets de telemetría (lanzamientos con layout 'bucketed')
+    MONGODB_BUCKET_COLLECTION = os.getenv('MONGODB_BUCKET_COLLECTION', 'launch_buckets')
+
+    # Paginación de /launches (keyset sobre launch_id)
+    LAUNCHES_PAGE_SIZE = int(os.getenv('LAUNCHES_PAGE_SIZE', 100))
+    LAUNCHES_MAX_PAGE_SIZE = int(os.getenv('LAUNCHES_MAX_PAGE_SIZE', 1000))
+
+    # Telemetría en vivo (SSE) leída directamente de Redis
+    REDIS_HOST = os.getenv('REDIS_HOST', 'redis')
+    REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+    REDIS_CHANNEL = os.getenv('REDIS_CHANNEL')
+    REDIS_TRANSPORT = os.getenv('REDIS_TRANSPORT', 'pubsub')
+    REDIS_STREAM = os.getenv('REDIS_STREAM', os.getenv('REDIS_CHANNEL'))
+    ADMIN_KEY = os.getenv('ADMIN_KEY')
+    LIVE_QUEUE_SIZE = int(os.getenv('LIVE_QUEUE_SIZE', 256))
+    LIVE_HEARTBEAT_SECONDS = float(os.getenv('LIVE_HEARTBEAT_SECONDS', 15))
+
+    # Asignación de launch_id: contador atómico en MONGODB_COUNTERS_COLLECTION,
+    # hasta LAUNCH_ID_MAX_BATCH ids por request (?count=N)
+    MONGODB_COUNTERS_COLLECTION = os.getenv('MONGODB_COUNTERS_COLLECTION', 'counters')
+    LAUNCH_ID_MAX_BATCH = int(os.getenv('LAUNCH_ID_MAX_BATCH', 100))
+
+    # Render de gráficos 3D en un pool de procesos: PLOT_RENDER_MAX_QUEUE renders en curso
+    # o en espera como máximo (el resto recibe 503) y PLOT_RENDER_TIMEOUT segundos por render
+    PLOT_RENDER_WORKERS = int(os.getenv('PLOT_RENDER_WORKERS', 2))
+    PLOT_RENDER_MAX_QUEUE = int(os.getenv('PLOT_RENDER_MAX_QUEUE', 8))
+    PLOT_RENDER_TIMEOUT = float(os.getenv('PLOT_RENDER_TIMEOUT', 30))
+
+    # Cache HTTP: ETag por data_version (siempre revalidado) y compresión gzip/brotli
+    # de respuestas de más de COMPRESS_MIN_BYTES
+    COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+
+    # Exportación CSV/Arrow/Parquet en streaming: puntos leídos del cursor por lotes
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 5000))
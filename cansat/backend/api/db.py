@@ -0,0 +1,58 @@
+import os
+import threading
+import pymongo
+from config import Config
+
+config = Config()
+
+# Un solo MongoClient por proceso. Se guarda el PID que lo creó porque un
+# MongoClient no sobrevive a un fork (gunicorn/uwsgi con varios workers):
+# si el proceso actual no es el dueño, se crea uno nuevo.
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def create_client():
+    """Crea un MongoClient con el pool y timeouts configurados"""
+    return pymongo.MongoClient(
+        config.MONGODB_URI,
+        username=config.MONGO_INITDB_ROOT_USERNAME,
+        password=config.MONGO_INITDB_ROOT_PASSWORD,
+        authSource='admin',
+        maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+        minPoolSize=config.MONGO_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=config.MONGO_CONNECT_TIMEOUT_MS,
+        # No abrir sockets hasta la primera operación: seguro si el master hace fork después
+        connect=False
+    )
+
+def get_client():
+    """Devuelve el MongoClient compartido del proceso actual"""
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            _client = create_client()
+            _client_pid = pid
+    return _client
+
+def get_database():
+    return get_client()[config.MONGODB_DB]
+
+def get_collection(name=None):
+    return get_database()[name or config.MONGODB_COLLECTION]
+
+def _reset_after_fork():
+    """En el hijo se descarta la referencia heredada (sus sockets pertenecen al padre)"""
+    global _client, _client_pid, _client_lock
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
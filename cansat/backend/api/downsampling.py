@@ -0,0 +1,44 @@
+import numpy as np
+
+def lttb_indices(x, y, threshold):
+    """Índices de los puntos elegidos por Largest-Triangle-Three-Buckets.
+
+    x debe estar ordenado. Conserva el primer y el último punto y, de cada uno de los
+    threshold - 2 buckets intermedios, el punto que forma el triángulo de mayor área
+    con el punto elegido en el bucket anterior y el promedio del bucket siguiente.
+    Los promedios de todos los buckets se calculan de una vez con reduceat; solo la
+    elección (que depende del bucket anterior) recorre los buckets.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    buckets = threshold - 2
+    every = (n - 2) / buckets
+    starts = (np.arange(buckets) * every).astype(np.int64) + 1
+    ends = np.append(starts[1:], n - 1)
+
+    # Promedio de cada bucket; el "siguiente" del último bucket es el último punto
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[:n - 1], starts) / counts
+    avg_y = np.add.reduceat(y[:n - 1], starts) / counts
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(buckets):
+        start, end = starts[i], ends[i]
+        ax, ay = x[a], y[a]
+        areas = np.abs(
+            (ax - next_x[i]) * (y[start:end] - ay) - (ax - x[start:end]) * (next_y[i] - ay)
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
@@ -0,0 +1,166 @@
+"""Exportación de telemetría en streaming: CSV, Arrow IPC (stream) o Parquet.
+
+Los puntos se leen con $unwind desde un cursor de MongoDB en lotes de chunk_size y cada
+lote se escribe y se entrega antes de leer el siguiente, así que la memoria no depende
+del tamaño del lanzamiento. Una fila por punto con EXPORT_FIELDS; los campos ausentes
+quedan vacíos (CSV) o null (Arrow/Parquet).
+
+Arrow y Parquet necesitan pyarrow (opcional: sin él solo está disponible CSV). En
+Parquet cada lote es un row group.
+"""
+import csv
+import io
+import pymongo
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+POINT_FIELDS = ('timestamp', 'temperature', 'humidity', 'latitude', 'longitude', 'altitude')
+EXPORT_FIELDS = ('launch_id',) + POINT_FIELDS
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+def available_formats():
+    return [name for name in FORMATS if name == 'csv' or pyarrow is not None]
+
+def timestamp_range(start=None, end=None):
+    condition = {}
+    if start is not None:
+        condition['$gte'] = start
+    if end is not None:
+        condition['$lte'] = end
+    return condition
+
+def select_launches(collection, launch_ids=None, start=None, end=None):
+    """Lanzamientos a exportar (launch_id, layout), ordenados. Con rango de tiempo se
+    descartan los que tienen bounds.timestamp fuera del rango"""
+    query = {}
+    if launch_ids:
+        query['launch_id'] = {'$in': list(launch_ids)}
+    if start is not None:
+        query['$or'] = [{'bounds.timestamp.max': {'$gte': start}}, {'bounds.timestamp': {'$exists': False}}]
+    if end is not None:
+        query.setdefault('$and', []).append(
+            {'$or': [{'bounds.timestamp.min': {'$lte': end}}, {'bounds.timestamp': {'$exists': False}}]}
+        )
+    return collection.find(query, {'_id': 0, 'launch_id': 1, 'layout': 1}).sort('launch_id', pymongo.ASCENDING)
+
+def unwind_pipeline(match, start=None, end=None):
+    """Pipeline que deja una fila plana por punto de $variables"""
+    pipeline = [
+        {'$match': match},
+        {'$project': {'_id': 0, 'launch_id': 1, 'variables': 1}},
+        {'$unwind': '$variables'}
+    ]
+    condition = timestamp_range(start, end)
+    if condition:
+        pipeline.append({'$match': {'variables.timestamp': condition}})
+    pipeline.append({'$project': {
+        '_id': 0, 'launch_id': 1, **{field: f'$variables.{field}' for field in POINT_FIELDS}
+    }})
+    return pipeline
+
+def iter_points(collection, bucket_collection, launch_ids=None, start=None, end=None, chunk_size=5000):
+    """Cursores de puntos por lanzamiento: primero los embebidos y después los buckets en orden"""
+    for launch in select_launches(collection, launch_ids, start, end):
+        launch_id = launch['launch_id']
+        yield from collection.aggregate(unwind_pipeline({'launch_id': launch_id}, start, end), batchSize=chunk_size)
+
+        if launch.get('layout') == 'bucketed':
+            match = {'launch_id': launch_id}
+            if start is not None:
+                match['max_timestamp'] = {'$gte': start}
+            if end is not None:
+                match['min_timestamp'] = {'$lte': end}
+            pipeline = unwind_pipeline(match, start, end)
+            pipeline.insert(1, {'$sort': {'bucket_start': pymongo.ASCENDING}})
+            yield from bucket_collection.aggregate(pipeline, batchSize=chunk_size)
+
+def chunked(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def csv_stream(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for chunk in chunks:
+        writer.writerows([row.get(field) for field in EXPORT_FIELDS] for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+class ChunkSink:
+    """Archivo de solo escritura para pyarrow: acumula lo escrito hasta drain()"""
+
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+def arrow_schema():
+    return pyarrow.schema(
+        [pyarrow.field('launch_id', pyarrow.int64())] +
+        [pyarrow.field(field, pyarrow.float64()) for field in POINT_FIELDS]
+    )
+
+def record_batch(chunk, schema):
+    return pyarrow.RecordBatch.from_pydict(
+        {field: [row.get(field) for row in chunk] for field in EXPORT_FIELDS}, schema=schema
+    )
+
+def arrow_stream(chunks):
+    sink = ChunkSink()
+    schema = arrow_schema()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_batch(record_batch(chunk, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+def parquet_stream(chunks):
+    sink = ChunkSink()
+    schema = arrow_schema()
+    with pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd') as writer:
+        for chunk in chunks:
+            writer.write_batch(record_batch(chunk, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+WRITERS = {'csv': csv_stream, 'arrow': arrow_stream, 'parquet': parquet_stream}
+
+def export_stream(collection, bucket_collection, export_format, launch_ids=None, start=None, end=None, chunk_size=5000):
+    """Generador de bytes/str del archivo exportado"""
+    rows = iter_points(collection, bucket_collection, launch_ids, start, end, chunk_size)
+    return WRITERS[export_format](chunked(rows, chunk_size))
@@ -0,0 +1,51 @@
+"""Exporta la telemetría de lanzamientos a CSV, Arrow IPC o Parquet sin cargarlos en memoria.
+
+Uso:
+    python export_launches.py --launch-id 42 [--launch-id 43] --format parquet --output launch_42.parquet
+    python export_launches.py --from 1760000000000 --to 1760086400000 --format csv > rango.csv
+
+Lee de la MongoDB configurada en el entorno (igual que la API) con el mismo código que
+GET /launch_cansat/export: puntos en lotes de --chunk-size, escritos a medida que llegan.
+--from/--to son timestamps de los puntos; sin --launch-id se exportan todos los
+lanzamientos con puntos en ese rango.
+"""
+import argparse
+import sys
+import db
+import export
+from config import Config
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--launch-id', type=int, action='append', dest='launch_ids')
+    parser.add_argument('--from', type=float, dest='start')
+    parser.add_argument('--to', type=float, dest='end')
+    parser.add_argument('--format', choices=list(export.FORMATS), default='csv')
+    parser.add_argument('--output', help='archivo de salida (por defecto stdout)')
+    parser.add_argument('--chunk-size', type=int, default=config.EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if not args.launch_ids and args.start is None and args.end is None:
+        parser.error('--launch-id or --from/--to is required')
+    if args.format not in export.available_formats():
+        parser.error(f'{args.format} export requires pyarrow')
+
+    chunks = export.export_stream(
+        db.get_collection(), db.get_collection(config.MONGODB_BUCKET_COLLECTION), args.format,
+        launch_ids=args.launch_ids, start=args.start, end=args.end, chunk_size=args.chunk_size
+    )
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        for chunk in chunks:
+            data = chunk.encode() if isinstance(chunk, str) else chunk
+            output.write(data)
+            written += len(data)
+    finally:
+        if args.output:
+            output.close()
+    print(f"Exported {written} bytes ({args.format})", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
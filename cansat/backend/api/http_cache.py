@@ -0,0 +1,46 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se usa gzip
+    brotli = None
+
+# Tipos que vale la pena comprimir (PNG ya viene comprimido; SSE y streams no pasan por aquí)
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/octet-stream', 'text/csv')
+
+def choose_encoding(accept_encodings):
+    """'br' o 'gzip' según lo que acepta el cliente (werkzeug Accept); None si ninguno"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compress_response(response, accept_encodings, min_size=1024, gzip_level=6, brotli_quality=5):
+    """Comprime en el lugar el body de una respuesta 200 ya armada (no streaming)"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed or
+            response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None or len(body) < min_size:
+        return response
+
+    if encoding == 'br':
+        body = brotli.compress(body, quality=brotli_quality)
+    else:
+        body = gzip.compress(body, compresslevel=gzip_level)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def set_cache_headers(response, etag):
+    """ETag débil (igual para todas las codificaciones) en la 200 y en la 304, con el mismo
+    Vary. Siempre se revalida (no-cache): la frescura la da el ETag, que cambia con
+    data_version aunque un lanzamiento terminado se reanude, y un 304 es barato"""
+    response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,102 @@
+import threading
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+
+DUPLICATE_KEY = 11000
+INDEX_CONFLICT_CODES = (85, 86)  # IndexOptionsConflict, IndexKeySpecsConflict
+
+class LaunchIdAllocator:
+    """Asigna launch_id con un contador atómico ({_id: 'launch_id', seq}) en la colección
+    de contadores: un find_one_and_update con $inc reserva un bloque contiguo, así que dos
+    requests concurrentes nunca reciben el mismo id.
+
+    La primera vez en cada proceso crea el índice único de launch_id y adelanta el
+    contador ($max) al mayor launch_id existente, para bases anteriores al contador o
+    lanzamientos creados por el subscriber con ids que no pasaron por aquí.
+    """
+
+    COUNTER_ID = 'launch_id'
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, collection, counters):
+        self.collection = collection
+        self.counters = counters
+        self.ready = False
+        self.lock = threading.Lock()
+
+    def ensure_index(self):
+        """Índice único de launch_id; reemplaza el índice no único que creaban versiones anteriores"""
+        try:
+            self.collection.create_index('launch_id', unique=True)
+        except OperationFailure as e:
+            if e.code not in INDEX_CONFLICT_CODES:
+                raise
+            self.collection.drop_index('launch_id_1')
+            self.collection.create_index('launch_id', unique=True)
+
+    def seed(self):
+        """Lleva el contador al menos hasta el mayor launch_id guardado"""
+        last = self.collection.find_one({}, {'_id': 0, 'launch_id': 1}, sort=[('launch_id', -1)])
+        if last and last.get('launch_id') is not None:
+            self.counters.update_one({'_id': self.COUNTER_ID}, {'$max': {'seq': last['launch_id']}}, upsert=True)
+
+    def ensure_ready(self):
+        if self.ready:
+            return
+        with self.lock:
+            if not self.ready:
+                try:
+                    self.ensure_index()
+                except OperationFailure as e:
+                    # Con launch_id duplicados de antes no se puede crear: el contador igual es atómico
+                    print(f"Unique launch_id index not created: {e}")
+                self.seed()
+                self.ready = True
+
+    def reserve(self, count):
+        """Reserva count ids contiguos y devuelve el primero"""
+        counter = self.counters.find_one_and_update(
+            {'_id': self.COUNTER_ID},
+            {'$inc': {'seq': count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter['seq'] - count + 1
+
+    def allocate(self, count=1):
+        """Reserva count ids y crea el documento base de cada lanzamiento"""
+        self.ensure_ready()
+        for attempt in range(self.MAX_ATTEMPTS):
+            first_id = self.reserve(count)
+            launch_ids = list(range(first_id, first_id + count))
+            try:
+                self.collection.insert_many([
+                    {'launch_id': launch_id, 'start_date': None, 'end_date': None, 'variables': []}
+                    for launch_id in launch_ids
+                ], ordered=False)
+                return launch_ids
+            except BulkWriteError as e:
+                # Algún id ya existía (creado por fuera del contador): el bloque queda
+                # descartado y se vuelve a reservar después de adelantar el contador
+                if any(error['code'] != DUPLICATE_KEY for error in e.details['writeErrors']):
+                    raise
+                existing = {error['op']['launch_id'] for error in e.details['writeErrors']}
+                self.collection.delete_many({
+                    'launch_id': {'$in': [launch_id for launch_id in launch_ids if launch_id not in existing]},
+                    'start_date': None,
+                    'variables': []
+                })
+                self.seed()
+        raise RuntimeError(f"Could not allocate {count} launch ids after {self.MAX_ATTEMPTS} attempts")
+
+    def release(self, launch_ids):
+        """Borra los documentos base de ids reservados que nunca se usaron (sin datos).
+        El contador no retrocede: los ids liberados quedan como huecos"""
+        result = self.collection.delete_many({
+            'launch_id': {'$in': list(launch_ids)},
+            'start_date': None,
+            'end_date': None,
+            'variables': [],
+            'point_count': {'$in': [None, 0]}
+        })
+        return result.deleted_count
@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from collections import deque
+import redis
+import codec
+
+class ClientQueue:
+    """Cola acotada de un cliente en vivo. Si el cliente no consume a tiempo se descartan
+    los eventos más viejos (drop-oldest) y se cuentan, el productor nunca se bloquea."""
+
+    def __init__(self, launch_id, max_size):
+        self.launch_id = launch_id
+        self.events = deque(maxlen=max_size)
+        self.dropped = 0
+        self.condition = threading.Condition()
+
+    def put(self, event):
+        with self.condition:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(event)
+            self.condition.notify()
+
+    def get_batch(self, timeout):
+        """Espera hasta timeout segundos y devuelve (eventos pendientes, descartados desde la última llamada)"""
+        with self.condition:
+            if not self.events:
+                self.condition.wait(timeout)
+            events = list(self.events)
+            self.events.clear()
+            dropped, self.dropped = self.dropped, 0
+        return events, dropped
+
+class LiveFeed:
+    """Reparte la telemetría de Redis a los clientes conectados, filtrada por launch_id.
+
+    Un único hilo por proceso lee el canal (pub/sub) o el stream (XREAD, sin grupo de
+    consumidores: no compite con el subscriber), decodifica cada mensaje una sola vez y
+    encola el evento SSE ya serializado en la cola de cada cliente de ese lanzamiento.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.published = 0
+        self.rejected = 0
+
+    def subscribe(self, launch_id):
+        queue = ClientQueue(launch_id, self.config.LIVE_QUEUE_SIZE)
+        with self.lock:
+            self.clients.setdefault(launch_id, set()).add(queue)
+            # El hilo se arranca con el primer cliente (y en el proceso que lo atiende)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='live-feed', daemon=True)
+                self.thread.start()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self.lock:
+            queues = self.clients.get(queue.launch_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self.clients[queue.launch_id]
+
+    def client_count(self):
+        with self.lock:
+            return sum(len(queues) for queues in self.clients.values())
+
+    def dispatch(self, payload):
+        try:
+            data = codec.decode(payload)
+        except Exception as e:
+            self.rejected += 1
+            print(f"Live feed: unparseable message ({e})")
+            return
+
+        # Mismo criterio que el subscriber: solo se reenvía lo que se va a guardar
+        if self.config.ADMIN_KEY and data.get('admin_key') != self.config.ADMIN_KEY:
+            self.rejected += 1
+            return
+
+        launch_id = data.get('launch_id')
+        with self.lock:
+            queues = list(self.clients.get(launch_id, ()))
+        if not queues:
+            return
+
+        data.pop('admin_key', None)
+        event = f"data: {json.dumps(data)}\n\n"
+        for queue in queues:
+            queue.put(event)
+        self.published += 1
+
+    def run(self):
+        while True:
+            try:
+                client = redis.Redis(
+                    host=self.config.REDIS_HOST,
+                    port=self.config.REDIS_PORT,
+                    decode_responses=False
+                )
+                if self.config.REDIS_TRANSPORT == 'stream':
+                    self.read_stream(client)
+                else:
+                    self.read_channel(client)
+            except Exception as e:
+                print(f"Live feed Redis error: {e}, reconnecting in 1s")
+                time.sleep(1)
+
+    def read_channel(self, client):
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.config.REDIS_CHANNEL)
+        print(f"Live feed subscribed to channel: {self.config.REDIS_CHANNEL}")
+        try:
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message['type'] == 'message':
+                    self.dispatch(message['data'])
+        finally:
+            pubsub.close()
+
+    def read_stream(self, client):
+        # '$': solo lo que llegue desde ahora, la historia se lee de Mongo
+        last_id = '$'
+        print(f"Live feed reading stream: {self.config.REDIS_STREAM}")
+        while True:
+            response = client.xread({self.config.REDIS_STREAM: last_id}, count=500, block=1000)
+            for _, entries in response or ():
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    self.dispatch(fields.get(b'data', b''))
+
+    def stream_events(self, queue):
+        """Generador de la respuesta SSE de un cliente. Envía un comentario de keep-alive
+        cada LIVE_HEARTBEAT_SECONDS y un evento 'dropped' cuando se descartaron mensajes."""
+        try:
+            yield ": connected\n\n"
+            while True:
+                events, dropped = queue.get_batch(self.config.LIVE_HEARTBEAT_SECONDS)
+                if dropped:
+                    yield f"event: dropped\ndata: {dropped}\n\n"
+                if events:
+                    yield ''.join(events)
+                elif not dropped:
+                    yield ": keep-alive\n\n"
+        finally:
+            # GeneratorExit cuando el cliente cierra la conexión
+            self.unsubscribe(queue)
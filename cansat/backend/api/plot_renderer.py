@@ -0,0 +1,151 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+class RendererBusy(Exception):
+    """Hay max_queue renders en curso o esperando: la API responde 503 sin esperar"""
+
+class RenderTimeout(Exception):
+    """El render no terminó dentro de timeout segundos"""
+
+def warm_up():
+    """Inicializador de cada worker: backend Agg e imports de Matplotlib (y su cache de
+    fuentes) una sola vez, con un render mínimo"""
+    import matplotlib
+    matplotlib.use('Agg')
+    render_trajectory_png(0, [0.0, 1.0], [0.0, 1.0], [0.0, 1.0], dpi=10)
+
+def ping():
+    return os.getpid()
+
+def render_trajectory_png(launch_id, longitudes, latitudes, altitudes, dpi=150):
+    """Gráfico 3D de la trayectoria como PNG, con figuras OO (sin el estado global de pyplot)"""
+    import io
+    import numpy as np
+    from matplotlib import colormaps
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from mpl_toolkits.mplot3d import Axes3D  # registra la proyección '3d'
+
+    fig = Figure(figsize=(12, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, projection='3d')
+
+    # Colores basados en el tiempo (gradiente)
+    colors = colormaps['viridis'](np.linspace(0, 1, len(longitudes)))
+
+    # Puntos y línea de trayectoria
+    ax.scatter(longitudes, latitudes, altitudes, c=colors, s=50, alpha=0.8)
+    ax.plot(longitudes, latitudes, altitudes, 'b-', alpha=0.6, linewidth=2, label='Trayectoria')
+
+    # Marcar punto inicial y final
+    ax.scatter(longitudes[0], latitudes[0], altitudes[0],
+               c='green', s=200, marker='o', label='Inicio', edgecolors='white')
+    ax.scatter(longitudes[-1], latitudes[-1], altitudes[-1],
+               c='red', s=200, marker='s', label='Fin', edgecolors='white')
+
+    ax.set_xlabel('Longitud', fontsize=12, labelpad=10)
+    ax.set_ylabel('Latitud', fontsize=12, labelpad=10)
+    ax.set_zlabel('Altitud (m)', fontsize=12, labelpad=10)
+    ax.set_title(f"Trayectoria 3D - Lanzamiento {launch_id}", fontsize=14, pad=20)
+    ax.legend(loc='upper left', bbox_to_anchor=(0, 1))
+    ax.grid(True, alpha=0.3)
+    ax.view_init(elev=30, azim=45)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+class PlotRendererPool:
+    """Pool de procesos para los gráficos 3D, fuera de los hilos de Flask.
+
+    Los workers se crean con 'spawn' (el proceso de la API tiene hilos y un MongoClient,
+    no conviene hacer fork) y se precalientan en start(). Como mucho max_queue renders
+    en curso o en espera: el siguiente recibe RendererBusy en vez de encolarse. Pedidos
+    simultáneos del mismo (launch_id, versión) comparten el mismo render. Un render que
+    pasa de timeout sigue ocupando su lugar en la cola hasta que termina.
+    """
+
+    def __init__(self, workers=2, max_queue=8, timeout=30):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.executor = None
+        self.in_flight = {}  # (launch_id, version) -> Future
+        self.lock = threading.Lock()
+        self.rejected = 0
+        self.timeouts = 0
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        """Los workers pertenecen al padre (gunicorn con preload): el hijo crea los suyos"""
+        self.executor = None
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=warm_up
+        )
+
+    def start(self):
+        """Arranca los workers y espera a que terminen de precalentarse"""
+        with self.lock:
+            if self.executor is None:
+                self.executor = self._create_executor()
+            executor = self.executor
+        pids = {future.result() for future in [executor.submit(ping) for _ in range(self.workers)]}
+        print(f"Plot renderer pool ready: {len(pids)} workers")
+
+    def _submit(self, key, args):
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                return future
+            if len(self.in_flight) >= self.max_queue:
+                self.rejected += 1
+                raise RendererBusy(f"{len(self.in_flight)} renders in progress")
+            if self.executor is None:
+                self.executor = self._create_executor()
+            future = self.executor.submit(render_trajectory_png, *args)
+            self.in_flight[key] = future
+
+        def done(_):
+            with self.lock:
+                if self.in_flight.get(key) is future:
+                    del self.in_flight[key]
+        future.add_done_callback(done)
+        return future
+
+    def render(self, launch_id, version, longitudes, latitudes, altitudes):
+        """PNG del gráfico; RendererBusy si la cola está llena, RenderTimeout si tarda demasiado"""
+        future = self._submit((launch_id, version), (launch_id, longitudes, latitudes, altitudes))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            raise RenderTimeout(f"render of launch {launch_id} exceeded {self.timeout}s")
+        except BrokenProcessPool:
+            # Un worker murió (p.ej. sin memoria): se descarta el pool y el próximo render crea otro
+            with self.lock:
+                if self.executor is not None:
+                    self.executor.shutdown(wait=False)
+                    self.executor = None
+            raise
+
+    def queue_depth(self):
+        with self.lock:
+            return len(self.in_flight)
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,92 @@
+import os
+import threading
+from collections import OrderedDict
+
+class RenderCache:
+    """Cache de imágenes renderizadas, con clave (launch_id, versión de datos).
+
+    Dos niveles: un LRU en memoria acotado a max_items y un directorio en disco que
+    sobrevive a reinicios y se comparte entre workers. Al guardar una versión nueva
+    de un lanzamiento se borran las versiones anteriores de ese lanzamiento.
+    """
+
+    def __init__(self, max_items=32, cache_dir=None, suffix='.png'):
+        self.max_items = max_items
+        self.cache_dir = cache_dir
+        self.suffix = suffix
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, launch_id, version):
+        return os.path.join(self.cache_dir, f"{launch_id}-{version}{self.suffix}")
+
+    def get(self, launch_id, version):
+        key = (launch_id, version)
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return data
+
+        data = self._read_disk(launch_id, version)
+        with self.lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, launch_id, version, data):
+        with self.lock:
+            # Descartar versiones anteriores del mismo lanzamiento
+            for stale in [key for key in self.memory if key[0] == launch_id and key[1] != version]:
+                del self.memory[stale]
+            self._remember((launch_id, version), data)
+        self._write_disk(launch_id, version, data)
+
+    def _remember(self, key, data):
+        self.memory[key] = data
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_items:
+            self.memory.popitem(last=False)
+
+    def _read_disk(self, launch_id, version):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(launch_id, version), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Render cache read error: {e}")
+            return None
+
+    def _write_disk(self, launch_id, version, data):
+        if not self.cache_dir:
+            return
+        path = self._path(launch_id, version)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # Escritura atómica: otros workers nunca ven un archivo a medias
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            prefix = f"{launch_id}-"
+            current = os.path.basename(path)
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix) and name.endswith(self.suffix) and name != current:
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except FileNotFoundError:
+                        pass  # otro worker ya lo borró
+        except OSError as e:
+            print(f"Render cache write error: {e}")
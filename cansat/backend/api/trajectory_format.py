@@ -0,0 +1,57 @@
+"""Trayectoria en columnas binarias para renderizar en el cliente (typed arrays sin parseo).
+
+Formato v1, little-endian, header de 16 bytes:
+
+    4s  magic b'CTRJ'
+    B   versión
+    B   bytes por coordenada: 4 (float32) o 8 (float64)
+    H   reservado (0)
+    I   cantidad de puntos n
+    I   reservado (0)
+
+seguido de las columnas, en este orden:
+
+    timestamp   float64[n]  (siempre float64: son milisegundos)
+    latitude    float32[n] o float64[n]
+    longitude   idem
+    altitude    idem
+
+El header ocupa 16 bytes y timestamp 8n, así que cada columna empieza alineada a su
+tamaño: en JS new Float64Array(buffer, 16, n), new Float32Array(buffer, 16 + 8n, n), ...
+Con float32 la resolución en lat/lon es de ~1 m, suficiente para dibujar.
+"""
+import struct
+import numpy as np
+
+MAGIC = b'CTRJ'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHII')
+COORDINATE_DTYPES = {'f32': np.dtype('<f4'), 'f64': np.dtype('<f8')}
+MIME_TYPE = 'application/octet-stream'
+
+def pack_trajectory(timestamps, latitudes, longitudes, altitudes, precision='f32'):
+    """Header + columnas; las entradas deben tener el mismo largo y venir ordenadas"""
+    coordinate_dtype = COORDINATE_DTYPES[precision]
+    count = len(timestamps)
+    parts = [
+        HEADER.pack(MAGIC, VERSION, coordinate_dtype.itemsize, 0, count, 0),
+        np.asarray(timestamps, dtype='<f8').tobytes()
+    ]
+    for column in (latitudes, longitudes, altitudes):
+        parts.append(np.asarray(column, dtype=coordinate_dtype).tobytes())
+    return b''.join(parts)
+
+def unpack_trajectory(payload):
+    """Inverso de pack_trajectory: dict de arrays numpy (para pruebas y clientes Python)"""
+    magic, version, coordinate_size, _, count, _ = HEADER.unpack_from(payload)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported trajectory payload: {magic!r} v{version}")
+    coordinate_dtype = np.dtype('<f4') if coordinate_size == 4 else np.dtype('<f8')
+
+    offset = HEADER.size
+    columns = {'timestamp': np.frombuffer(payload, dtype='<f8', count=count, offset=offset)}
+    offset += 8 * count
+    for name in ('latitude', 'longitude', 'altitude'):
+        columns[name] = np.frombuffer(payload, dtype=coordinate_dtype, count=count, offset=offset)
+        offset += coordinate_size * count
+    return columns
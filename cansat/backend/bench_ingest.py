@@ -0,0 +1,276 @@
+"""Benchmark end-to-end de la ingesta: serial -> publisher_rx -> Redis -> subscriber -> MongoDB.
+
+Uso:
+    python bench_ingest.py [--rate 200] [--frames 5000] [--launches 4] [--serial pty|loop]
+                           [--redis-url redis://localhost:6379/15] [--mongo-uri mongodb://localhost:27017/]
+
+Un hilo escribe tramas '*' sintéticas a --rate tramas/s en un pty (o en pyserial loop://)
+que DataPublisherRX lee como si fuera la radio; DataSubscriber corre en otro hilo con su
+buffer de escritura. Sin --redis-url / --mongo-uri se usan fakeredis y mongomock en el
+mismo proceso. La latencia se mide desde que la línea se escribe en el puerto hasta que
+el bulk_write que contiene ese punto termina sin error.
+
+Reporta throughput, latencia p50/p95/p99 y descartes por etapa:
+    serial      tramas escritas que no llegaron como línea a read_lines()
+    publisher   líneas rechazadas por publisher_rx (parseo, admin key, GPS)
+    redis       mensajes publicados que el subscriber no recibió
+    subscriber  mensajes recibidos que no quedaron escritos en MongoDB
+
+La configuración de ambos servicios (WIRE_FORMAT, REDIS_TRANSPORT, WRITE_BATCH_SIZE,
+STORAGE_LAYOUT, ...) se toma del entorno, igual que en producción.
+"""
+import argparse
+import contextlib
+import importlib
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DB = 'cansat_bench'
+
+# Valores mínimos para que Config de publisher/subscriber se pueda importar sin .env
+BENCH_ENV = {
+    'ADMIN_KEY': 'bench',
+    'REDIS_HOST': 'localhost',
+    'REDIS_PORT': '6379',
+    'REDIS_CHANNEL': 'cansat_bench',
+    'BAUDRATE': '115200',
+    'SERIAL_PORT_RX': 'loop://',
+    'MONGODB_DB': BENCH_DB,
+    'MONGODB_COLLECTION': 'launches',
+}
+
+def load_service(service, module_name):
+    """Importa un módulo de publisher/ o subscriber/. Ambos servicios tienen su propio
+    config.py y codec.py, así que se sacan de sys.modules después de cada import"""
+    path = os.path.join(BACKEND_DIR, service)
+    sys.path.insert(0, path)
+    try:
+        return importlib.import_module(module_name)
+    finally:
+        sys.path.remove(path)
+        for shared in ('config', 'codec'):
+            sys.modules.pop(shared, None)
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class IngestBench:
+    def __init__(self, args):
+        self.args = args
+        self.sent_at = {}       # timestamp de la trama -> perf_counter al escribirla
+        self.committed_at = {}  # timestamp del punto -> perf_counter al confirmarse el bulk_write
+        self.counts = {'sent': 0, 'read': 0, 'published': 0, 'received': 0}
+        self.feeder_done = threading.Event()
+
+    # --- stand-ins / conexiones ---
+
+    def redis_clients(self):
+        """(cliente del publisher, cliente del subscriber) sobre el mismo servidor"""
+        if self.args.redis_url:
+            import redis
+            publisher_client = redis.Redis.from_url(self.args.redis_url, decode_responses=True)
+            subscriber_client = redis.Redis.from_url(self.args.redis_url, decode_responses=False)
+            subscriber_client.delete(os.environ.get('REDIS_STREAM') or os.environ['REDIS_CHANNEL'])
+            return publisher_client, subscriber_client
+
+        import fakeredis
+        server = fakeredis.FakeServer()
+        return (fakeredis.FakeRedis(server=server, decode_responses=True),
+                fakeredis.FakeRedis(server=server, decode_responses=False))
+
+    def mongo_database(self):
+        if self.args.mongo_uri:
+            import pymongo
+            client = pymongo.MongoClient(self.args.mongo_uri)
+            client.drop_database(BENCH_DB)
+            return client[BENCH_DB]
+
+        import mongomock
+        return mongomock.MongoClient()[BENCH_DB]
+
+    def open_serial(self, receiver):
+        """Conecta el Receiver a un pty o a loop://; devuelve la función que escribe en el otro extremo"""
+        if self.args.serial == 'pty':
+            master_fd, slave_fd = os.openpty()
+            receiver.port = os.ttyname(slave_fd)
+            if not receiver.connect():
+                raise RuntimeError(f"Could not open pty {receiver.port}")
+            os.close(slave_fd)
+            return lambda data: os.write(master_fd, data)
+
+        import serial
+        receiver.ser = serial.serial_for_url('loop://', timeout=1)
+        return receiver.ser.write
+
+    # --- instrumentación ---
+
+    def build_publisher(self, redis_client):
+        publisher_rx = load_service('publisher', 'publisher_rx')
+        publisher = publisher_rx.DataPublisherRX()
+        publisher.redis_client = redis_client
+
+        read_lines = publisher.receiver.read_lines
+        def counted_read_lines():
+            lines = read_lines()
+            self.counts['read'] += len(lines)
+            return lines
+        publisher.receiver.read_lines = counted_read_lines
+
+        send_message = publisher.send_message
+        def counted_send_message(message):
+            send_message(message)
+            self.counts['published'] += 1
+        publisher.send_message = counted_send_message
+        return publisher
+
+    def build_subscriber(self, redis_client, database):
+        subscriber_module = load_service('subscriber', 'subscriber')
+        write_buffer_module = sys.modules['write_buffer']
+
+        subscriber = subscriber_module.DataSubscriber()
+        config = subscriber.config
+        subscriber.redis_client = redis_client
+        subscriber.db = database
+        subscriber.collection = database[config.MONGODB_COLLECTION]
+
+        # Misma construcción que DataSubscriber.connect_databases
+        bucket_collection = None
+        if config.STORAGE_LAYOUT == 'bucketed':
+            bucket_collection = database[config.MONGODB_BUCKET_COLLECTION]
+            bucket_collection.create_index([("launch_id", 1), ("bucket_start", 1)], unique=True)
+        subscriber.write_buffer = write_buffer_module.LaunchWriteBuffer(
+            subscriber.collection,
+            max_points=config.WRITE_BATCH_SIZE,
+            max_age=config.WRITE_FLUSH_INTERVAL_MS / 1000,
+            bucket_collection=bucket_collection,
+            bucket_span=config.BUCKET_SPAN_MS
+        )
+
+        process_payload = subscriber.process_payload
+        def counted_process_payload(message_data):
+            self.counts['received'] += 1
+            process_payload(message_data)
+        subscriber.process_payload = counted_process_payload
+
+        # Un punto está "committed" cuando el bulk_write que lo lleva vuelve sin error
+        bulk_write = subscriber.write_buffer._bulk_write
+        def timed_bulk_write(collection, operations, items):
+            failed = bulk_write(collection, operations, items)
+            now = time.perf_counter()
+            failed_lists = {id(points) for _, points, _ in failed}
+            for _, points, _ in items:
+                if id(points) not in failed_lists:
+                    for point in points:
+                        self.committed_at.setdefault(point['timestamp'], now)
+            return failed
+        subscriber.write_buffer._bulk_write = timed_bulk_write
+        return subscriber
+
+    # --- carga ---
+
+    def frames(self):
+        """Tramas admin_key*launch_id*timestamp*temp*hum*lat*lon*alt con timestamps únicos.
+
+        La trayectoria es cinemáticamente plausible para la validación GPS de publisher_rx
+        (timestamp en ms: ~160 m/s horizontal y 100 m/s vertical, entre 1500 y 2500 m),
+        así el benchmark mide la ingesta y no los rechazos del filtro"""
+        admin_key = os.environ['ADMIN_KEY']
+        for seq in range(1, self.args.frames + 1):
+            launch_id = 900000 + seq % self.args.launches
+            climb = seq % 20000
+            altitude = 1500 + 0.1 * min(climb, 20000 - climb)
+            line = (f"{admin_key}*{launch_id}*{seq}*{20 + seq % 10}.5*{50 + seq % 30}.0"
+                    f"*{6.2 + seq * 1e-6:.6f}*{-75.5 + seq * 1e-6:.6f}*{altitude:.1f}\n")
+            yield seq, line.encode('utf-8')
+
+    def feed(self, write):
+        interval = 1.0 / self.args.rate if self.args.rate > 0 else 0
+        started = time.perf_counter()
+        for index, (seq, frame) in enumerate(self.frames()):
+            delay = started + index * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.sent_at[seq] = time.perf_counter()
+            write(frame)
+            self.counts['sent'] += 1
+        self.feeder_done.set()
+
+    def run(self):
+        publisher_redis, subscriber_redis = self.redis_clients()
+        database = self.mongo_database()
+
+        output = sys.stdout if self.args.verbose else open(os.devnull, 'w')
+        with contextlib.redirect_stdout(output):
+            publisher = self.build_publisher(publisher_redis)
+            subscriber = self.build_subscriber(subscriber_redis, database)
+            write = self.open_serial(publisher.receiver)
+
+            # Los dos servicios corren su loop real en hilos daemon (terminan con el proceso)
+            threading.Thread(target=subscriber.subscribe, daemon=True).start()
+            time.sleep(0.2)  # que el SUBSCRIBE / grupo exista antes de publicar
+            threading.Thread(target=publisher.publish_data, daemon=True).start()
+
+            feeder = threading.Thread(target=self.feed, args=(write,), daemon=True)
+            feeder.start()
+            feeder.join()
+
+            # Esperar a que se drene todo, o hasta --drain-timeout sin progreso
+            last_progress, last_count = time.perf_counter(), -1
+            while time.perf_counter() - last_progress < self.args.drain_timeout:
+                if len(self.committed_at) >= self.counts['sent']:
+                    break
+                if len(self.committed_at) != last_count:
+                    last_progress, last_count = time.perf_counter(), len(self.committed_at)
+                time.sleep(0.05)
+
+        self.report()
+
+    def report(self):
+        counts = self.counts
+        committed = len(self.committed_at)
+        latencies = sorted(
+            (self.committed_at[seq] - sent) * 1000
+            for seq, sent in self.sent_at.items() if seq in self.committed_at
+        )
+        first_sent = min(self.sent_at.values()) if self.sent_at else 0
+        last_commit = max(self.committed_at.values()) if self.committed_at else first_sent
+        elapsed = max(last_commit - first_sent, 1e-9)
+
+        print(f"transport={os.environ.get('REDIS_TRANSPORT', 'pubsub')} "
+              f"wire={os.environ.get('WIRE_FORMAT', 'binary')} "
+              f"layout={os.environ.get('STORAGE_LAYOUT', 'document')} "
+              f"serial={self.args.serial} rate={self.args.rate}/s")
+        print(f"frames sent {counts['sent']}, read {counts['read']}, published {counts['published']}, "
+              f"received {counts['received']}, committed {committed}")
+        print(f"drops: serial {counts['sent'] - counts['read']}, "
+              f"publisher {counts['read'] - counts['published']}, "
+              f"redis {counts['published'] - counts['received']}, "
+              f"subscriber {counts['received'] - committed}")
+        print(f"throughput {committed / elapsed:.1f} frames/s over {elapsed:.2f}s")
+        print(f"latency ms: p50 {percentile(latencies, 0.50):.2f}  p95 {percentile(latencies, 0.95):.2f}  "
+              f"p99 {percentile(latencies, 0.99):.2f}  max {latencies[-1] if latencies else float('nan'):.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rate', type=float, default=200, help='tramas por segundo (0 = sin límite)')
+    parser.add_argument('--frames', type=int, default=5000)
+    parser.add_argument('--launches', type=int, default=4, help='lanzamientos intercalados')
+    parser.add_argument('--serial', choices=('pty', 'loop'), default='pty')
+    parser.add_argument('--redis-url', help='Redis real (se borra el canal/stream de prueba)')
+    parser.add_argument('--mongo-uri', help=f'MongoDB real (se borra la base {BENCH_DB})')
+    parser.add_argument('--drain-timeout', type=float, default=5, help='segundos sin progreso antes de cortar')
+    parser.add_argument('--verbose', action='store_true', help='mostrar los prints de los servicios')
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    IngestBench(args).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Micro-benchmark del codec de telemetría: ops/s de encode/decode y bytes por mensaje.
+
+Uso:
+    python bench_codec.py --iterations 200000
+
+Compara el formato binario v1 con el str(dict) anterior (decodificado con
+replace + json.loads como hacía el subscriber, y con el camino legado de codec.decode).
+"""
+import argparse
+import json
+import time
+import codec
+
+SAMPLE = {
+    'admin_key': 'playboi',
+    'launch_id': 42,
+    'action': 'launch',
+    'timestamp': 123456.0,
+    'received_at': 1760000000.123456,
+    'temperature': 21.4,
+    'humidity': 63.2,
+    'latitude': 4.628139,
+    'longitude': -74.064722,
+    'altitude': 2612.5
+}
+
+def legacy_json_decode(message):
+    return json.loads(message.replace("'", '"'))
+
+def ops_per_second(function, argument, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function(argument)
+    return iterations / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+
+    binary = codec.encode(SAMPLE)
+    legacy = str(SAMPLE)
+    assert codec.decode(binary) == SAMPLE
+
+    rows = [
+        ('binary v1', len(binary),
+         ops_per_second(codec.encode, SAMPLE, args.iterations),
+         ops_per_second(codec.decode, binary, args.iterations)),
+        ('str(dict) + json.loads', len(legacy.encode('utf-8')),
+         ops_per_second(str, SAMPLE, args.iterations),
+         ops_per_second(legacy_json_decode, legacy, args.iterations)),
+        ('str(dict) + codec.decode', len(legacy.encode('utf-8')),
+         ops_per_second(str, SAMPLE, args.iterations),
+         ops_per_second(codec.decode, legacy, args.iterations)),
+    ]
+
+    print(f"{'format':<26} {'bytes/msg':>10} {'encode ops/s':>14} {'decode ops/s':>14}")
+    for name, size, encode_rate, decode_rate in rows:
+        print(f"{name:<26} {size:>10} {encode_rate:>14,.0f} {decode_rate:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
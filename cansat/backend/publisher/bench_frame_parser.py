@@ -0,0 +1,190 @@
+"""Benchmark y fuzz del parser de tramas de radio (codec.RX_FRAME) contra el parser anterior.
+
+Uso:
+    python bench_frame_parser.py [--frames 200000] [--fuzz 100000] [--seed 1]
+
+Benchmark: tramas/s del parser anterior de publisher_rx (split + try por campo + dict) y
+de RX_FRAME.parse, para tramas completas, incompletas y con basura.
+
+Fuzz: muta tramas válidas (bytes cambiados, truncadas, separadores extra, campos vacíos,
+caracteres fuera de ASCII) y verifica que RX_FRAME.parse nunca lance, que devuelva None o
+un TelemetryFrame con tipos correctos y que el resultado sea el mismo que el del parser
+anterior (salvo el grupo GPS, que ahora es todo-o-nada).
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+import codec
+
+def legacy_parse_data(raw_data):
+    """Parser anterior de DataPublisherRX.parse_data (sin prints)"""
+    try:
+        if not raw_data or raw_data == "None":
+            return None
+        raw_data = raw_data.strip()
+        parts = raw_data.split('*')
+        if len(parts) < 3:
+            return None
+        admin_key = parts[0]
+        try:
+            launch_id = int(parts[1])
+        except ValueError:
+            return None
+        try:
+            timestamp = float(parts[2])
+        except ValueError:
+            return None
+        parsed_data = {
+            'admin_key': admin_key,
+            'launch_id': launch_id,
+            'timestamp': timestamp,
+            'received_at': time.time()
+        }
+        if len(parts) > 3:
+            try:
+                temp_str = parts[3].strip()
+                parsed_data['temperature'] = float(temp_str) if temp_str else None
+            except (ValueError, IndexError):
+                parsed_data['temperature'] = None
+            try:
+                hum_str = parts[4].strip()
+                parsed_data['humidity'] = float(hum_str) if hum_str else None
+            except (ValueError, IndexError):
+                parsed_data['humidity'] = None
+        if len(parts) > 7:
+            try:
+                lat_str = parts[5].strip()
+                lon_str = parts[6].strip()
+                alt_str = parts[7].strip()
+                parsed_data['latitude'] = float(lat_str) if lat_str else None
+                parsed_data['longitude'] = float(lon_str) if lon_str else None
+                parsed_data['altitude'] = float(alt_str) if alt_str else None
+            except (ValueError, IndexError):
+                parsed_data['latitude'] = None
+                parsed_data['longitude'] = None
+                parsed_data['altitude'] = None
+        return parsed_data
+    except Exception:
+        return None
+
+def valid_frame(rng):
+    return (f"{rng.choice(['admin', 'k3y'])}*{rng.randint(1, 10000)}*{rng.randint(0, 10**9)}"
+            f"*{rng.uniform(-10, 45):.2f}*{rng.uniform(0, 100):.1f}"
+            f"*{rng.uniform(4, 12):.6f}*{rng.uniform(-79, -67):.6f}*{rng.uniform(0, 5000):.1f}")
+
+GARBAGE = '*-.,eE+ \t\x00\xff0123456789abcNaninfé☃'
+
+def mutate(frame, rng):
+    """Una o varias de las corrupciones típicas de la radio"""
+    chars = list(frame)
+    for _ in range(rng.randint(1, 3)):
+        kind = rng.randrange(6)
+        if kind == 0 and chars:
+            chars[rng.randrange(len(chars))] = rng.choice(GARBAGE)
+        elif kind == 1:
+            chars = chars[:rng.randrange(len(chars) + 1)]
+        elif kind == 2:
+            chars.insert(rng.randrange(len(chars) + 1), '*')
+        elif kind == 3 and chars:
+            del chars[rng.randrange(len(chars))]
+        elif kind == 4:
+            parts = ''.join(chars).split('*')
+            parts[rng.randrange(len(parts))] = ''
+            chars = list('*'.join(parts))
+        else:
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice(GARBAGE))
+    return ''.join(chars)
+
+def same_value(a, b):
+    return a == b or (a != a and b != b)  # NaN == NaN
+
+def check(line):
+    """Propiedades de RX_FRAME.parse para una línea; devuelve la lista de violaciones"""
+    errors = []
+    try:
+        frame = codec.RX_FRAME.parse(line, received_at=1.0)
+    except Exception as e:
+        return [f"raised {type(e).__name__}: {e}"]
+
+    legacy = legacy_parse_data(line)
+    if frame is None:
+        if legacy is not None:
+            errors.append(f"rejected, legacy accepted: {legacy}")
+        return errors
+
+    if not isinstance(frame, codec.TelemetryFrame):
+        return [f"unexpected type {type(frame).__name__}"]
+    if not isinstance(frame.launch_id, int) or not isinstance(frame.timestamp, float):
+        errors.append(f"bad required types: {frame}")
+    for field in codec.OPTIONAL_FIELDS:
+        value = getattr(frame, field)
+        if value is not None and not isinstance(value, float):
+            errors.append(f"{field} is {type(value).__name__}")
+    gps = [getattr(frame, field) for field in codec.GPS_FIELDS]
+    if any(value is None for value in gps) and any(value is not None for value in gps):
+        errors.append(f"partial GPS group: {gps}")
+
+    if legacy is None:
+        errors.append("accepted, legacy rejected")
+    else:
+        if any(legacy.get(field) is None for field in codec.GPS_FIELDS):
+            for field in codec.GPS_FIELDS:
+                legacy[field] = None
+        for field in ('admin_key', 'launch_id', 'timestamp') + codec.OPTIONAL_FIELDS:
+            if not same_value(legacy.get(field), getattr(frame, field)):
+                errors.append(f"{field}: legacy {legacy.get(field)!r} != {getattr(frame, field)!r}")
+    return errors
+
+def fuzz(iterations, rng):
+    failures = 0
+    for _ in range(iterations):
+        line = mutate(valid_frame(rng), rng)
+        errors = check(line)
+        if errors:
+            failures += 1
+            if failures <= 10:
+                print(f"FAIL {line!r}: {'; '.join(errors)}")
+    print(f"fuzz: {iterations} mutated frames, {failures} failures")
+    return failures
+
+def throughput(function, lines, min_seconds):
+    processed = 0
+    started = time.perf_counter()
+    while True:
+        for line in lines:
+            function(line)
+        processed += len(lines)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return processed / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=20000, help='tramas distintas por caso')
+    parser.add_argument('--min-seconds', type=float, default=1.0)
+    parser.add_argument('--fuzz', type=int, default=100000, help='tramas mutadas a verificar (0 = no)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    cases = {
+        'complete': [valid_frame(rng) for _ in range(args.frames)],
+        'no GPS': [valid_frame(rng).rsplit('*', 3)[0] for _ in range(args.frames)],
+        'corrupted': [mutate(valid_frame(rng), rng) for _ in range(args.frames)],
+    }
+
+    print(f"{'case':>10} {'legacy frames/s':>16} {'RX_FRAME frames/s':>18} {'speedup':>8}")
+    for name, lines in cases.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            legacy = throughput(legacy_parse_data, lines, args.min_seconds)
+            parsed = throughput(codec.RX_FRAME.parse, lines, args.min_seconds)
+        print(f"{name:>10} {legacy:>16,.0f} {parsed:>18,.0f} {parsed / legacy:>7.2f}x")
+
+    if args.fuzz:
+        failures = fuzz(args.fuzz, rng)
+        raise SystemExit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark y fuzz de GpsValidator: validate() punto a punto contra validate_batch().
+
+Uso:
+    python bench_gps_validation.py [--points 20000] [--fuzz 2000] [--seed 1]
+
+Benchmark: puntos/s del camino en línea (publisher_rx) y del vectorizado
+(revalidate_gps.py) sobre una trayectoria con ruido y saltos.
+
+Fuzz: genera secuencias con fixes nulos, puntos fuera de la geocerca, saltos y picos de
+altitud (incluidas rachas de rechazos cinemáticos que fuerzan la nueva referencia),
+copias corruptas con el mismo timestamp y puntos fuera de orden, y
+verifica que los dos caminos den el mismo motivo, punto por punto.
+"""
+import argparse
+import random
+import time
+from config import Config
+from gps_validation import GpsValidator
+
+def trajectory(rng, count):
+    """Columnas (timestamps, lat, lon, alt) de un vuelo plausible con fallas típicas del GPS"""
+    timestamps, lats, lons, alts = [], [], [], []
+    timestamp, lat, lon, alt = 0.0, rng.uniform(4.5, 11.5), rng.uniform(-78.5, -67.5), 1500.0
+    for _ in range(count):
+        step = rng.choice((0, 100, 250, 1000, 1000, 1000))  # ms; 0 = timestamp repetido
+        timestamp += step
+        lat += rng.uniform(-1, 1) * step * 1e-6  # hasta ~110 m/s por eje
+        lon += rng.uniform(-1, 1) * step * 1e-6
+        alt = min(max(alt + rng.uniform(-0.1, 0.1) * step, 10.0), 4900.0)
+        point = [timestamp, lat, lon, alt]
+
+        kind = rng.randrange(20)
+        if kind == 0:
+            point[1:] = [0.0, 0.0, 0.0]
+        elif kind == 1:
+            point[1] = rng.uniform(-30, 30)  # fuera del rectángulo o del polígono
+        elif kind == 2:
+            point[3] = rng.uniform(-100, 6000)
+        elif kind in (3, 4):
+            point[3] += rng.choice((-1, 1)) * rng.uniform(500, 2000)  # pico de altitud
+        elif kind == 6 and timestamps:
+            # Copia corrupta de otra estación con el timestamp de la trama anterior
+            point[0] = timestamps[-1]
+            point[1] += rng.uniform(-0.01, 0.01)
+        elif kind == 7 and timestamps:
+            point[0] = timestamps[-1] - rng.choice((100, 1000))  # fuera de orden
+        elif kind == 5:
+            # Salto real de la trayectoria: rechazos seguidos hasta que se re-ancla
+            lat = min(max(lat + rng.uniform(-0.5, 0.5), 4.5), 11.5)
+            lon = min(max(lon + rng.uniform(-0.5, 0.5), -78.5), -67.5)
+            point[1:3] = [lat, lon]
+
+        timestamps.append(point[0])
+        lats.append(point[1])
+        lons.append(point[2])
+        alts.append(point[3])
+    return timestamps, lats, lons, alts
+
+def validate_online(validator, launch_id, columns):
+    return [validator.validate(launch_id, *point) for point in zip(*columns)]
+
+def fuzz(validator, iterations, rng):
+    failures = 0
+    for iteration in range(iterations):
+        columns = trajectory(rng, rng.randint(1, 200))
+        online = validate_online(validator, iteration, columns)
+        validator.forget(iteration)
+        batch = list(validator.validate_batch(*columns))
+        if online != batch:
+            failures += 1
+            if failures <= 10:
+                index = next(i for i, (a, b) in enumerate(zip(online, batch)) if a != b)
+                print(f"FAIL sequence {iteration} point {index}: online {online[index]!r} != batch {batch[index]!r}")
+    print(f"fuzz: {iterations} sequences, {failures} mismatches")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--fuzz', type=int, default=2000, help='secuencias a comparar (0 = no)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    validator = GpsValidator.from_config(Config())
+
+    columns = trajectory(rng, args.points)
+    # Calentamiento: validate_batch importa numpy en la primera llamada
+    validator.validate_batch(*(column[:100] for column in columns))
+    started = time.perf_counter()
+    online = validate_online(validator, -1, columns)
+    online_rate = args.points / (time.perf_counter() - started)
+    validator.forget(-1)
+    started = time.perf_counter()
+    validator.validate_batch(*columns)
+    batch_rate = args.points / (time.perf_counter() - started)
+    rejected = sum(reason is not None for reason in online)
+    print(f"{args.points} points, {rejected} rejected: validate {online_rate:,.0f} points/s, "
+          f"validate_batch {batch_rate:,.0f} points/s")
+
+    if args.fuzz:
+        failures = fuzz(validator, args.fuzz, rng)
+        raise SystemExit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark del cifrado XOR: implementación anterior (result += chr(...)) vs xor_cipher.
+
+Uso:
+    python bench_xor_cipher.py
+
+Mide tamaños de 16 B a 1 MB y reporta MB/s de cada variante.
+"""
+import argparse
+import os
+import time
+import xor_cipher
+
+SIZES = [16, 64, 256, 1024, 16 * 1024, 256 * 1024, 1024 * 1024]
+
+def legacy_cypher_xor(text):
+    result = ""
+    for i, char in enumerate(text):
+        result += chr(ord(char) ^ xor_cipher.XOR_KEYS[i % 4])
+    return result
+
+def throughput(function, payload, min_seconds):
+    """MB/s repitiendo la función al menos min_seconds"""
+    iterations = 0
+    started = time.perf_counter()
+    while True:
+        function(payload)
+        iterations += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return iterations * len(payload) / elapsed / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--min-seconds', type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'legacy str MB/s':>16} {'xor_text MB/s':>14} {'xor_bytes MB/s':>15}")
+    for size in SIZES:
+        data = os.urandom(size)
+        text = data.decode('latin-1')
+        assert xor_cipher.xor_text(text) == legacy_cypher_xor(text)
+
+        legacy = throughput(legacy_cypher_xor, text, args.min_seconds)
+        fast_text = throughput(xor_cipher.xor_text, text, args.min_seconds)
+        fast_bytes = throughput(xor_cipher.xor_bytes, data, args.min_seconds)
+        print(f"{size:>10} {legacy:>16.2f} {fast_text:>14.2f} {fast_bytes:>15.2f}")
+
+if __name__ == "__main__":
+    main()
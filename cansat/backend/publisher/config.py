@@ -12,3 +12,43 @@ class Config:
     ADMIN_KEY = os.getenv('ADMIN_KEY')
     REDIS_CHANNEL = os.getenv('REDIS_CHANNEL')
     API_BASE_URL = os.getenv('API_BASE_URL')
+
+    # Ingesta RX: 'event' (bloquea en bytes entrantes) o 'poll' (lectura + sleep fijo)
+    RX_INGEST_MODE = os.getenv('RX_INGEST_MODE', 'event')
+    RX_EXPIRY_CHECK_INTERVAL = float(os.getenv('RX_EXPIRY_CHECK_INTERVAL', 1))
+
+    # Formato del mensaje en Redis: 'binary' (codec.py v1) o 'dict' (str(dict) anterior)
+    WIRE_FORMAT = os.getenv('WIRE_FORMAT', 'binary')
+
+    # Transporte Redis: 'pubsub' (canal) o 'stream' (XADD con MAXLEN)
+    REDIS_TRANSPORT = os.getenv('REDIS_TRANSPORT', 'pubsub')
+    REDIS_STREAM = os.getenv('REDIS_STREAM', os.getenv('REDIS_CHANNEL'))
+    REDIS_STREAM_MAXLEN = int(os.getenv('REDIS_STREAM_MAXLEN', 100000))
+
+    # Varias estaciones terrenas: puertos RX separados por coma (por defecto solo SERIAL_PORT_RX).
+    # Las copias de una trama (launch_id, timestamp) se unen dentro de RX_DEDUP_WINDOW_MS
+    SERIAL_PORTS_RX = [
+        port.strip() for port in os.getenv('SERIAL_PORTS_RX', os.getenv('SERIAL_PORT_RX') or '').split(',')
+        if port.strip()
+    ]
+    RX_DEDUP_WINDOW_MS = int(os.getenv('RX_DEDUP_WINDOW_MS', 250))
+    RX_STATION_STATS_INTERVAL = float(os.getenv('RX_STATION_STATS_INTERVAL', 60))
+
+    # Segundos que un lanzamiento terminado sigue en memoria (por si se reanuda) antes de descartarlo
+    RX_EVICT_GRACE_SECONDS = float(os.getenv('RX_EVICT_GRACE_SECONDS', 300))
+
+    # Validación GPS: geocerca como JSON [[lat, lon], ...] o ruta a un archivo con ese JSON
+    # (por defecto el rectángulo de Colombia), rango de altitud y límites cinemáticos en m/s.
+    # Tras GPS_KINEMATIC_RESET rechazos cinemáticos seguidos se toma el punto como nueva referencia
+    GPS_GEOFENCE = os.getenv('GPS_GEOFENCE', '[[4.0, -79.0], [4.0, -67.0], [12.0, -67.0], [12.0, -79.0]]')
+    GPS_MIN_ALTITUDE = float(os.getenv('GPS_MIN_ALTITUDE', 0))
+    GPS_MAX_ALTITUDE = float(os.getenv('GPS_MAX_ALTITUDE', 5000))
+    GPS_MAX_SPEED = float(os.getenv('GPS_MAX_SPEED', 350))
+    GPS_MAX_CLIMB_RATE = float(os.getenv('GPS_MAX_CLIMB_RATE', 300))
+    GPS_KINEMATIC_RESET = int(os.getenv('GPS_KINEMATIC_RESET', 3))
+
+    # TX: launch_id reservados de antemano en la API para responder al CANSAT sin esperar red.
+    # Se rellena en segundo plano al bajar de TX_ID_POOL_LOW_WATER; 0 desactiva el pool
+    TX_ID_POOL_SIZE = int(os.getenv('TX_ID_POOL_SIZE', 5))
+    TX_ID_POOL_LOW_WATER = int(os.getenv('TX_ID_POOL_LOW_WATER', 2))
+    TX_API_TIMEOUT = float(os.getenv('TX_API_TIMEOUT', 5))
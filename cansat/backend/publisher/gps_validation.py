@@ -0,0 +1,257 @@
+"""Validación de posiciones GPS: geocerca poligonal, rango de altitud y chequeo cinemático.
+
+Este archivo existe en publisher/ y subscriber/ (cada servicio se construye por separado):
+cualquier cambio debe hacerse en ambas copias.
+
+GpsValidator.validate() revisa un punto en línea (publisher_rx) y devuelve el motivo de
+rechazo o None; con varias estaciones se separa en validate_point() por estación y
+validate_motion() una vez por trama deduplicada. validate_batch() hace lo mismo para los
+arrays de un lanzamiento guardado (revalidate_gps.py): los chequeos por punto se
+vectorizan con numpy y el cinemático, que depende del último punto aceptado, recorre
+solo los puntos que pasaron los anteriores.
+
+Motivos de rechazo (REASONS), en el orden en que se evalúan:
+    null_fix   lat/lon/alt en 0 o casi 0 (el módulo GPS sin fix)
+    altitude   fuera de [min_altitude, max_altitude]
+    bbox       fuera del rectángulo que contiene a la geocerca (prefiltro barato)
+    polygon    dentro del rectángulo pero fuera del polígono
+    speed      velocidad horizontal respecto del último punto aceptado mayor a max_speed
+    climb      velocidad vertical mayor a max_climb_rate
+"""
+import json
+import math
+import os
+import threading
+from collections import Counter
+
+REASONS = ('null_fix', 'altitude', 'bbox', 'polygon', 'speed', 'climb')
+EARTH_RADIUS_M = 6371000.0
+
+def load_polygon(value):
+    """Polígono [[lat, lon], ...] desde JSON o desde la ruta a un archivo JSON"""
+    if os.path.isfile(value):
+        with open(value) as f:
+            value = f.read()
+    points = [(float(lat), float(lon)) for lat, lon in json.loads(value)]
+    if len(points) < 3:
+        raise ValueError("Geofence polygon needs at least 3 points")
+    return points
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+class Geofence:
+    """Polígono (lat, lon) con su rectángulo contenedor precalculado. Si el polígono es
+    el propio rectángulo no hace falta el test punto-en-polígono."""
+
+    def __init__(self, polygon):
+        self.polygon = polygon
+        lats = [lat for lat, _ in polygon]
+        lons = [lon for _, lon in polygon]
+        self.min_lat, self.max_lat = min(lats), max(lats)
+        self.min_lon, self.max_lon = min(lons), max(lons)
+        corners = {(lat, lon) for lat in (self.min_lat, self.max_lat) for lon in (self.min_lon, self.max_lon)}
+        self.is_rectangle = len(polygon) == 4 and set(polygon) == corners
+        # Aristas (lat1, lon1, lat2, lon2) para el ray casting
+        self.edges = [polygon[i] + polygon[(i + 1) % len(polygon)] for i in range(len(polygon))]
+
+    def in_bbox(self, lat, lon):
+        return self.min_lat <= lat <= self.max_lat and self.min_lon <= lon <= self.max_lon
+
+    def in_polygon(self, lat, lon):
+        """Ray casting sobre la longitud (se asume que el punto ya pasó in_bbox)"""
+        if self.is_rectangle:
+            return True
+        inside = False
+        for lat1, lon1, lat2, lon2 in self.edges:
+            if (lat1 > lat) != (lat2 > lat):
+                crossing = lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+                if lon < crossing:
+                    inside = not inside
+        return inside
+
+    def in_polygon_batch(self, lat, lon):
+        """in_polygon vectorizado sobre arrays numpy (una pasada por arista)"""
+        import numpy as np
+        if self.is_rectangle:
+            return np.ones(lat.shape, dtype=bool)
+        inside = np.zeros(lat.shape, dtype=bool)
+        for lat1, lon1, lat2, lon2 in self.edges:
+            if lat1 == lat2:
+                continue
+            straddles = (lat1 > lat) != (lat2 > lat)
+            crossing = lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+            inside ^= straddles & (lon < crossing)
+        return inside
+
+class GpsValidator:
+    """Etapa de validación GPS con estado por lanzamiento (último punto aceptado) y
+    contador de rechazos por motivo.
+
+    El chequeo cinemático compara con el último punto aceptado; tras reset_after
+    rechazos cinemáticos seguidos el punto actual se acepta y pasa a ser la nueva
+    referencia, para no quedar trabado si la referencia era la que estaba mal. Con el
+    mismo timestamp que la referencia solo se acepta una copia idéntica, y un punto
+    fuera de orden nunca pasa a ser la referencia.
+    """
+
+    def __init__(self, geofence, min_altitude=0.0, max_altitude=5000.0,
+                 max_speed=350.0, max_climb_rate=300.0, reset_after=3, timestamp_scale=0.001):
+        self.geofence = geofence
+        self.min_altitude = min_altitude
+        self.max_altitude = max_altitude
+        self.max_speed = max_speed
+        self.max_climb_rate = max_climb_rate
+        self.reset_after = reset_after
+        self.timestamp_scale = timestamp_scale  # unidades de timestamp -> segundos (millis del Arduino)
+        self.launches = {}  # launch_id -> {'fix': (ts, lat, lon, alt), 'rejected': n, 'rejections': Counter}
+        self.rejections = Counter()
+        # Con varias estaciones cada una valida desde su propio hilo
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            Geofence(load_polygon(config.GPS_GEOFENCE)),
+            min_altitude=config.GPS_MIN_ALTITUDE,
+            max_altitude=config.GPS_MAX_ALTITUDE,
+            max_speed=config.GPS_MAX_SPEED,
+            max_climb_rate=config.GPS_MAX_CLIMB_RATE,
+            reset_after=config.GPS_KINEMATIC_RESET
+        )
+
+    def check_point(self, lat, lon, alt):
+        """Chequeos que no dependen de puntos anteriores; motivo de rechazo o None"""
+        if lat == 0.0 or lon == 0.0 or alt == 0.0 or abs(lat) < 0.1 or abs(lon) < 0.1:
+            return 'null_fix'
+        if not (self.min_altitude <= alt <= self.max_altitude):
+            return 'altitude'
+        if not self.geofence.in_bbox(lat, lon):
+            return 'bbox'
+        if not self.geofence.in_polygon(lat, lon):
+            return 'polygon'
+        return None
+
+    def check_motion(self, state, timestamp, lat, lon, alt):
+        """Chequeo cinemático contra el último punto aceptado del lanzamiento"""
+        previous = state.get('fix')
+        if previous is None or timestamp is None:
+            return None
+        elapsed = (timestamp - previous[0]) * self.timestamp_scale
+        if elapsed == 0:
+            # Mismo timestamp: solo vale una copia idéntica (la misma trama por otra estación)
+            if lat != previous[1] or lon != previous[2]:
+                return 'speed'
+            if alt != previous[3]:
+                return 'climb'
+            return None
+        if elapsed < 0:
+            return None  # fuera de orden: no hay velocidad que medir
+        if haversine_m(previous[1], previous[2], lat, lon) / elapsed > self.max_speed:
+            return 'speed'
+        if abs(alt - previous[3]) / elapsed > self.max_climb_rate:
+            return 'climb'
+        return None
+
+    def _advance(self, state, timestamp, lat, lon, alt):
+        """Paso cinemático sobre el estado de un lanzamiento: motivo de rechazo o None.
+        Solo un punto posterior a la referencia puede reemplazarla o contar para reset_after"""
+        reason = self.check_motion(state, timestamp, lat, lon, alt)
+        previous = state['fix']
+        if timestamp is None or (previous is not None and timestamp <= previous[0]):
+            return reason
+        if reason is None or state['rejected'] + 1 >= self.reset_after:
+            # Nueva referencia: el punto se acepta
+            state['fix'] = (timestamp, lat, lon, alt)
+            state['rejected'] = 0
+            return None
+        state['rejected'] += 1
+        return reason
+
+    def _state(self, launch_id):
+        state = self.launches.get(launch_id)
+        if state is None:
+            state = self.launches[launch_id] = {'fix': None, 'rejected': 0, 'rejections': Counter()}
+        return state
+
+    def _count(self, state, reason):
+        state['rejections'][reason] += 1
+        self.rejections[reason] += 1
+
+    def validate_point(self, launch_id, lat, lon, alt):
+        """Solo los chequeos sin estado (check_point), contando el rechazo. Es seguro correrlo
+        por estación, antes de unir las copias de una trama"""
+        reason = self.check_point(lat, lon, alt)
+        if reason is not None:
+            with self.lock:
+                self._count(self._state(launch_id), reason)
+        return reason
+
+    def validate_motion(self, launch_id, timestamp, lat, lon, alt):
+        """Solo el chequeo cinemático, que actualiza la referencia del lanzamiento: una vez
+        por trama (con varias estaciones, después de deduplicar)"""
+        with self.lock:
+            state = self._state(launch_id)
+            reason = self._advance(state, timestamp, lat, lon, alt)
+            if reason is not None:
+                self._count(state, reason)
+        return reason
+
+    def validate(self, launch_id, timestamp, lat, lon, alt):
+        """Valida un punto y actualiza el estado del lanzamiento. Devuelve el motivo de rechazo o None"""
+        reason = self.validate_point(launch_id, lat, lon, alt)
+        if reason is None:
+            reason = self.validate_motion(launch_id, timestamp, lat, lon, alt)
+        return reason
+
+    def launch_rejections(self, launch_id):
+        with self.lock:
+            state = self.launches.get(launch_id)
+            return dict(state['rejections']) if state else {}
+
+    def forget(self, launch_id):
+        """Descarta el estado de un lanzamiento sacado de memoria"""
+        with self.lock:
+            self.launches.pop(launch_id, None)
+
+    def validate_batch(self, timestamps, lat, lon, alt):
+        """Motivo de rechazo (o None) por punto para los arrays de un lanzamiento ordenados
+        por timestamp. No toca el estado en línea ni self.rejections"""
+        import numpy as np
+        timestamps, lat, lon, alt = (np.asarray(values, dtype=np.float64) for values in (timestamps, lat, lon, alt))
+        reasons = np.full(lat.shape, None, dtype=object)
+
+        pending = np.ones(lat.shape, dtype=bool)
+        geofence = self.geofence
+        static_checks = (
+            ('null_fix', (lat == 0) | (lon == 0) | (alt == 0) | (np.abs(lat) < 0.1) | (np.abs(lon) < 0.1)),
+            ('altitude', (alt < self.min_altitude) | (alt > self.max_altitude)),
+            ('bbox', (lat < geofence.min_lat) | (lat > geofence.max_lat) |
+                     (lon < geofence.min_lon) | (lon > geofence.max_lon)),
+        )
+        for reason, rejected in static_checks:
+            reasons[pending & rejected] = reason
+            pending &= ~rejected
+
+        # Polígono solo para los que pasaron el prefiltro del rectángulo
+        candidates = np.flatnonzero(pending)
+        outside = ~geofence.in_polygon_batch(lat[candidates], lon[candidates])
+        reasons[candidates[outside]] = 'polygon'
+        pending[candidates[outside]] = False
+
+        # El cinemático depende del último aceptado: mismo algoritmo que en línea, sobre
+        # listas de floats (indexar arrays numpy elemento a elemento es mucho más lento)
+        state = {'fix': None, 'rejected': 0}
+        candidates = np.flatnonzero(pending)
+        advance = self._advance
+        kinematic = [
+            advance(state, *point) for point in zip(
+                timestamps[candidates].tolist(), lat[candidates].tolist(),
+                lon[candidates].tolist(), alt[candidates].tolist()
+            )
+        ]
+        reasons[candidates] = np.array(kinematic, dtype=object)
+        return reasons
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+import requests
+
+class LaunchIdPool:
+    """Bloque de launch_id reservados de antemano en la API (POST /cansat_req_id?count=N),
+    para responder la solicitud de ID del CANSAT sin red en el camino crítico.
+
+    Un hilo de fondo mantiene el pool en size ids: rellena cuando quedan menos de
+    low_water, reintentando con backoff si la API no responde. Todas las llamadas usan una
+    requests.Session (conexión keep-alive). close() devuelve a la API los ids no usados.
+    """
+
+    RETRY_SECONDS = 5
+
+    def __init__(self, base_url, size=5, low_water=2, timeout=5):
+        self.base_url = base_url
+        self.size = size
+        self.low_water = low_water
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.ids = deque()
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.refill_loop, daemon=True)
+        self.thread.start()
+
+    def lease(self, count):
+        """Reserva count ids en la API; lista vacía si falla"""
+        try:
+            response = self.session.post(
+                f"{self.base_url}/cansat_req_id", params={'count': count}, timeout=self.timeout
+            )
+            if response.status_code == 200:
+                return response.json().get('assigned_ids') or []
+            print(f"API error leasing launch IDs: {response.status_code}")
+        except Exception as e:
+            print(f"Error leasing launch IDs: {e}")
+        return []
+
+    def refill_loop(self):
+        while True:
+            with self.condition:
+                while not self.stop_event.is_set() and len(self.ids) >= self.low_water:
+                    self.condition.wait()
+                if self.stop_event.is_set():
+                    return
+                missing = self.size - len(self.ids)
+
+            launch_ids = self.lease(missing)
+            with self.condition:
+                stopped = self.stop_event.is_set()
+                if not stopped:
+                    self.ids.extend(launch_ids)
+                    self.condition.notify_all()
+            if stopped:
+                # close() ya devolvió lo que había: estos también vuelven
+                self.release(launch_ids)
+                return
+            if not launch_ids:
+                # Backoff que take() no interrumpe; close() sí
+                self.stop_event.wait(self.RETRY_SECONDS)
+
+    def take(self, timeout=None):
+        """Saca un id del pool; si está vacío espera al relleno hasta timeout. None si no hay"""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self.condition:
+            while not self.ids:
+                remaining = deadline - time.monotonic()
+                if self.stop_event.is_set() or remaining <= 0:
+                    return None
+                self.condition.notify_all()
+                self.condition.wait(remaining)
+            launch_id = self.ids.popleft()
+            if len(self.ids) < self.low_water:
+                self.condition.notify_all()
+            return launch_id
+
+    def release(self, launch_ids):
+        """Devuelve ids no usados a la API (solo borra los lanzamientos que siguen vacíos)"""
+        if not launch_ids:
+            return
+        try:
+            response = self.session.post(
+                f"{self.base_url}/cansat_req_id/release", json={'launch_ids': list(launch_ids)}, timeout=self.timeout
+            )
+            if response.status_code == 200:
+                print(f"Released {response.json().get('released')} unused launch IDs: {list(launch_ids)}")
+            else:
+                print(f"API error releasing launch IDs {list(launch_ids)}: {response.status_code}")
+        except Exception as e:
+            print(f"Error releasing launch IDs {list(launch_ids)}: {e}")
+
+    def close(self):
+        """Detiene el relleno y concilia con la API los ids que quedaron sin usar"""
+        with self.condition:
+            self.stop_event.set()
+            unused = list(self.ids)
+            self.ids.clear()
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(self.timeout)
+        self.release(unused)
+        self.session.close()
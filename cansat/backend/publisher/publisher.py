@@ -1,6 +1,7 @@
 import time
 import redis
 import requests
+import codec
 from receiver import Receiver
 from config import Config
 
@@ -61,58 +62,9 @@ class DataPublisher:
             return False
     
     def parse_data(self, raw_data):
-        """Parse data from format: admin_key-launch_id-action-timestamp-temp-hum-lat-lon-alt"""
-        try:
-            if not raw_data or raw_data == "None":
-                return None
-                
-            parts = raw_data.split('-')
-            
-            if len(parts) < 4:
-                return None
-                
-            admin_key = parts[0]
-            launch_id = int(parts[1])
-            action = parts[2]
-            timestamp = float(parts[3])
-            
-            parsed_data = {
-                'admin_key': admin_key,
-                'launch_id': launch_id,
-                'action': action,
-                'timestamp': timestamp,
-                'received_at': time.time()
-            }
-            
-            # Agregar datos de sensores si están disponibles
-            if len(parts) > 4:
-                try:
-                    parsed_data['temperature'] = float(parts[4])
-                except (ValueError, IndexError):
-                    parsed_data['temperature'] = None
-                
-                try:
-                    parsed_data['humidity'] = float(parts[5])
-                except (ValueError, IndexError):
-                    parsed_data['humidity'] = None
-            
-            # Agregar datos GPS si están disponibles (partes 6, 7, 8)
-            if len(parts) > 8:
-                try:
-                    parsed_data['latitude'] = float(parts[6])
-                    parsed_data['longitude'] = float(parts[7])
-                    parsed_data['altitude'] = float(parts[8])
-                except (ValueError, IndexError):
-                    # Si hay error en GPS, establecer como None
-                    parsed_data['latitude'] = None
-                    parsed_data['longitude'] = None
-                    parsed_data['altitude'] = None
-            
-            return parsed_data
-            
-        except Exception as e:
-            print(f"Error parsing data: {e}")
-            return None
+        """Parse data from format: admin_key-launch_id-action-timestamp-temp-hum-lat-lon-alt.
+        Devuelve un codec.TelemetryFrame o None si la trama no es válida"""
+        return codec.DASH_FRAME.parse(raw_data)
     
     def handle_id_request(self):
         """Maneja solicitud de ID del CANSAT"""
@@ -143,11 +95,11 @@ class DataPublisher:
                     parsed_data = self.parse_data(raw_data)
                     if parsed_data:
                         # Validar admin key
-                        if parsed_data['admin_key'] == self.config.ADMIN_KEY:
+                        if parsed_data.admin_key == self.config.ADMIN_KEY:
                             # Publicar a Redis
                             self.redis_client.publish(
                                 self.config.REDIS_CHANNEL, 
-                                str(parsed_data)
+                                str(parsed_data._asdict())
                             )
                             print(f"Published: {parsed_data}")
                         else:
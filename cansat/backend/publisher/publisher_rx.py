@@ -1,6 +1,11 @@
 import time
+import heapq
+import threading
 import redis
+import codec
 from receiver import Receiver
+from station_merge import FrameDeduplicator
+from gps_validation import GpsValidator
 from config import Config
 
 class DataPublisherRX:
@@ -9,7 +14,16 @@ class DataPublisherRX:
     
     def __init__(self):
         self.config = Config()
-        self.receiver = Receiver(self.config.SERIAL_PORT_RX, self.config.BAUDRATE)
+        # Una estación terrena por puerto; self.receiver es la primera (modo de una sola estación)
+        self.receivers = {
+            port: Receiver(port, self.config.BAUDRATE)
+            for port in self.config.SERIAL_PORTS_RX or [self.config.SERIAL_PORT_RX]
+        }
+        self.receiver = next(iter(self.receivers.values()))
+        # El modo multi-estación depende de los puertos configurados, no de los que abran al arrancar
+        self.multi_station = len(self.receivers) > 1
+        self.deduplicator = FrameDeduplicator(self.config.RX_DEDUP_WINDOW_MS / 1000)
+        self.gps_validator = GpsValidator.from_config(self.config)
         self.redis_client = redis.Redis(
             host=self.config.REDIS_HOST,
             port=self.config.REDIS_PORT,
@@ -18,13 +32,25 @@ class DataPublisherRX:
         
         # Track de lanzamientos activos
         self.active_launches = {}
+        # Protege active_launches: el chequeo de timeouts corre en su propio hilo en modo 'event'
+        self.launches_lock = threading.Lock()
+        # Min-heap de (vencimiento, launch_id, tipo): 'expire' al pasar END_TIMEOUT sin paquetes,
+        # 'evict' para sacar de memoria un lanzamiento terminado tras RX_EVICT_GRACE_SECONDS
+        self.expiry_heap = []
+        self.stop_event = threading.Event()
         
-        print(f"RX - Port: {self.config.SERIAL_PORT_RX}, Baudrate: {self.config.BAUDRATE}")
+        print(f"RX - Ports: {', '.join(self.receivers)}, Baudrate: {self.config.BAUDRATE}, Mode: {self.config.RX_INGEST_MODE}")
     
     def connect(self):
-        if not self.receiver.connect():
-            print("Failed to connect to serial port")
-            return False
+        # Con varias estaciones los puertos que no abren quedan configurados:
+        # station_reader() reintenta connect() hasta que la estación aparezca
+        for port, receiver in self.receivers.items():
+            if receiver.connect():
+                continue
+            if not self.multi_station:
+                print("Failed to connect to serial port")
+                return False
+            print(f"Station {port} unavailable, retrying in background")
         
         try:
             self.redis_client.ping()
@@ -34,123 +60,69 @@ class DataPublisherRX:
             print("Failed to connect to Redis")
             return False
     
-    def has_valid_gps_data(self, parsed_data):
-        """Verifica si los datos GPS son válidos (no cero o valores corruptos)"""
-        # Si no hay datos GPS en el paquete, considerar como válido
-        if 'latitude' not in parsed_data or 'longitude' not in parsed_data or 'altitude' not in parsed_data:
-            return True
-            
-        # Obtener valores GPS
-        latitude = parsed_data.get('latitude')
-        longitude = parsed_data.get('longitude')
-        altitude = parsed_data.get('altitude')
+    def has_valid_gps_data(self, parsed_data, kinematic=True):
+        """Verifica los datos GPS con la geocerca y el chequeo cinemático (ver gps_validation.py).
+        Con kinematic=False solo los chequeos sin estado: con varias estaciones el cinemático
+        se hace una vez por trama deduplicada (has_valid_motion)"""
+        # Obtener valores GPS (None si no vinieron en el paquete)
+        latitude = parsed_data.latitude
+        longitude = parsed_data.longitude
+        altitude = parsed_data.altitude
         
         # Si alguno de los valores es None, considerar como válido (puede ser que no llegaron los datos)
         if latitude is None or longitude is None or altitude is None:
             return True
         
-        # Verificar valores corruptos:
-        # 1. Valores exactamente 0.0
-        # 2. Valores muy pequeños (como 0.016667, 0.017333 que son corruptos)
-        # 3. Valores fuera de rangos realistas para coordenadas GPS
-        
-        # Rangos realistas para Colombia (ajustar según tu ubicación)
-        MIN_LAT = 4.0   # Latitud mínima para Colombia
-        MAX_LAT = 12.0  # Latitud máxima para Colombia  
-        MIN_LON = -79.0 # Longitud mínima para Colombia
-        MAX_LON = -67.0 # Longitud máxima para Colombia
-        MIN_ALT = 0.0   # Altitud mínima (nivel del mar)
-        MAX_ALT = 5000.0 # Altitud máxima realista
-        
-        # Verificar si los valores están fuera de rangos realistas
-        if (latitude == 0.0 or longitude == 0.0 or altitude == 0.0 or
-            abs(latitude) < 0.1 or abs(longitude) < 0.1 or  # Valores muy pequeños
-            not (MIN_LAT <= latitude <= MAX_LAT) or
-            not (MIN_LON <= longitude <= MAX_LON) or
-            not (MIN_ALT <= altitude <= MAX_ALT)):
-            
-            print(f"Paquete GPS corrupto detectado - lat: {latitude}, lon: {longitude}, alt: {altitude}")
+        if kinematic:
+            reason = self.gps_validator.validate(
+                parsed_data.launch_id, parsed_data.timestamp, latitude, longitude, altitude
+            )
+        else:
+            reason = self.gps_validator.validate_point(parsed_data.launch_id, latitude, longitude, altitude)
+        if reason is not None:
+            print(f"Paquete GPS corrupto detectado ({reason}) - lat: {latitude}, lon: {longitude}, alt: {altitude}")
             return False
             
         return True
     
+    def has_valid_motion(self, parsed_data):
+        """Chequeo cinemático de una trama ya deduplicada (modo multi-estación)"""
+        if parsed_data.latitude is None or parsed_data.longitude is None or parsed_data.altitude is None:
+            return True
+        
+        reason = self.gps_validator.validate_motion(
+            parsed_data.launch_id, parsed_data.timestamp,
+            parsed_data.latitude, parsed_data.longitude, parsed_data.altitude
+        )
+        if reason is not None:
+            print(f"Paquete GPS corrupto detectado ({reason}) - launch_id {parsed_data.launch_id}, "
+                  f"timestamp {parsed_data.timestamp}")
+            return False
+        return True
+    
+    def print_gps_stats(self, launch_id=None):
+        """Rechazos GPS por motivo, de un lanzamiento o totales"""
+        if launch_id is None:
+            rejections = dict(self.gps_validator.rejections)
+            label = "total"
+        else:
+            rejections = self.gps_validator.launch_rejections(launch_id)
+            label = f"launch {launch_id}"
+        if rejections:
+            summary = ', '.join(f"{reason}={count}" for reason, count in sorted(rejections.items()))
+            print(f"GPS rejections ({label}): {summary}")
+    
     def parse_data(self, raw_data):
-        """Parse data from format: admin_key-launch_id-timestamp-temp-hum-lat-lon-alt"""
-        try:
-            if not raw_data or raw_data == "None":
-                return None
-                
-            # Limpiar el raw_data de caracteres extraños
-            raw_data = raw_data.strip()
-            
-            parts = raw_data.split('*')
-            
-            if len(parts) < 3:
-                print(f"Datos insuficientes: {raw_data}")
-                return None
-                
-            admin_key = parts[0]
-            
-            # Validar que el launch_id sea numérico
-            try:
-                launch_id = int(parts[1])
-            except ValueError:
-                print(f"Launch_id inválido: {parts[1]}")
-                return None
-                
-            # Validar que el timestamp sea numérico
-            try:
-                timestamp = float(parts[2])
-            except ValueError:
-                print(f"Timestamp inválido: {parts[2]}")
-                return None
-            
-            parsed_data = {
-                'admin_key': admin_key,
-                'launch_id': launch_id,
-                'timestamp': timestamp,
-                'received_at': time.time()
-            }
-            
-            # Agregar datos de sensores si están disponibles
-            if len(parts) > 3:
-                try:
-                    temp_str = parts[3].strip()
-                    parsed_data['temperature'] = float(temp_str) if temp_str else None
-                except (ValueError, IndexError):
-                    parsed_data['temperature'] = None
-                
-                try:
-                    hum_str = parts[4].strip()
-                    parsed_data['humidity'] = float(hum_str) if hum_str else None
-                except (ValueError, IndexError):
-                    parsed_data['humidity'] = None
-            
-            # Agregar datos GPS si están disponibles (partes 5, 6, 7)
-            if len(parts) > 7:
-                try:
-                    lat_str = parts[5].strip()
-                    lon_str = parts[6].strip()
-                    alt_str = parts[7].strip()
-                    
-                    # Solo convertir si los strings no están vacíos
-                    parsed_data['latitude'] = float(lat_str) if lat_str else None
-                    parsed_data['longitude'] = float(lon_str) if lon_str else None
-                    parsed_data['altitude'] = float(alt_str) if alt_str else None
-                except (ValueError, IndexError) as e:
-                    print(f"Error convirtiendo datos GPS: {e}")
-                    parsed_data['latitude'] = None
-                    parsed_data['longitude'] = None
-                    parsed_data['altitude'] = None
-            
-            return parsed_data
-            
-        except Exception as e:
-            print(f"Error parsing data: {e} - Raw: {raw_data}")
-            return None
+        """Parse data from format: admin_key*launch_id*timestamp*temp*hum*lat*lon*alt.
+        Devuelve un codec.TelemetryFrame o None si la trama no es válida"""
+        return codec.RX_FRAME.parse(raw_data)
     
     def determine_action(self, launch_id, current_time):
         """Determina la acción basada en el estado del lanzamiento"""
+        with self.launches_lock:
+            return self._determine_action(launch_id, current_time)
+    
+    def _determine_action(self, launch_id, current_time):
         if launch_id not in self.active_launches:
             # Primer paquete de este lanzamiento
             self.active_launches[launch_id] = {
@@ -159,6 +131,7 @@ class DataPublisherRX:
                 'packet_count': 1,
                 'state': 'started'
             }
+            heapq.heappush(self.expiry_heap, (current_time + self.END_TIMEOUT, launch_id, 'expire'))
             return 'start'
         else:
             # Actualizar timestamp del último paquete
@@ -168,37 +141,79 @@ class DataPublisherRX:
             # Si ya estaba en estado 'ended', cambiar a 'launch' (reinicio)
             if self.active_launches[launch_id]['state'] == 'ended':
                 self.active_launches[launch_id]['state'] = 'running'
+                heapq.heappush(self.expiry_heap, (current_time + self.END_TIMEOUT, launch_id, 'expire'))
                 return 'start'  # O 'launch' dependiendo de tu lógica
             
             return 'launch'
     
     def check_for_ended_launches(self, current_time):
-        """Verifica si algún lanzamiento ha terminado por timeout"""
+        """Verifica si algún lanzamiento ha terminado por timeout y saca de memoria los
+        terminados hace más de RX_EVICT_GRACE_SECONDS. Solo revisa las entradas vencidas
+        del heap: O(vencidas · log n) en lugar de recorrer todos los lanzamientos"""
         ended_launches = []
         
-        for launch_id, launch_data in self.active_launches.items():
-            time_since_last_packet = current_time - launch_data['last_packet_time']
-            
-            if (time_since_last_packet > self.END_TIMEOUT and 
-                launch_data['state'] != 'ended'):
+        with self.launches_lock:
+            while self.expiry_heap and self.expiry_heap[0][0] <= current_time:
+                _, launch_id, kind = heapq.heappop(self.expiry_heap)
+                launch_data = self.active_launches.get(launch_id)
+                if launch_data is None:
+                    continue
+                
+                if kind == 'evict':
+                    # Si se reanudó (o terminó de nuevo más tarde) esta entrada ya no aplica
+                    if (launch_data['state'] == 'ended' and
+                            current_time - launch_data['ended_at'] >= self.config.RX_EVICT_GRACE_SECONDS):
+                        del self.active_launches[launch_id]
+                        self.gps_validator.forget(launch_id)
+                    continue
+                
+                if launch_data['state'] == 'ended':
+                    continue
                 
+                # Cada lanzamiento tiene una sola entrada 'expire': si llegaron paquetes desde
+                # que se programó, se reprograma con el último en vez de marcarlo terminado
+                deadline = launch_data['last_packet_time'] + self.END_TIMEOUT
+                if deadline > current_time:
+                    heapq.heappush(self.expiry_heap, (deadline, launch_id, 'expire'))
+                    continue
+                
+                time_since_last_packet = current_time - launch_data['last_packet_time']
                 launch_data['state'] = 'ended'
+                launch_data['ended_at'] = current_time
+                # La entrada 'evict' la agrega publish_ended_launch, después de publicar el END
                 ended_launches.append(launch_id)
                 print(f"Launch {launch_id} marcado como ENDED (timeout: {time_since_last_packet:.1f}s)")
         
         return ended_launches
     
+    def encode_message(self, data):
+        """Serializa el mensaje según WIRE_FORMAT"""
+        if self.config.WIRE_FORMAT == 'dict':
+            if isinstance(data, codec.TelemetryFrame):
+                data = data._asdict()
+            return str(data)
+        return codec.encode(data)
+    
+    def send_message(self, message):
+        """Envía el mensaje por el transporte configurado (REDIS_TRANSPORT)"""
+        if self.config.REDIS_TRANSPORT == 'stream':
+            # MAXLEN aproximado (~) para que el recorte sea O(1) amortizado
+            self.redis_client.xadd(
+                self.config.REDIS_STREAM,
+                {'data': message},
+                maxlen=self.config.REDIS_STREAM_MAXLEN,
+                approximate=True
+            )
+        else:
+            self.redis_client.publish(self.config.REDIS_CHANNEL, message)
+    
     def publish_to_redis(self, data, action):
         """Publica datos a Redis con la acción determinada"""
         try:
-            data_with_action = data.copy()
-            data_with_action['action'] = action
+            data_with_action = data._replace(action=action)
             
-            self.redis_client.publish(
-                self.config.REDIS_CHANNEL, 
-                str(data_with_action)
-            )
-            print(f"Published [{action.upper()}]: launch_id={data['launch_id']}, timestamp={data['timestamp']}")
+            self.send_message(self.encode_message(data_with_action))
+            print(f"Published [{action.upper()}]: launch_id={data.launch_id}, timestamp={data.timestamp}")
             
         except Exception as e:
             print(f"Error publishing to Redis: {e}")
@@ -221,17 +236,188 @@ class DataPublisherRX:
                 'received_at': time.time()
             }
             
-            self.redis_client.publish(
-                self.config.REDIS_CHANNEL, 
-                str(end_data)
-            )
+            self.send_message(self.encode_message(end_data))
             print(f"Published [END] for launch {launch_id} with timestamp {end_timestamp}")
+            self.print_gps_stats(launch_id)
         
         except Exception as e:
             print(f"Error publishing END packet: {e}")
+        
+        self.schedule_eviction(launch_id)
+    
+    def schedule_eviction(self, launch_id):
+        """Programa la salida de memoria de un lanzamiento terminado. Se llama después de
+        publicar su END, así que incluso con RX_EVICT_GRACE_SECONDS=0 el END usa el último
+        timestamp y las estadísticas GPS del lanzamiento antes de que se descarten"""
+        with self.launches_lock:
+            launch_data = self.active_launches.get(launch_id)
+            if launch_data is None or launch_data['state'] != 'ended':
+                return
+            heapq.heappush(self.expiry_heap, (
+                launch_data['ended_at'] + self.config.RX_EVICT_GRACE_SECONDS, launch_id, 'evict'
+            ))
+    
+    def validate_line(self, raw_data, kinematic=True):
+        """Parsea y valida una línea recibida por serial; None si se descarta"""
+        print(f"RX Received: {raw_data}")
+        
+        # Parsear datos
+        parsed_data = self.parse_data(raw_data)
+        
+        if not parsed_data:
+            print("Failed to parse data")
+            return None
+        
+        # Validar admin key
+        if parsed_data.admin_key != self.config.ADMIN_KEY:
+            print("Invalid admin key")
+            return None
+        
+        # Verificar si los datos GPS son válidos
+        if not self.has_valid_gps_data(parsed_data, kinematic):
+            print(f"Paquete corrupto descartado - Datos GPS inválidos para launch_id {parsed_data.launch_id}")
+            return None
+        
+        return parsed_data
+    
+    def process_line(self, raw_data, current_time):
+        """Parsea, valida y publica una línea recibida por serial"""
+        parsed_data = self.validate_line(raw_data)
+        if parsed_data:
+            self.publish_parsed(parsed_data, current_time)
+    
+    def publish_parsed(self, parsed_data, current_time):
+        launch_id = parsed_data.launch_id
+        
+        # Determinar acción
+        action = self.determine_action(launch_id, current_time)
+        
+        # Publicar a Redis
+        self.publish_to_redis(parsed_data, action)
+    
+    def publish_expired_launches(self):
+        """Publica END para los lanzamientos que superaron END_TIMEOUT"""
+        ended_launches = self.check_for_ended_launches(time.time())
+        for launch_id in ended_launches:
+            self.publish_ended_launch(launch_id)
+    
+    def expiry_loop(self):
+        """Hilo de chequeo de timeouts, independiente de la lectura serial"""
+        while not self.stop_event.wait(self.config.RX_EXPIRY_CHECK_INTERVAL):
+            try:
+                self.publish_expired_launches()
+            except Exception as e:
+                print(f"Error checking ended launches: {e}")
+    
+    def publish_data_event(self):
+        """Main loop para RX en modo 'event': bloquea en bytes entrantes y procesa
+        todas las líneas disponibles, sin sleep. El timeout se verifica en otro hilo"""
+        expiry_thread = threading.Thread(target=self.expiry_loop, daemon=True)
+        expiry_thread.start()
+        
+        try:
+            while True:
+                try:
+                    # read_lines() cierra el puerto si falla la lectura: reconectar
+                    if not self.receiver.is_open() and self.receiver.connect():
+                        print(f"Station {self.receiver.port} reconnected")
+                    for raw_data in self.receiver.read_lines():
+                        self.process_line(raw_data, time.time())
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    print(f"Error in RX publish loop: {e}")
+        except KeyboardInterrupt:
+            print("Stopping RX publisher...")
+        finally:
+            self.stop_event.set()
+            expiry_thread.join()
+        
+        # Publicar END para todos los lanzamientos activos al salir
+        with self.launches_lock:
+            launch_ids = list(self.active_launches.keys())
+        for launch_id in launch_ids:
+            self.publish_ended_launch(launch_id)
+    
+    def station_reader(self, port, receiver):
+        """Hilo de lectura de una estación: valida cada línea y la pasa al deduplicador.
+        Si el puerto se cierra (estación desconectada) reintenta connect() cada TIME_INTERVAL"""
+        while not self.stop_event.is_set():
+            if not receiver.is_open():
+                if not receiver.connect():
+                    self.stop_event.wait(self.TIME_INTERVAL)
+                    continue
+                print(f"Station {port} reconnected")
+            try:
+                for raw_data in receiver.read_lines():
+                    # El cinemático depende del orden de las tramas: va después de deduplicar
+                    parsed_data = self.validate_line(raw_data, kinematic=False)
+                    if parsed_data:
+                        self.deduplicator.add(port, parsed_data)
+                    else:
+                        self.deduplicator.reject(port)
+            except Exception as e:
+                print(f"Error reading station {port}: {e}")
+                time.sleep(self.TIME_INTERVAL)
+    
+    def publish_merged(self, parsed_data, current_time):
+        """Publica una trama deduplicada si pasa el chequeo cinemático (una vez por trama)"""
+        if self.has_valid_motion(parsed_data):
+            self.publish_parsed(parsed_data, current_time)
+    
+    def print_station_stats(self):
+        for port, stats in self.deduplicator.stats_snapshot().items():
+            print(f"Station {port}: received={stats['received']} first={stats['first']} "
+                  f"selected={stats['selected']} duplicates={stats['duplicates']} "
+                  f"late={stats['late']} rejected={stats['rejected']}")
+    
+    def publish_data_multi(self):
+        """Main loop para RX con varias estaciones: un hilo lector por puerto y este hilo
+        publica cada trama una sola vez, con la mejor copia recibida dentro de RX_DEDUP_WINDOW_MS"""
+        threads = [threading.Thread(target=self.expiry_loop, daemon=True)]
+        threads += [
+            threading.Thread(target=self.station_reader, args=(port, receiver), daemon=True)
+            for port, receiver in self.receivers.items()
+        ]
+        for thread in threads:
+            thread.start()
+        
+        next_stats = time.monotonic() + self.config.RX_STATION_STATS_INTERVAL
+        try:
+            while True:
+                try:
+                    for parsed_data in self.deduplicator.wait_due(self.TIME_INTERVAL):
+                        self.publish_merged(parsed_data, time.time())
+                    if time.monotonic() >= next_stats:
+                        self.print_station_stats()
+                        next_stats = time.monotonic() + self.config.RX_STATION_STATS_INTERVAL
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    print(f"Error in RX publish loop: {e}")
+        except KeyboardInterrupt:
+            print("Stopping RX publisher...")
+        finally:
+            self.stop_event.set()
+            for thread in threads:
+                thread.join()
+        
+        # Lo que quedó dentro de la ventana, y END para los lanzamientos activos
+        for parsed_data in self.deduplicator.flush():
+            self.publish_merged(parsed_data, time.time())
+        self.print_station_stats()
+        with self.launches_lock:
+            launch_ids = list(self.active_launches.keys())
+        for launch_id in launch_ids:
+            self.publish_ended_launch(launch_id)
     
     def publish_data(self):
         """Main loop para RX - procesa datos de lanzamiento"""
+        if self.multi_station:
+            return self.publish_data_multi()
+        if self.config.RX_INGEST_MODE == 'event':
+            return self.publish_data_event()
+        
         while True:
             try:
                 current_time = time.time()
@@ -245,29 +431,7 @@ class DataPublisherRX:
                 raw_data = self.receiver.receive_data()
                 
                 if raw_data:
-                    print(f"RX Received: {raw_data}")
-                    
-                    # Parsear datos
-                    parsed_data = self.parse_data(raw_data)
-                    
-                    if parsed_data:
-                        # Validar admin key
-                        if parsed_data['admin_key'] == self.config.ADMIN_KEY:
-                            # Verificar si los datos GPS son válidos
-                            if self.has_valid_gps_data(parsed_data):
-                                launch_id = parsed_data['launch_id']
-                                
-                                # Determinar acción
-                                action = self.determine_action(launch_id, current_time)
-                                
-                                # Publicar a Redis
-                                self.publish_to_redis(parsed_data, action)
-                            else:
-                                print(f"Paquete corrupto descartado - Datos GPS inválidos para launch_id {parsed_data['launch_id']}")
-                        else:
-                            print("Invalid admin key")
-                    else:
-                        print("Failed to parse data")
+                    self.process_line(raw_data, current_time)
                 
                 time.sleep(self.TIME_INTERVAL)
                 
@@ -284,7 +448,9 @@ class DataPublisherRX:
     def run(self):
         if self.connect():
             self.publish_data()
-        self.receiver.close()
+            self.print_gps_stats()
+        for receiver in self.receivers.values():
+            receiver.close()
 
 if __name__ == "__main__":
     publisher = DataPublisherRX()
@@ -2,6 +2,7 @@ import time
 import redis
 import requests
 from receiver import Receiver
+from launch_id_pool import LaunchIdPool
 from config import Config
 
 class DataPublisherTX:
@@ -15,6 +16,15 @@ class DataPublisherTX:
             port=self.config.REDIS_PORT,
             decode_responses=True
         )
+        # Pool de ids reservados de antemano (TX_ID_POOL_SIZE = 0 para pedir uno por solicitud)
+        self.id_pool = None
+        if self.config.TX_ID_POOL_SIZE > 0:
+            self.id_pool = LaunchIdPool(
+                self.config.API_BASE_URL,
+                size=self.config.TX_ID_POOL_SIZE,
+                low_water=self.config.TX_ID_POOL_LOW_WATER,
+                timeout=self.config.TX_API_TIMEOUT
+            )
         print(f"TX - Port: {self.config.SERIAL_PORT_TX}, Baudrate: {self.config.BAUDRATE}")
         
     def connect(self):
@@ -31,9 +41,15 @@ class DataPublisherTX:
             return False
     
     def request_launch_id(self):
-        """Solicita un nuevo ID de lanzamiento a la API"""
+        """Toma un ID del pool; sin pool (o si no se pudo rellenar) lo pide a la API"""
+        if self.id_pool is not None:
+            launch_id = self.id_pool.take()
+            if launch_id is not None:
+                return launch_id
+            print("Launch ID pool empty, requesting directly from API")
+        
         try:
-            response = requests.post(f"{self.config.API_BASE_URL}/cansat_req_id")
+            response = requests.post(f"{self.config.API_BASE_URL}/cansat_req_id", timeout=self.config.TX_API_TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 return data.get('assigned_id')
@@ -94,7 +110,11 @@ class DataPublisherTX:
     
     def run(self):
         if self.connect():
+            if self.id_pool is not None:
+                self.id_pool.start()
             self.publish_data()
+        if self.id_pool is not None:
+            self.id_pool.close()
         self.receiver.close()
 
 if __name__ == "__main__":
@@ -1,13 +1,17 @@
 import serial
 import time
-
-XOR_KEYS = [0x2A, 0x4F, 0x31, 0x5C]
+from xor_cipher import XOR_KEYS, xor_text
+MAX_LINE_LENGTH = 4096  # bytes sin '\n' antes de descartar el buffer (ruido de radio)
 
 class Receiver:
+    RETRY_INTERVAL = 1  # seconds: espera de read_lines() con el puerto cerrado o con error
+
     def __init__(self, port, baudrate):
         self.port = port
         self.baudrate = baudrate
         self.ser = None
+        # Buffer reutilizable para armar líneas en read_lines()
+        self.rx_buffer = bytearray()
 
     def connect(self):
         try:
@@ -18,11 +22,11 @@ class Receiver:
             print(f"Connection Error: {e}")
             return False
     
+    def is_open(self):
+        return bool(self.ser and self.ser.is_open)
+
     def cypher_xor(self, text):
-        result = ""
-        for i, char in enumerate(text):
-            result += chr(ord(char) ^ XOR_KEYS[i % 4])
-        return result
+        return xor_text(text, XOR_KEYS)
         
     def decypher_xor(self, text_cyphered):
         return self.cypher_xor(text_cyphered)
@@ -39,6 +43,50 @@ class Receiver:
             print(f"Data Reception Error: {e}")
             return None
         
+    def read_lines(self):
+        """Bloquea hasta que lleguen bytes (o venza el timeout del puerto) y devuelve
+        todas las líneas completas disponibles en una sola pasada. Con el puerto cerrado o
+        con error espera RETRY_INTERVAL antes de devolver [], para que el loop que la llama
+        sin sleep no gire al 100% de CPU"""
+        if not self.ser or not self.ser.is_open:
+            print("Serial port is not open.")
+            time.sleep(self.RETRY_INTERVAL)
+            return []
+        try:
+            # read(1) bloquea hasta el primer byte; luego se drena lo que ya está en el buffer del SO
+            chunk = self.ser.read(1)
+            if not chunk:
+                return []
+            self.rx_buffer += chunk
+            waiting = self.ser.in_waiting
+            if waiting:
+                self.rx_buffer += self.ser.read(waiting)
+        except Exception as e:
+            print(f"Data Reception Error: {e}")
+            # Cerrar el puerto para que is_open() sea False y quien llama reconecte
+            self.close()
+            time.sleep(self.RETRY_INTERVAL)
+            return []
+
+        lines = []
+        start = 0
+        while True:
+            end = self.rx_buffer.find(b'\n', start)
+            if end < 0:
+                break
+            line = self.rx_buffer[start:end].decode('utf-8', errors='ignore').strip()
+            if line:
+                lines.append(line)
+            start = end + 1
+
+        if start:
+            del self.rx_buffer[:start]
+        if len(self.rx_buffer) > MAX_LINE_LENGTH:
+            print(f"Discarding {len(self.rx_buffer)} bytes without line terminator")
+            self.rx_buffer.clear()
+
+        return lines
+        
     def ask_for_data(self, command):
         if not self.ser or not self.ser.is_open:
             print("Serial port is not open.")
@@ -55,4 +103,7 @@ class Receiver:
 
     def close(self):
         if self.ser and self.ser.is_open:
-            self.ser.close()
\ No newline at end of file
+            try:
+                self.ser.close()
+            except Exception as e:
+                print(f"Close Error: {e}")
\ No newline at end of file
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Campos opcionales de una trama; la copia con más campos presentes es la "mejor"
+QUALITY_FIELDS = ('temperature', 'humidity', 'latitude', 'longitude', 'altitude')
+
+def frame_quality(data):
+    return sum(1 for field in QUALITY_FIELDS if getattr(data, field) is not None)
+
+class FrameDeduplicator:
+    """Une las copias de una misma trama (launch_id, timestamp) recibidas por varias
+    estaciones terrenas.
+
+    La primera copia abre una ventana de window segundos; las copias que llegan dentro
+    de la ventana solo reemplazan a la guardada si tienen más campos. Al vencer la
+    ventana la trama se entrega una sola vez, en orden de primera llegada. Las copias
+    que llegan después (hasta LATE_MEMORY_SECONDS) se cuentan como tardías y se descartan.
+    """
+
+    LATE_MEMORY_SECONDS = 10
+
+    def __init__(self, window):
+        self.window = window
+        self.pending = OrderedDict()   # (launch_id, timestamp) -> entrada, en orden de llegada
+        self.released = OrderedDict()  # (launch_id, timestamp) -> momento de entrega
+        self.stations = {}
+        self.condition = threading.Condition()
+
+    def _stats(self, station):
+        stats = self.stations.get(station)
+        if stats is None:
+            stats = self.stations[station] = {
+                'received': 0, 'first': 0, 'selected': 0, 'duplicates': 0, 'late': 0, 'rejected': 0
+            }
+        return stats
+
+    def reject(self, station):
+        """Línea de esta estación descartada antes de deduplicar (parseo, admin key, GPS)"""
+        with self.condition:
+            stats = self._stats(station)
+            stats['received'] += 1
+            stats['rejected'] += 1
+
+    def add(self, station, data, now=None):
+        now = time.monotonic() if now is None else now
+        key = (data.launch_id, data.timestamp)
+        quality = frame_quality(data)
+
+        with self.condition:
+            stats = self._stats(station)
+            stats['received'] += 1
+            entry = self.pending.get(key)
+
+            if entry is None:
+                if key in self.released:
+                    stats['late'] += 1
+                    return
+                self.pending[key] = {
+                    'data': data,
+                    'quality': quality,
+                    'station': station,
+                    'due': now + self.window,
+                }
+                stats['first'] += 1
+                self.condition.notify()
+                return
+
+            stats['duplicates'] += 1
+            if quality > entry['quality']:
+                entry.update(data=data, quality=quality, station=station)
+
+    def _pop_due(self, now, force=False):
+        released = []
+        while self.pending:
+            key, entry = next(iter(self.pending.items()))
+            if not force and entry['due'] > now:
+                break
+            del self.pending[key]
+            self.released[key] = now
+            self._stats(entry['station'])['selected'] += 1
+            released.append(entry['data'])
+
+        while self.released:
+            key, released_at = next(iter(self.released.items()))
+            if now - released_at <= self.LATE_MEMORY_SECONDS:
+                break
+            del self.released[key]
+        return released
+
+    def wait_due(self, timeout):
+        """Bloquea hasta que venza la ventana más antigua (o timeout) y devuelve las tramas a publicar"""
+        with self.condition:
+            now = time.monotonic()
+            if self.pending:
+                oldest_due = next(iter(self.pending.values()))['due']
+                timeout = min(timeout, max(0.0, oldest_due - now))
+            if timeout > 0:
+                self.condition.wait(timeout)
+            return self._pop_due(time.monotonic())
+
+    def flush(self):
+        """Entrega todo lo pendiente sin esperar la ventana (al detener el RX)"""
+        with self.condition:
+            return self._pop_due(time.monotonic(), force=True)
+
+    def stats_snapshot(self):
+        with self.condition:
+            return {station: dict(stats) for station, stats in self.stations.items()}
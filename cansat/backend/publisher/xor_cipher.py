@@ -0,0 +1,31 @@
+"""Cifrado XOR con la clave repetida del firmware Arduino ([0x2A, 0x4F, 0x31, 0x5C]).
+
+Misma implementación en cansat/backend/publisher/ y lab2/: cualquier cambio debe
+hacerse en ambas copias.
+"""
+from itertools import cycle
+
+XOR_KEYS = bytes([0x2A, 0x4F, 0x31, 0x5C])  # *, O, 1, \ (MISMA CLAVE QUE ARDUINO)
+
+def xor_bytes(data, key=XOR_KEYS):
+    """XOR de bytes/bytearray/memoryview con la clave repetida. Devuelve bytes"""
+    size = len(data)
+    if not size:
+        return b''
+
+    # XOR de dos enteros de precisión arbitraria (se hace en C, por palabras) contra
+    # la clave repetida hasta cubrir el payload; más rápido que byte a byte desde 16 B
+    tiled_key = (key * (size // len(key) + 1))[:size]
+    result = int.from_bytes(data, 'little') ^ int.from_bytes(tiled_key, 'little')
+    return result.to_bytes(size, 'little')
+
+def xor_text(text, key=XOR_KEYS):
+    """Equivalente a ''.join(chr(ord(c) ^ key[i % 4]) ...) para str; bytes para bytes-like"""
+    if not isinstance(text, str):
+        return xor_bytes(text, key)
+    try:
+        # latin-1 mapea 1:1 los code points < 256 a bytes, así el resultado es idéntico
+        return xor_bytes(text.encode('latin-1'), key).decode('latin-1')
+    except UnicodeEncodeError:
+        # Caracteres fuera de latin-1 (emojis, etc.): XOR por code point
+        return ''.join(chr(ord(char) ^ k) for char, k in zip(text, cycle(key)))
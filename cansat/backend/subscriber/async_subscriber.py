@@ -0,0 +1,341 @@
+import asyncio
+from datetime import datetime
+import redis.asyncio as aioredis
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from config import Config
+import codec
+from subscriber import build_data_point
+from stream_consumer import AsyncStreamConsumer
+from write_buffer import header_update, build_bucket_operations, batch_stats, stats_update
+from launch_state import LaunchStateCache, resident_memory_bytes
+
+class AsyncDataSubscriber:
+    """Subscriber asyncio (SUBSCRIBER_MODE=asyncio) con Redis y MongoDB asíncronos.
+
+    Un lector decodifica y valida cada mensaje y lo encola en la cola del worker de su
+    launch_id (una por lanzamiento, ASYNC_LAUNCH_QUEUE_DEPTH). Cada worker procesa su
+    cola en orden y escribe en lotes (WRITE_BATCH_SIZE / WRITE_FLUSH_INTERVAL_MS), así el
+    orden dentro de un lanzamiento se mantiene y lanzamientos distintos avanzan en
+    paralelo. ASYNC_MAX_CONCURRENCY limita las escrituras simultáneas a MongoDB. Si la
+    cola de un lanzamiento se llena, el lector espera (backpressure hacia Redis).
+    """
+
+    def __init__(self):
+        self.config = Config()
+        self.redis_client = None
+        self.mongo_client = None
+        self.collection = None
+        self.bucket_collection = None
+        self.consumer = None
+
+        self.workers = {}  # launch_id -> (asyncio.Queue, asyncio.Task)
+        self.active_launches = LaunchStateCache(
+            max_launches=self.config.SUBSCRIBER_MAX_LAUNCHES,
+            idle_ttl=self.config.SUBSCRIBER_LAUNCH_IDLE_SECONDS
+        )
+        self.write_slots = None
+
+    async def connect_databases(self):
+        """Connect to Redis and MongoDB"""
+        try:
+            self.redis_client = aioredis.Redis(
+                host=self.config.REDIS_HOST,
+                port=self.config.REDIS_PORT,
+                decode_responses=False
+            )
+            await self.redis_client.ping()
+            print("✅ Connected to Redis successfully (asyncio)")
+
+            self.mongo_client = AsyncIOMotorClient(
+                self.config.MONGODB_URI,
+                username=self.config.MONGO_INITDB_ROOT_USERNAME,
+                password=self.config.MONGO_INITDB_ROOT_PASSWORD,
+                authSource='admin'
+            )
+            db = self.mongo_client[self.config.MONGODB_DB]
+            self.collection = db[self.config.MONGODB_COLLECTION]
+            try:
+                await self.collection.create_index("launch_id", unique=True)
+            except OperationFailure as e:
+                print(f"⚠️  launch_id index not replaced (the API migrates it): {e}")
+
+            if self.config.STORAGE_LAYOUT == 'bucketed':
+                self.bucket_collection = db[self.config.MONGODB_BUCKET_COLLECTION]
+                await self.bucket_collection.create_index([("launch_id", 1), ("bucket_start", 1)], unique=True)
+                print(f"🪣 Bucketed storage: {self.config.MONGODB_BUCKET_COLLECTION}, span {self.config.BUCKET_SPAN_MS}")
+
+            print("✅ Connected to MongoDB successfully (motor)")
+            print(f"⚙️  Max concurrent writes: {self.config.ASYNC_MAX_CONCURRENCY}, "
+                  f"queue depth per launch: {self.config.ASYNC_LAUNCH_QUEUE_DEPTH}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Database connection error: {e}")
+            return False
+
+    def parse_payload(self, message_data):
+        """Decodifica y valida el admin key; None si el mensaje se descarta"""
+        try:
+            data = codec.decode(message_data)
+        except Exception as e:
+            print(f"❌ Error parsing message: {e}")
+            return None
+
+        if data.get('admin_key') != self.config.ADMIN_KEY:
+            print(f"❌ Invalid admin key: '{data.get('admin_key')}'")
+            return None
+        return data
+
+    async def dispatch(self, message_data, entry_id=None):
+        """Encola el mensaje en el worker de su lanzamiento (lo crea si no existe)"""
+        data = self.parse_payload(message_data) if message_data is not None else None
+        if data is None:
+            # Entradas inválidas del stream se confirman enseguida: no hay nada que reintentar
+            if entry_id is not None:
+                await self.consumer.ack([entry_id])
+            return
+
+        launch_id = data['launch_id']
+        worker = self.workers.get(launch_id)
+        if worker is None:
+            queue = asyncio.Queue(maxsize=self.config.ASYNC_LAUNCH_QUEUE_DEPTH)
+            task = asyncio.create_task(self.run_worker(launch_id, queue))
+            worker = self.workers[launch_id] = (queue, task)
+        await worker[0].put((data, entry_id))
+
+    async def next_batch(self, queue):
+        """Espera el primer mensaje y junta más hasta WRITE_BATCH_SIZE o WRITE_FLUSH_INTERVAL_MS.
+        Un END cierra el lote para que el lanzamiento quede escrito enseguida"""
+        loop = asyncio.get_running_loop()
+        batch = [await asyncio.wait_for(queue.get(), timeout=self.config.ASYNC_WORKER_IDLE_SECONDS)]
+        deadline = loop.time() + self.config.WRITE_FLUSH_INTERVAL_MS / 1000
+        while len(batch) < self.config.WRITE_BATCH_SIZE and batch[-1][0].get('action', '').lower() != 'end':
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run_worker(self, launch_id, queue):
+        """Procesa en orden los mensajes de un lanzamiento; termina tras ASYNC_WORKER_IDLE_SECONDS sin mensajes"""
+        while True:
+            try:
+                batch = await self.next_batch(queue)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    # Sin await entre la comprobación y el borrado: el lector no puede encolar en medio
+                    del self.workers[launch_id]
+                    return
+                continue
+
+            await self.load_launch_state(launch_id)
+            entry = self.build_entry(launch_id, [data for data, _ in batch])
+            await self.write_entry(launch_id, entry)
+
+            entry_ids = [entry_id for _, entry_id in batch if entry_id is not None]
+            if entry_ids:
+                await self.consumer.ack(entry_ids)
+            for _ in batch:
+                queue.task_done()
+
+    async def load_launch_state(self, launch_id):
+        """Rehidrata desde MongoDB el estado de un lanzamiento que no está en memoria"""
+        if self.active_launches.get(launch_id) is not None:
+            return
+        try:
+            document = await self.collection.find_one(
+                {'launch_id': launch_id},
+                {'_id': 0, 'start_date': 1, 'end_date': 1, 'point_count': 1}
+            )
+        except Exception as e:
+            print(f"❌ Error loading launch {launch_id} from MongoDB: {e}")
+            return
+        if document is not None:
+            self.active_launches.rehydrations += 1
+            print(f"♻️  Launch {launch_id} rehydrated from MongoDB")
+            self.active_launches.add(
+                launch_id,
+                start_date=document.get('start_date'),
+                end_date=document.get('end_date'),
+                point_count=document.get('point_count') or 0
+            )
+
+    async def maintain_launch_state(self):
+        """Evicta cada segundo los lanzamientos inactivos sin worker y reporta métricas de memoria"""
+        loop = asyncio.get_running_loop()
+        next_metrics = loop.time() + self.config.SUBSCRIBER_METRICS_INTERVAL
+        while True:
+            await asyncio.sleep(1)
+            evicted = self.active_launches.evict(pinned=self.workers)
+            if evicted:
+                print(f"🧹 Evicted {evicted} idle launch(es) from memory")
+            if loop.time() >= next_metrics:
+                next_metrics = loop.time() + self.config.SUBSCRIBER_METRICS_INTERVAL
+                queued = sum(queue.qsize() for queue, _ in self.workers.values())
+                print(f"📈 Launches in memory: {len(self.active_launches)}, workers: {len(self.workers)}, "
+                      f"queued messages: {queued}, evicted: {self.active_launches.evictions}, "
+                      f"rehydrated: {self.active_launches.rehydrations}, "
+                      f"RSS: {resident_memory_bytes() / 1e6:.1f} MB")
+
+    def build_entry(self, launch_id, messages):
+        """Mismo tratamiento de START/LAUNCH/END que DataSubscriber, como {'points', 'set'} para un solo update"""
+        entry = {'points': [], 'set': {}}
+        state = self.active_launches.get(launch_id)
+        for data in messages:
+            action = data.get('action', '').lower()
+            if state is None:
+                if action != 'start':
+                    print(f"⚠️  Launch {launch_id} not found for {action.upper()} action, creating...")
+                state = self.active_launches.add(
+                    launch_id,
+                    start_date=datetime.now().strftime("%d/%m/%y_%H:%M:%S")
+                )
+                entry['set'].update({
+                    'start_date': state['start_date'],
+                    'end_date': None
+                })
+                print(f"🚀 Launch {launch_id} STARTED")
+
+            point = build_data_point(data)
+            if point is not None:
+                entry['points'].append(point)
+                state['point_count'] += 1
+
+            if action == 'end':
+                state['end_date'] = entry['set']['end_date'] = datetime.now().strftime("%d/%m/%y_%H:%M:%S")
+                print(f"🏁 Launch {launch_id} ENDED")
+        return entry
+
+    async def write_entry(self, launch_id, entry):
+        """Escribe el lote del lanzamiento; reintenta hasta lograrlo para no perder ni reordenar puntos"""
+        bucketed = self.bucket_collection is not None
+        bucket_operations = []
+        if bucketed:
+            bucket_operations = [
+                operation for operation, _ in build_bucket_operations(launch_id, entry['points'], self.config.BUCKET_SPAN_MS)
+            ]
+        header = UpdateOne({'launch_id': launch_id}, header_update(entry, not bucketed, bucketed), upsert=True)
+        stats = batch_stats(entry['points'])
+        summary = UpdateOne({'launch_id': launch_id}, stats_update(stats)) if stats else None
+
+        delay = 0.5
+        while True:
+            try:
+                async with self.write_slots:
+                    if bucket_operations:
+                        await self.bucket_collection.bulk_write(bucket_operations, ordered=False)
+                        bucket_operations = []
+                    # Cada paso se marca hecho para que un reintento no repita $inc/$push
+                    if header is not None:
+                        await self.collection.bulk_write([header])
+                        header = None
+                    if summary is not None:
+                        await self.collection.bulk_write([summary])
+                        summary = None
+                print(f"✅ Wrote {len(entry['points'])} points for launch {launch_id}")
+                return
+            except BulkWriteError as e:
+                # Solo se reintentan los buckets que fallaron (los demás ya tienen sus $push)
+                failed = {error['index'] for error in e.details.get('writeErrors', [])}
+                if bucket_operations:
+                    bucket_operations = [op for i, op in enumerate(bucket_operations) if i in failed]
+                print(f"❌ Bulk write failed for launch {launch_id}: {e}, retrying in {delay:.1f}s")
+            except Exception as e:
+                print(f"❌ Error writing launch {launch_id} to MongoDB: {e}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10)
+
+    async def read_channel(self):
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.config.REDIS_CHANNEL)
+        print(f"🎯 Subscribed to Redis channel: {self.config.REDIS_CHANNEL}")
+        print("⏳ Waiting for messages...")
+        print("=" * 50)
+        try:
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message and message['type'] == 'message':
+                    await self.dispatch(message['data'])
+        finally:
+            await pubsub.close()
+
+    async def read_stream(self):
+        """Consumer group como en DataSubscriber.consume_stream; el XACK lo hace cada worker tras escribir"""
+        self.consumer = AsyncStreamConsumer(
+            self.redis_client,
+            self.config.REDIS_STREAM,
+            self.config.REDIS_CONSUMER_GROUP,
+            self.config.REDIS_CONSUMER_NAME,
+            batch_size=self.config.REDIS_STREAM_BATCH,
+            claim_idle_ms=self.config.REDIS_CLAIM_IDLE_MS
+        )
+        await self.consumer.ensure_group()
+        print(f"🎯 Consuming stream '{self.config.REDIS_STREAM}' as "
+              f"'{self.config.REDIS_CONSUMER_NAME}' in group '{self.config.REDIS_CONSUMER_GROUP}'")
+
+        # Re-procesar lo que quedó sin confirmar antes de un crash
+        last_id = '0'
+        while True:
+            entries = await self.consumer.read_pending(last_id)
+            if not entries:
+                break
+            print(f"♻️  Replaying {len(entries)} pending entries")
+            for entry_id, payload in entries:
+                await self.dispatch(payload, entry_id)
+            last_id = entries[-1][0]
+
+        print("⏳ Waiting for messages...")
+        print("=" * 50)
+
+        loop = asyncio.get_running_loop()
+        next_claim = loop.time()
+        while True:
+            if loop.time() >= next_claim:
+                claimed = await self.consumer.claim_stale()
+                if claimed:
+                    print(f"♻️  Claimed {len(claimed)} stale entries from other consumers")
+                for entry_id, payload in claimed:
+                    await self.dispatch(payload, entry_id)
+                next_claim = loop.time() + self.config.REDIS_CLAIM_IDLE_MS / 1000
+
+            for entry_id, payload in await self.consumer.read_new(self.config.REDIS_STREAM_BLOCK_MS):
+                await self.dispatch(payload, entry_id)
+
+    async def drain_workers(self):
+        """Espera a que los workers escriban lo que tienen en cola"""
+        for queue, _ in list(self.workers.values()):
+            await queue.join()
+        for _, task in list(self.workers.values()):
+            task.cancel()
+
+    async def main(self):
+        self.write_slots = asyncio.Semaphore(self.config.ASYNC_MAX_CONCURRENCY)
+        if not await self.connect_databases():
+            return
+        maintenance = asyncio.create_task(self.maintain_launch_state())
+        try:
+            if self.config.REDIS_TRANSPORT == 'stream':
+                await self.read_stream()
+            else:
+                await self.read_channel()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"❌ Error in subscription: {e}")
+        finally:
+            maintenance.cancel()
+            await self.drain_workers()
+            await self.redis_client.close()
+            self.mongo_client.close()
+
+    def run(self):
+        """Main execution"""
+        try:
+            asyncio.run(self.main())
+        except KeyboardInterrupt:
+            print("\n🛑 Subscriber stopped by user")
@@ -0,0 +1,129 @@
+"""Benchmark de escritura en MongoDB: reescritura completa ($set) vs buffer con $push/$each.
+
+Uso:
+    python bench_write_buffer.py --points 20000 --checkpoint 2000
+
+Usa una colección temporal (por defecto 'bench_launches') que se borra al terminar.
+Reporta, por tramo de la misma longitud, el costo por punto en ms y en bytes BSON enviados:
+con $set crece con el largo del lanzamiento, con el buffer se mantiene constante.
+"""
+import argparse
+import time
+import bson
+import pymongo
+from config import Config
+from write_buffer import LaunchWriteBuffer
+
+def make_point(i):
+    return {
+        'timestamp': float(i * 100),
+        'received_at': time.time(),
+        'action': 'launch',
+        'temperature': 20.0 + (i % 50) / 10,
+        'humidity': 60.0 + (i % 30) / 10,
+        'latitude': 4.6 + i * 1e-6,
+        'longitude': -74.08 - i * 1e-6,
+        'altitude': 2600.0 + i * 0.1
+    }
+
+def update_size(filter, update):
+    """Bytes BSON del filtro y del update; el update va como campo 'u' (como en el comando
+    update) porque con pipeline es una lista y bson.encode solo acepta documentos"""
+    return len(bson.encode(filter)) + len(bson.encode({'u': update}))
+
+class CountingCollection:
+    """Envoltorio que acumula los bytes BSON de cada update enviado"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.bytes_sent = 0
+
+    def update_one(self, filter, update, upsert=False):
+        self.bytes_sent += update_size(filter, update)
+        return self.collection.update_one(filter, update, upsert=upsert)
+
+    def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.bytes_sent += update_size(op._filter, op._doc)
+        return self.collection.bulk_write(operations, ordered=ordered)
+
+def run_legacy(collection, launch_id, total, checkpoint):
+    """Comportamiento anterior: $set de todo el array en cada paquete"""
+    variables = []
+    rows = []
+    started, bytes_start = time.perf_counter(), collection.bytes_sent
+
+    for i in range(total):
+        variables.append(make_point(i))
+        collection.update_one(
+            {'launch_id': launch_id},
+            {'$set': {'launch_id': launch_id, 'start_date': None, 'end_date': None, 'variables': variables}},
+            upsert=True
+        )
+        if (i + 1) % checkpoint == 0:
+            rows.append(report_row(i + 1, checkpoint, started, bytes_start, collection))
+            started, bytes_start = time.perf_counter(), collection.bytes_sent
+
+    return rows
+
+def run_buffered(collection, launch_id, total, checkpoint, batch_size, max_age):
+    buffer = LaunchWriteBuffer(collection, max_points=batch_size, max_age=max_age)
+    rows = []
+    started, bytes_start = time.perf_counter(), collection.bytes_sent
+
+    for i in range(total):
+        buffer.add_point(launch_id, make_point(i))
+        buffer.flush_if_due()
+        if (i + 1) % checkpoint == 0:
+            buffer.flush()
+            rows.append(report_row(i + 1, checkpoint, started, bytes_start, collection))
+            started, bytes_start = time.perf_counter(), collection.bytes_sent
+
+    buffer.flush()
+    return rows
+
+def report_row(n, checkpoint, started, bytes_start, collection):
+    elapsed = time.perf_counter() - started
+    return (n, elapsed * 1000 / checkpoint, (collection.bytes_sent - bytes_start) / checkpoint)
+
+def print_rows(title, rows):
+    print(f"\n{title}")
+    print(f"{'points':>10} {'ms/point':>10} {'bytes/point':>12}")
+    for n, ms, size in rows:
+        print(f"{n:>10} {ms:>10.3f} {size:>12.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=10000)
+    parser.add_argument('--checkpoint', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=Config.WRITE_BATCH_SIZE)
+    parser.add_argument('--flush-ms', type=int, default=Config.WRITE_FLUSH_INTERVAL_MS)
+    parser.add_argument('--collection', default='bench_launches')
+    parser.add_argument('--skip-legacy', action='store_true', help='solo medir el modo con buffer')
+    args = parser.parse_args()
+
+    config = Config()
+    client = pymongo.MongoClient(
+        config.MONGODB_URI,
+        username=config.MONGO_INITDB_ROOT_USERNAME,
+        password=config.MONGO_INITDB_ROOT_PASSWORD,
+        authSource='admin'
+    )
+    raw_collection = client[config.MONGODB_DB][args.collection]
+    raw_collection.drop()
+    raw_collection.create_index("launch_id")
+
+    try:
+        if not args.skip_legacy:
+            rows = run_legacy(CountingCollection(raw_collection), 1, args.points, args.checkpoint)
+            print_rows("Legacy $set (whole launch per packet)", rows)
+
+        rows = run_buffered(CountingCollection(raw_collection), 2, args.points, args.checkpoint,
+                            args.batch_size, args.flush_ms / 1000)
+        print_rows(f"Buffered $push/$each (batch={args.batch_size}, age={args.flush_ms}ms)", rows)
+    finally:
+        raw_collection.drop()
+        client.close()
+
+if __name__ == "__main__":
+    main()
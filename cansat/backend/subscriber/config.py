@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,4 +13,44 @@ class Config:
     MONGO_INITDB_ROOT_USERNAME = os.getenv('MONGO_INITDB_ROOT_USERNAME')
     MONGO_INITDB_ROOT_PASSWORD = os.getenv('MONGO_INITDB_ROOT_PASSWORD')
     ADMIN_KEY = os.getenv('ADMIN_KEY')
-    REDIS_CHANNEL = os.getenv('REDIS_CHANNEL')
\ No newline at end of file
+    REDIS_CHANNEL = os.getenv('REDIS_CHANNEL')
+
+    # Escritura diferida en MongoDB: flush por tamaño o antigüedad
+    WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', 50))
+    WRITE_FLUSH_INTERVAL_MS = int(os.getenv('WRITE_FLUSH_INTERVAL_MS', 250))
+
+    # Transporte Redis: 'pubsub' (canal) o 'stream' (Redis Streams con consumer group)
+    REDIS_TRANSPORT = os.getenv('REDIS_TRANSPORT', 'pubsub')
+    REDIS_STREAM = os.getenv('REDIS_STREAM', os.getenv('REDIS_CHANNEL'))
+    REDIS_CONSUMER_GROUP = os.getenv('REDIS_CONSUMER_GROUP', 'cansat-subscribers')
+    REDIS_CONSUMER_NAME = os.getenv('REDIS_CONSUMER_NAME', socket.gethostname())
+    REDIS_STREAM_BATCH = int(os.getenv('REDIS_STREAM_BATCH', 100))
+    REDIS_STREAM_BLOCK_MS = int(os.getenv('REDIS_STREAM_BLOCK_MS', 1000))
+    REDIS_CLAIM_IDLE_MS = int(os.getenv('REDIS_CLAIM_IDLE_MS', 60000))
+
+    # Almacenamiento: 'document' (array variables en el lanzamiento) o 'bucketed'
+    # (buckets de BUCKET_SPAN_MS por (launch_id, bucket_start) en MONGODB_BUCKET_COLLECTION)
+    STORAGE_LAYOUT = os.getenv('STORAGE_LAYOUT', 'document')
+    MONGODB_BUCKET_COLLECTION = os.getenv('MONGODB_BUCKET_COLLECTION', 'launch_buckets')
+    BUCKET_SPAN_MS = int(os.getenv('BUCKET_SPAN_MS', 60000))
+
+    # Modo del subscriber: 'sync' (un mensaje a la vez) o 'asyncio' (un worker ordenado
+    # por launch_id; lanzamientos distintos avanzan en paralelo)
+    SUBSCRIBER_MODE = os.getenv('SUBSCRIBER_MODE', 'sync')
+    ASYNC_MAX_CONCURRENCY = int(os.getenv('ASYNC_MAX_CONCURRENCY', 8))
+    ASYNC_LAUNCH_QUEUE_DEPTH = int(os.getenv('ASYNC_LAUNCH_QUEUE_DEPTH', 1000))
+    ASYNC_WORKER_IDLE_SECONDS = float(os.getenv('ASYNC_WORKER_IDLE_SECONDS', 30))
+
+    # Estado en memoria por lanzamiento (fechas y contadores; los puntos solo hasta el flush).
+    # LRU de SUBSCRIBER_MAX_LAUNCHES y evicción tras SUBSCRIBER_LAUNCH_IDLE_SECONDS sin paquetes
+    SUBSCRIBER_MAX_LAUNCHES = int(os.getenv('SUBSCRIBER_MAX_LAUNCHES', 1000))
+    SUBSCRIBER_LAUNCH_IDLE_SECONDS = float(os.getenv('SUBSCRIBER_LAUNCH_IDLE_SECONDS', 600))
+    SUBSCRIBER_METRICS_INTERVAL = float(os.getenv('SUBSCRIBER_METRICS_INTERVAL', 60))
+
+    # Validación GPS para revalidate_gps.py: mismos valores que en el publisher
+    GPS_GEOFENCE = os.getenv('GPS_GEOFENCE', '[[4.0, -79.0], [4.0, -67.0], [12.0, -67.0], [12.0, -79.0]]')
+    GPS_MIN_ALTITUDE = float(os.getenv('GPS_MIN_ALTITUDE', 0))
+    GPS_MAX_ALTITUDE = float(os.getenv('GPS_MAX_ALTITUDE', 5000))
+    GPS_MAX_SPEED = float(os.getenv('GPS_MAX_SPEED', 350))
+    GPS_MAX_CLIMB_RATE = float(os.getenv('GPS_MAX_CLIMB_RATE', 300))
+    GPS_KINEMATIC_RESET = int(os.getenv('GPS_KINEMATIC_RESET', 3))
@@ -0,0 +1,79 @@
+import os
+import resource
+import time
+from collections import OrderedDict
+
+def resident_memory_bytes():
+    """RSS actual del proceso (/proc/self/statm en Linux); si no está disponible, el pico (ru_maxrss)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class LaunchStateCache:
+    """Estado en memoria de los lanzamientos: solo fechas y contadores, los puntos sin
+    escribir viven en el write buffer hasta el flush.
+
+    LRU acotado a max_launches; evict() además saca los que llevan idle_ttl segundos sin
+    paquetes. Un lanzamiento evictado se rehidrata desde MongoDB si vuelve a llegar un
+    paquete suyo (ver DataSubscriber.get_launch_state).
+    """
+
+    def __init__(self, max_launches=1000, idle_ttl=600):
+        self.max_launches = max_launches
+        self.idle_ttl = idle_ttl
+        self.launches = OrderedDict()
+        self.evictions = 0
+        self.rehydrations = 0
+
+    def __len__(self):
+        return len(self.launches)
+
+    def __contains__(self, launch_id):
+        return launch_id in self.launches
+
+    def get(self, launch_id):
+        state = self.launches.get(launch_id)
+        if state is not None:
+            self.launches.move_to_end(launch_id)
+            state['last_seen'] = time.monotonic()
+        return state
+
+    def add(self, launch_id, start_date=None, end_date=None, point_count=0):
+        state = {
+            'launch_id': launch_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'point_count': point_count,
+            'last_seen': time.monotonic()
+        }
+        self.launches[launch_id] = state
+        self.launches.move_to_end(launch_id)
+        return state
+
+    def remove(self, launch_id):
+        self.launches.pop(launch_id, None)
+
+    def evict(self, pinned=()):
+        """Saca los lanzamientos menos usados mientras sobren o estén inactivos. Los de pinned
+        (p.ej. con puntos sin escribir) se conservan. Devuelve cuántos se evictaron"""
+        now = time.monotonic()
+        evicted = 0
+        kept = []
+        while self.launches:
+            launch_id, state = next(iter(self.launches.items()))
+            over_size = len(self.launches) + len(kept) > self.max_launches
+            idle = now - state['last_seen'] >= self.idle_ttl
+            if not (over_size or idle):
+                break
+            self.launches.popitem(last=False)
+            if launch_id in pinned:
+                kept.append((launch_id, state))
+            else:
+                evicted += 1
+
+        for launch_id, state in kept:
+            self.launches[launch_id] = state
+        self.evictions += evicted
+        return evicted
@@ -0,0 +1,101 @@
+"""Migra lanzamientos con array 'variables' embebido al almacenamiento por buckets.
+
+Uso:
+    python migrate_to_buckets.py [--launch-id N] [--include-active] [--dry-run]
+
+Por cada lanzamiento escribe sus buckets (launch_id, bucket_start) con $set, así que
+se puede volver a correr sin duplicar puntos, y luego quita 'variables' del documento
+y lo marca con layout 'bucketed'. Por defecto solo migra lanzamientos terminados.
+"""
+import argparse
+import pymongo
+from pymongo import UpdateOne
+from config import Config
+from write_buffer import bucket_start_for, batch_stats, summary_document, BOUND_FIELDS
+
+def bucket_documents(variables, bucket_span):
+    """Agrupa los puntos en {bucket_start: {...campos del bucket}}"""
+    buckets = {}
+    for point in variables:
+        bucket = buckets.setdefault(bucket_start_for(point.get('timestamp'), bucket_span), {'variables': []})
+        bucket['variables'].append(point)
+
+    for bucket in buckets.values():
+        timestamps = [p['timestamp'] for p in bucket['variables'] if p.get('timestamp') is not None]
+        bucket['count'] = len(bucket['variables'])
+        bucket['min_timestamp'] = min(timestamps) if timestamps else None
+        bucket['max_timestamp'] = max(timestamps) if timestamps else None
+    return buckets
+
+def migrate_launch(collection, bucket_collection, launch, bucket_span, dry_run=False):
+    launch_id = launch['launch_id']
+    buckets = bucket_documents(launch.get('variables') or [], bucket_span)
+    print(f"Launch {launch_id}: {len(launch.get('variables') or [])} points -> {len(buckets)} buckets")
+    if dry_run:
+        return True
+
+    if buckets:
+        bucket_collection.bulk_write([
+            UpdateOne({'launch_id': launch_id, 'bucket_start': bucket_start}, {'$set': fields}, upsert=True)
+            for bucket_start, fields in buckets.items()
+        ], ordered=False)
+
+    # Resumen que el subscriber mantiene incrementalmente en los lanzamientos nuevos
+    variables = launch.get('variables') or []
+    header = {'layout': 'bucketed', 'point_count': len(variables)}
+    for field in BOUND_FIELDS:
+        values = [p[field] for p in variables if p.get(field) is not None]
+        if values:
+            header[f'bounds.{field}'] = {'min': min(values), 'max': max(values)}
+    for field, stats in batch_stats(variables).items():
+        header[f'summary.{field}'] = summary_document(*stats)
+
+    # Solo si nadie escribió el lanzamiento mientras tanto (data_version sin cambios)
+    result = collection.update_one(
+        {'launch_id': launch_id, 'data_version': launch.get('data_version')},
+        {'$set': header, '$unset': {'variables': ''}}
+    )
+    if result.modified_count == 0:
+        print(f"⚠️  Launch {launch_id} changed during migration, skipped (buckets will be rewritten on next run)")
+        return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--launch-id', type=int, help='migrar solo este lanzamiento')
+    parser.add_argument('--include-active', action='store_true', help='incluir lanzamientos sin end_date')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    config = Config()
+    client = pymongo.MongoClient(
+        config.MONGODB_URI,
+        username=config.MONGO_INITDB_ROOT_USERNAME,
+        password=config.MONGO_INITDB_ROOT_PASSWORD,
+        authSource='admin'
+    )
+    db = client[config.MONGODB_DB]
+    collection = db[config.MONGODB_COLLECTION]
+    bucket_collection = db[config.MONGODB_BUCKET_COLLECTION]
+    bucket_collection.create_index([("launch_id", 1), ("bucket_start", 1)], unique=True)
+
+    query = {'layout': {'$ne': 'bucketed'}}
+    if args.launch_id is not None:
+        query['launch_id'] = args.launch_id
+    if not args.include_active:
+        query['end_date'] = {'$ne': None}
+
+    migrated = skipped = 0
+    try:
+        for launch in collection.find(query, {'_id': 0}).sort('launch_id', pymongo.ASCENDING):
+            if migrate_launch(collection, bucket_collection, launch, config.BUCKET_SPAN_MS, args.dry_run):
+                migrated += 1
+            else:
+                skipped += 1
+    finally:
+        client.close()
+
+    print(f"Done: {migrated} migrated, {skipped} skipped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Revalida los puntos GPS de lanzamientos guardados con la validación de publisher_rx.
+
+Uso:
+    python revalidate_gps.py [--launch-id N] [--save]
+
+Usa GpsValidator.validate_batch (geocerca vectorizada con numpy + chequeo cinemático)
+con la misma configuración GPS_* que el publisher y muestra cuántos puntos se
+rechazarían por motivo. No borra puntos: con --save guarda el resumen en el campo
+gps_validation del lanzamiento.
+"""
+import argparse
+from collections import Counter
+import numpy as np
+import pymongo
+from config import Config
+from gps_validation import GpsValidator, REASONS
+
+def load_points(bucket_collection, launch):
+    """Puntos del lanzamiento (embebidos y en buckets) ordenados por timestamp"""
+    variables = launch.get('variables') or []
+    if launch.get('layout') == 'bucketed':
+        buckets = bucket_collection.find(
+            {'launch_id': launch['launch_id']}, {'_id': 0, 'variables': 1}
+        ).sort('bucket_start', pymongo.ASCENDING)
+        for bucket in buckets:
+            variables.extend(bucket.get('variables', []))
+    return sorted(variables, key=lambda point: point.get('timestamp') or 0)
+
+def revalidate_launch(validator, points):
+    """Cuenta de rechazos por motivo y cuántos puntos tenían GPS completo"""
+    with_gps = [
+        point for point in points
+        if all(point.get(field) is not None for field in ('latitude', 'longitude', 'altitude'))
+    ]
+    if not with_gps:
+        return 0, Counter()
+
+    columns = np.array([
+        (point.get('timestamp') or 0, point['latitude'], point['longitude'], point['altitude'])
+        for point in with_gps
+    ], dtype=np.float64)
+    reasons = validator.validate_batch(columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3])
+    return len(with_gps), Counter(reason for reason in reasons if reason is not None)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--launch-id', type=int, help='revalidar solo este lanzamiento')
+    parser.add_argument('--save', action='store_true', help='guardar el resumen en gps_validation')
+    args = parser.parse_args()
+
+    config = Config()
+    validator = GpsValidator.from_config(config)
+    client = pymongo.MongoClient(
+        config.MONGODB_URI,
+        username=config.MONGO_INITDB_ROOT_USERNAME,
+        password=config.MONGO_INITDB_ROOT_PASSWORD,
+        authSource='admin'
+    )
+    db = client[config.MONGODB_DB]
+    collection = db[config.MONGODB_COLLECTION]
+    bucket_collection = db[config.MONGODB_BUCKET_COLLECTION]
+
+    query = {} if args.launch_id is None else {'launch_id': args.launch_id}
+    totals = Counter()
+    checked_total = 0
+    try:
+        for launch in collection.find(query, {'_id': 0}).sort('launch_id', pymongo.ASCENDING):
+            points = load_points(bucket_collection, launch)
+            checked, rejections = revalidate_launch(validator, points)
+            checked_total += checked
+            totals.update(rejections)
+            summary = ', '.join(f"{reason}={rejections[reason]}" for reason in REASONS if rejections[reason])
+            print(f"Launch {launch['launch_id']}: {checked}/{len(points)} points with GPS, "
+                  f"{sum(rejections.values())} rejected{': ' + summary if summary else ''}")
+
+            if args.save:
+                collection.update_one(
+                    {'launch_id': launch['launch_id']},
+                    {'$set': {'gps_validation': {'checked': checked, 'rejected': dict(rejections)}}}
+                )
+    finally:
+        client.close()
+
+    summary = ', '.join(f"{reason}={totals[reason]}" for reason in REASONS if totals[reason])
+    print(f"Done: {checked_total} points checked, {sum(totals.values())} rejected{': ' + summary if summary else ''}")
+
+if __name__ == "__main__":
+    main()
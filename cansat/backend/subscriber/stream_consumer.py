@@ -0,0 +1,114 @@
+import redis
+
+class StreamConsumer:
+    """Lectura de un Redis Stream con consumer group: XREADGROUP, XACK en lote,
+    re-lectura de pendientes propios tras un crash y XAUTOCLAIM de consumidores caídos"""
+
+    FIELD = b'data'
+
+    def __init__(self, redis_client, stream, group, consumer, batch_size=100, claim_idle_ms=60000):
+        self.redis_client = redis_client
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.claim_idle_ms = claim_idle_ms
+
+    def ensure_group(self):
+        """Crea el consumer group (y el stream) si no existen"""
+        try:
+            self.redis_client.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+            print(f"✅ Created consumer group '{self.group}' on stream '{self.stream}'")
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def _entries(self, response):
+        """Convierte la respuesta de XREADGROUP en [(entry_id, payload)]"""
+        entries = []
+        for _, messages in response or []:
+            for entry_id, fields in messages:
+                # fields es None/vacío si la entrada fue recortada por MAXLEN estando pendiente
+                entries.append((entry_id, (fields or {}).get(self.FIELD)))
+        return entries
+
+    def iter_pending(self):
+        """Entradas entregadas a este consumidor y nunca confirmadas (crash previo), en lotes"""
+        last_id = '0'
+        while True:
+            entries = self._entries(self.redis_client.xreadgroup(
+                self.group, self.consumer, {self.stream: last_id}, count=self.batch_size
+            ))
+            if not entries:
+                return
+            last_id = entries[-1][0]
+            yield entries
+
+    def claim_stale(self):
+        """Toma las entradas pendientes de otros consumidores inactivos por más de claim_idle_ms"""
+        claimed = []
+        start_id = '0-0'
+        while True:
+            response = self.redis_client.xautoclaim(
+                self.stream, self.group, self.consumer,
+                min_idle_time=self.claim_idle_ms, start_id=start_id, count=self.batch_size
+            )
+            start_id, messages = response[0], response[1]
+            claimed.extend(
+                (entry_id, (fields or {}).get(self.FIELD)) for entry_id, fields in messages
+            )
+            if start_id in (b'0-0', '0-0'):
+                return claimed
+
+    def read_new(self, block_ms):
+        """Entradas nuevas para este consumidor; bloquea hasta block_ms (mínimo 1 ms)"""
+        return self._entries(self.redis_client.xreadgroup(
+            self.group, self.consumer, {self.stream: '>'},
+            count=self.batch_size, block=max(1, int(block_ms))
+        ))
+
+    def ack(self, entry_ids):
+        if entry_ids:
+            self.redis_client.xack(self.stream, self.group, *entry_ids)
+
+class AsyncStreamConsumer(StreamConsumer):
+    """Misma lectura que StreamConsumer sobre un cliente redis.asyncio (modo asyncio del subscriber)"""
+
+    async def ensure_group(self):
+        try:
+            await self.redis_client.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+            print(f"✅ Created consumer group '{self.group}' on stream '{self.stream}'")
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    async def read_pending(self, last_id='0'):
+        """Un lote de entradas propias nunca confirmadas posteriores a last_id"""
+        return self._entries(await self.redis_client.xreadgroup(
+            self.group, self.consumer, {self.stream: last_id}, count=self.batch_size
+        ))
+
+    async def claim_stale(self):
+        claimed = []
+        start_id = '0-0'
+        while True:
+            response = await self.redis_client.xautoclaim(
+                self.stream, self.group, self.consumer,
+                min_idle_time=self.claim_idle_ms, start_id=start_id, count=self.batch_size
+            )
+            start_id, messages = response[0], response[1]
+            claimed.extend(
+                (entry_id, (fields or {}).get(self.FIELD)) for entry_id, fields in messages
+            )
+            if start_id in (b'0-0', '0-0'):
+                return claimed
+
+    async def read_new(self, block_ms):
+        return self._entries(await self.redis_client.xreadgroup(
+            self.group, self.consumer, {self.stream: '>'},
+            count=self.batch_size, block=max(1, int(block_ms))
+        ))
+
+    async def ack(self, entry_ids):
+        if entry_ids:
+            await self.redis_client.xack(self.stream, self.group, *entry_ids)
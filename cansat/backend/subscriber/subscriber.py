@@ -1,10 +1,43 @@
 import redis
 import pymongo
-import json
 import time
 import ast
 from datetime import datetime
 from config import Config
+import codec
+from write_buffer import LaunchWriteBuffer
+from launch_state import LaunchStateCache, resident_memory_bytes
+from stream_consumer import StreamConsumer
+
+def build_data_point(data):
+    """Punto de telemetría a guardar en variables, o None si el timestamp no es válido"""
+    # FILTRAR TIMESTAMPS: Ignorar timestamps Unix enormes
+    timestamp = data.get('timestamp')
+    if timestamp and timestamp > 1000000000000:  # Si es mayor a ~año 2001
+        print(f"⚠️  Ignoring invalid timestamp: {timestamp}")
+        return None
+    
+    # Crear variable data
+    variable_data = {
+        'timestamp': timestamp,
+        'received_at': data.get('received_at', time.time()),
+        'action': data.get('action', '').lower()
+    }
+    
+    # Agregar datos de sensores si existen
+    if 'temperature' in data and data['temperature'] is not None:
+        variable_data['temperature'] = data['temperature']
+    
+    if 'humidity' in data and data['humidity'] is not None:
+        variable_data['humidity'] = data['humidity']
+    
+    # Agregar datos GPS si existen
+    if 'latitude' in data and data['latitude'] is not None:
+        variable_data['latitude'] = data['latitude']
+        variable_data['longitude'] = data['longitude']
+        variable_data['altitude'] = data['altitude']
+    
+    return variable_data
 
 class DataSubscriber:
     def __init__(self):
@@ -13,18 +46,23 @@ class DataSubscriber:
         self.mongo_client = None
         self.db = None
         self.collection = None
+        self.write_buffer = None
         
-        # Track active launches
-        self.active_launches = {}
+        # Track active launches (solo fechas y contadores, acotado por LRU/TTL)
+        self.active_launches = LaunchStateCache(
+            max_launches=self.config.SUBSCRIBER_MAX_LAUNCHES,
+            idle_ttl=self.config.SUBSCRIBER_LAUNCH_IDLE_SECONDS
+        )
+        self.next_metrics = time.monotonic() + self.config.SUBSCRIBER_METRICS_INTERVAL
         
     def connect_databases(self):
         """Connect to Redis and MongoDB"""
         try:
-            # Connect to Redis
+            # Connect to Redis (sin decode_responses: los mensajes pueden ser binarios, ver codec.py)
             self.redis_client = redis.Redis(
                 host=self.config.REDIS_HOST,
                 port=self.config.REDIS_PORT,
-                decode_responses=True
+                decode_responses=False
             )
             self.redis_client.ping()
             print("✅ Connected to Redis successfully")
@@ -40,10 +78,27 @@ class DataSubscriber:
             self.db = self.mongo_client[self.config.MONGODB_DB]
             self.collection = self.db[self.config.MONGODB_COLLECTION]
             
-            # Crear índices
-            self.collection.create_index("launch_id")
+            # Crear índices (launch_id único: lo asigna el contador de la API)
+            try:
+                self.collection.create_index("launch_id", unique=True)
+            except pymongo.errors.OperationFailure as e:
+                print(f"⚠️  launch_id index not replaced (the API migrates it): {e}")
             self.collection.create_index([("launch_id", 1), ("timestamp", 1)])
             
+            bucket_collection = None
+            if self.config.STORAGE_LAYOUT == 'bucketed':
+                bucket_collection = self.db[self.config.MONGODB_BUCKET_COLLECTION]
+                bucket_collection.create_index([("launch_id", 1), ("bucket_start", 1)], unique=True)
+                print(f"🪣 Bucketed storage: {self.config.MONGODB_BUCKET_COLLECTION}, span {self.config.BUCKET_SPAN_MS}")
+            
+            self.write_buffer = LaunchWriteBuffer(
+                self.collection,
+                max_points=self.config.WRITE_BATCH_SIZE,
+                max_age=self.config.WRITE_FLUSH_INTERVAL_MS / 1000,
+                bucket_collection=bucket_collection,
+                bucket_span=self.config.BUCKET_SPAN_MS
+            )
+            
             print("✅ Connected to MongoDB successfully")
             print(f"📊 Database: {self.config.MONGODB_DB}, Collection: {self.config.MONGODB_COLLECTION}")
             print(f"🔑 Admin key: '{self.config.ADMIN_KEY}'")
@@ -54,116 +109,72 @@ class DataSubscriber:
             print(f"❌ Database connection error: {e}")
             return False
     
-    def safe_parse_dict(self, message_str):
-        """Safely parse dictionary string handling single quotes"""
+    def parse_message_data(self, message_data):
+        """Parse message - binario (codec v1), dict string o raw data"""
         try:
-            # Reemplazar comillas simples por dobles para JSON válido
-            json_str = message_str.replace("'", '"')
-            return json.loads(json_str)
+            data = codec.decode(message_data)
+            print(f"✅ Parsed data: {data}")
+            return data
         except Exception as e:
-            print(f"❌ JSON parse error: {e}")
+            print(f"❌ Error parsing message: {e}")
             return None
     
-    def parse_raw_data(self, raw_data):
-        """Parse raw data from format: admin_key-launch_id-action-timestamp-temp-humidity-lat-lon-alt"""
+    def get_launch_state(self, launch_id):
+        """Estado en memoria del lanzamiento; si no está (evictado o tras un reinicio) se
+        rehidrata desde MongoDB. None si el lanzamiento no existe"""
+        state = self.active_launches.get(launch_id)
+        if state is not None:
+            return state
+        
         try:
-            print(f"🔄 Parsing raw data: {raw_data}")
-            
-            if not raw_data or raw_data == "None":
-                return None
-            
-            # Limpiar el string (remover espacios y caracteres extraños)
-            clean_data = raw_data.strip()
-            
-            # Dividir por guiones
-            parts = clean_data.split('-')
-            print(f"📋 Parts: {parts}")
-            
-            # Validar formato mínimo
-            if len(parts) < 4:
-                print(f"❌ Invalid format: expected at least 4 parts, got {len(parts)}")
-                return None
-            
-            # Extraer datos básicos
-            admin_key = parts[0]
-            launch_id = int(parts[1])
-            action = parts[2]
-            timestamp = float(parts[3])
-            
-            parsed_data = {
-                'admin_key': admin_key,
-                'launch_id': launch_id,
-                'action': action,
-                'timestamp': timestamp,
-                'received_at': time.time()
-            }
-            
-            # Extraer datos de sensores si están disponibles
-            if len(parts) > 4 and parts[4]:  # temperature
-                try:
-                    parsed_data['temperature'] = float(parts[4])
-                except (ValueError, IndexError):
-                    parsed_data['temperature'] = None
-            
-            if len(parts) > 5 and parts[5]:  # humidity
-                try:
-                    parsed_data['humidity'] = float(parts[5])
-                except (ValueError, IndexError):
-                    parsed_data['humidity'] = None
-            
-            # Extraer datos GPS si están disponibles
-            if len(parts) > 8:  # lat, lon, alt
-                try:
-                    parsed_data['latitude'] = float(parts[6])
-                    parsed_data['longitude'] = float(parts[7])
-                    parsed_data['altitude'] = float(parts[8])
-                except (ValueError, IndexError):
-                    parsed_data['latitude'] = None
-                    parsed_data['longitude'] = None
-                    parsed_data['altitude'] = None
-            
-            print(f"✅ Parsed data: {parsed_data}")
-            return parsed_data
-            
+            document = self.collection.find_one(
+                {'launch_id': launch_id},
+                {'_id': 0, 'start_date': 1, 'end_date': 1, 'point_count': 1}
+            )
         except Exception as e:
-            print(f"❌ Error parsing raw data: {e}")
+            print(f"❌ Error loading launch {launch_id} from MongoDB: {e}")
             return None
-    
-    def parse_message_data(self, message_str):
-        """Parse message string - puede ser dict string o raw data"""
-        try:
-            print(f"📨 Message string: {message_str}")
-            
-            # Si es un string de diccionario (como antes)
-            if message_str.startswith('{') and message_str.endswith('}'):
-                print("🔍 Detected dictionary format")
-                # Usar el nuevo método seguro
-                data = self.safe_parse_dict(message_str)
-                if data:
-                    print(f"✅ Successfully parsed dictionary: {data}")
-                return data
-            
-            # Si es raw data (nuevo formato)
-            else:
-                print("🔍 Detected raw data format")
-                return self.parse_raw_data(message_str)
-                
-        except Exception as e:
-            print(f"❌ Error parsing message: {e}")
+        if document is None:
             return None
+        
+        self.active_launches.rehydrations += 1
+        print(f"♻️  Launch {launch_id} rehydrated from MongoDB")
+        return self.active_launches.add(
+            launch_id,
+            start_date=document.get('start_date'),
+            end_date=document.get('end_date'),
+            point_count=document.get('point_count') or 0
+        )
+    
+    def maintain_launch_state(self):
+        """Evicta lanzamientos inactivos o sobrantes y reporta métricas de memoria cada SUBSCRIBER_METRICS_INTERVAL"""
+        # Los que tienen puntos sin escribir se conservan hasta el flush
+        evicted = self.active_launches.evict(pinned=self.write_buffer.pending)
+        if evicted:
+            print(f"🧹 Evicted {evicted} idle launch(es) from memory")
+        
+        if time.monotonic() >= self.next_metrics:
+            self.next_metrics = time.monotonic() + self.config.SUBSCRIBER_METRICS_INTERVAL
+            print(f"📈 Launches in memory: {len(self.active_launches)}, "
+                  f"pending points: {self.write_buffer.pending_points}, "
+                  f"evicted: {self.active_launches.evictions}, "
+                  f"rehydrated: {self.active_launches.rehydrations}, "
+                  f"RSS: {resident_memory_bytes() / 1e6:.1f} MB")
     
     def handle_start_action(self, data):
         """Handle START action - inicializar lanzamiento"""
         try:
             launch_id = data['launch_id']
             
-            if launch_id not in self.active_launches:
-                self.active_launches[launch_id] = {
-                    'launch_id': launch_id,
-                    'start_date': datetime.now().strftime("%d/%m/%y_%H:%M:%S"),
-                    'end_date': None,
-                    'variables': []
-                }
+            if self.get_launch_state(launch_id) is None:
+                state = self.active_launches.add(
+                    launch_id,
+                    start_date=datetime.now().strftime("%d/%m/%y_%H:%M:%S")
+                )
+                self.write_buffer.set_fields(launch_id, {
+                    'start_date': state['start_date'],
+                    'end_date': None
+                })
                 print(f"🚀 Launch {launch_id} STARTED")
             
             # Para acción START, también guardamos el primer dato en variables
@@ -177,7 +188,7 @@ class DataSubscriber:
         try:
             launch_id = data['launch_id']
             
-            if launch_id not in self.active_launches:
+            if self.get_launch_state(launch_id) is None:
                 print(f"⚠️  Launch {launch_id} not found for LAUNCH action, creating...")
                 self.handle_start_action(data)
                 return
@@ -193,7 +204,7 @@ class DataSubscriber:
         try:
             launch_id = data['launch_id']
             
-            if launch_id not in self.active_launches:
+            if self.get_launch_state(launch_id) is None:
                 print(f"⚠️  Launch {launch_id} not found for END action, creating...")
                 self.handle_start_action(data)
             
@@ -201,15 +212,20 @@ class DataSubscriber:
             self.save_data_point(launch_id, data)
             
             # Marcar como finalizado
-            self.active_launches[launch_id]['end_date'] = datetime.now().strftime("%d/%m/%y_%H:%M:%S")
+            end_date = datetime.now().strftime("%d/%m/%y_%H:%M:%S")
+            self.active_launches.get(launch_id)['end_date'] = end_date
+            self.write_buffer.set_fields(launch_id, {
+                'end_date': end_date
+            })
             
-            # Guardar en MongoDB
-            self.save_launch_to_db(self.active_launches[launch_id])
+            # Forzar escritura de todo lo pendiente en MongoDB
+            self.write_buffer.flush()
             
             print(f"🏁 Launch {launch_id} ENDED")
             
-            # Opcional: mantener en memoria o limpiar
-            # del self.active_launches[launch_id]
+            # Ya está en MongoDB: un paquete tardío lo rehidrata desde ahí
+            if launch_id not in self.write_buffer.pending:
+                self.active_launches.remove(launch_id)
             
         except Exception as e:
             print(f"❌ Error handling END action: {e}")
@@ -217,39 +233,17 @@ class DataSubscriber:
     def save_data_point(self, launch_id, data):
         """Guardar punto de datos en variables"""
         try:
-            # FILTRAR TIMESTAMPS: Ignorar timestamps Unix enormes
-            timestamp = data.get('timestamp')
-            if timestamp and timestamp > 1000000000000:  # Si es mayor a ~año 2001
-                print(f"⚠️  Ignoring invalid timestamp: {timestamp}")
+            variable_data = build_data_point(data)
+            if variable_data is None:
                 return
+            timestamp = variable_data['timestamp']
             
-            # Crear variable data
-            variable_data = {
-                'timestamp': timestamp,
-                'received_at': data.get('received_at', time.time()),
-                'action': data.get('action', '').lower()
-            }
+            self.active_launches.get(launch_id)['point_count'] += 1
             
-            # Agregar datos de sensores si existen
-            if 'temperature' in data and data['temperature'] is not None:
-                variable_data['temperature'] = data['temperature']
+            # Encolar para MongoDB (flush por tamaño o antigüedad)
+            self.write_buffer.add_point(launch_id, variable_data)
             
-            if 'humidity' in data and data['humidity'] is not None:
-                variable_data['humidity'] = data['humidity']
-            
-            # Agregar datos GPS si existen
-            if 'latitude' in data and data['latitude'] is not None:
-                variable_data['latitude'] = data['latitude']
-                variable_data['longitude'] = data['longitude']
-                variable_data['altitude'] = data['altitude']
-            
-            # Agregar a variables
-            self.active_launches[launch_id]['variables'].append(variable_data)
-            
-            # Guardar en MongoDB inmediatamente
-            self.save_launch_to_db(self.active_launches[launch_id])
-            
-            print(f"📊 Data point saved for launch {launch_id}, timestamp: {timestamp}")
+            print(f"📊 Data point queued for launch {launch_id}, timestamp: {timestamp}")
             
         except Exception as e:
             print(f"❌ Error saving data point: {e}")
@@ -276,39 +270,20 @@ class DataSubscriber:
         except Exception as e:
             print(f"❌ Error handling launch data: {e}")
     
-    def save_launch_to_db(self, launch_data):
-        """Save launch data to MongoDB in the required format"""
-        try:
-            # Crear documento en el formato exacto que necesitas
-            document = {
-                'launch_id': launch_data['launch_id'],
-                'start_date': launch_data['start_date'],
-                'end_date': launch_data['end_date'],
-                'variables': launch_data['variables']
-            }
-            
-            # Actualizar o insertar documento
-            result = self.collection.update_one(
-                {'launch_id': launch_data['launch_id']},
-                {'$set': document},
-                upsert=True
-            )
-            
-            if result.upserted_id:
-                print(f"✅ New launch saved to MongoDB: {result.upserted_id}")
-            else:
-                print(f"✅ Launch updated in MongoDB: {launch_data['launch_id']}")
-            
-        except Exception as e:
-            print(f"❌ Error saving to MongoDB: {e}")
-    
     def process_message(self, message):
         """Process incoming Redis message"""
         try:
             if message['type'] != 'message':
                 return
             
-            message_data = message['data']
+            self.process_payload(message['data'])
+                
+        except Exception as e:
+            print(f"❌ Error processing message: {e}")
+    
+    def process_payload(self, message_data):
+        """Parse, validate and handle one telemetry payload (pub/sub or stream)"""
+        try:
             print(f"📦 Received message: {message_data}")
             
             # Parsear el mensaje
@@ -338,6 +313,9 @@ class DataSubscriber:
     
     def subscribe(self):
         """Subscribe to Redis channel and process messages"""
+        if self.config.REDIS_TRANSPORT == 'stream':
+            return self.consume_stream()
+        
         try:
             pubsub = self.redis_client.pubsub()
             pubsub.subscribe(self.config.REDIS_CHANNEL)
@@ -346,17 +324,96 @@ class DataSubscriber:
             print("⏳ Waiting for messages...")
             print("=" * 50)
             
-            for message in pubsub.listen():
-                self.process_message(message)
+            # get_message con timeout en lugar de listen() para poder
+            # hacer flush por antigüedad aunque no lleguen mensajes
+            while True:
+                message = pubsub.get_message(timeout=self.write_buffer.time_until_due())
+                if message:
+                    self.process_message(message)
+                self.write_buffer.flush_if_due()
+                self.maintain_launch_state()
                 
         except KeyboardInterrupt:
             print("\n🛑 Subscriber stopped by user")
         except Exception as e:
             print(f"❌ Error in subscription: {e}")
         finally:
+            self.write_buffer.flush()
             if hasattr(self, 'pubsub'):
                 pubsub.close()
     
+    def process_stream_entries(self, entries, unacked):
+        """Procesa entradas del stream; sus IDs quedan pendientes de XACK hasta el flush"""
+        for entry_id, payload in entries:
+            if payload is not None:
+                self.process_payload(payload)
+            unacked.append(entry_id)
+    
+    def ack_flushed(self, consumer, unacked):
+        """XACK en lote, solo cuando todo lo procesado ya está escrito en MongoDB"""
+        if unacked and not self.write_buffer.pending:
+            consumer.ack(unacked)
+            unacked.clear()
+    
+    def consume_stream(self):
+        """Consume the Redis Stream through a consumer group (at-least-once)"""
+        consumer = StreamConsumer(
+            self.redis_client,
+            self.config.REDIS_STREAM,
+            self.config.REDIS_CONSUMER_GROUP,
+            self.config.REDIS_CONSUMER_NAME,
+            batch_size=self.config.REDIS_STREAM_BATCH,
+            claim_idle_ms=self.config.REDIS_CLAIM_IDLE_MS
+        )
+        unacked = []
+        
+        try:
+            consumer.ensure_group()
+            
+            print(f"🎯 Consuming stream '{self.config.REDIS_STREAM}' as "
+                  f"'{self.config.REDIS_CONSUMER_NAME}' in group '{self.config.REDIS_CONSUMER_GROUP}'")
+            
+            # Re-procesar lo que quedó sin confirmar antes de un crash
+            for entries in consumer.iter_pending():
+                print(f"♻️  Replaying {len(entries)} pending entries")
+                self.process_stream_entries(entries, unacked)
+                self.write_buffer.flush()
+                self.ack_flushed(consumer, unacked)
+            
+            print("⏳ Waiting for messages...")
+            print("=" * 50)
+            
+            next_claim = time.monotonic()
+            while True:
+                # Tomar pendientes de consumidores caídos
+                if time.monotonic() >= next_claim:
+                    claimed = consumer.claim_stale()
+                    if claimed:
+                        print(f"♻️  Claimed {len(claimed)} stale entries from other consumers")
+                        self.process_stream_entries(claimed, unacked)
+                    next_claim = time.monotonic() + self.config.REDIS_CLAIM_IDLE_MS / 1000
+                
+                if self.write_buffer.pending:
+                    block_ms = self.write_buffer.time_until_due() * 1000
+                else:
+                    block_ms = self.config.REDIS_STREAM_BLOCK_MS
+                
+                self.process_stream_entries(consumer.read_new(block_ms), unacked)
+                self.write_buffer.flush_if_due()
+                self.ack_flushed(consumer, unacked)
+                self.maintain_launch_state()
+                
+        except KeyboardInterrupt:
+            print("\n🛑 Subscriber stopped by user")
+        except Exception as e:
+            print(f"❌ Error in stream consumption: {e}")
+        finally:
+            self.write_buffer.flush()
+            try:
+                self.ack_flushed(consumer, unacked)
+            except Exception as e:
+                print(f"❌ Error acknowledging entries: {e}")
+    
     def run(self):
         """Main execution"""
         if self.connect_databases():
@@ -365,5 +422,9 @@ class DataSubscriber:
             self.mongo_client.close()
 
 if __name__ == "__main__":
-    subscriber = DataSubscriber()
+    if Config.SUBSCRIBER_MODE == 'asyncio':
+        from async_subscriber import AsyncDataSubscriber
+        subscriber = AsyncDataSubscriber()
+    else:
+        subscriber = DataSubscriber()
     subscriber.run()
\ No newline at end of file
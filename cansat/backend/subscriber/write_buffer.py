@@ -0,0 +1,323 @@
+import time
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Campos con mínimo/máximo en el resumen 'bounds' del lanzamiento
+BOUND_FIELDS = ('timestamp', 'latitude', 'longitude', 'altitude')
+
+def bucket_start_for(timestamp, bucket_span):
+    """Inicio del bucket de tamaño fijo (en unidades de timestamp) que contiene al punto"""
+    return int((timestamp or 0) // bucket_span) * bucket_span
+
+def summary_update(points):
+    """$inc/$min/$max del resumen del lanzamiento (point_count y bounds) para estos puntos"""
+    update = {'$inc': {'point_count': len(points)}}
+    mins, maxs = {}, {}
+    for field in BOUND_FIELDS:
+        values = [point[field] for point in points if point.get(field) is not None]
+        if values:
+            mins[f'bounds.{field}.min'] = min(values)
+            maxs[f'bounds.{field}.max'] = max(values)
+    if mins:
+        update['$min'] = mins
+        update['$max'] = maxs
+    return update
+
+# Campos con estadísticas incrementales (count, mean, variance, min, max) en 'summary'
+STAT_FIELDS = ('temperature', 'humidity', 'altitude')
+
+def batch_stats(points):
+    """Welford sobre los puntos del lote: {campo: (count, mean, m2, min, max)}"""
+    stats = {}
+    for field in STAT_FIELDS:
+        count, mean, m2 = 0, 0.0, 0.0
+        minimum = maximum = None
+        for point in points:
+            value = point.get(field)
+            if value is None:
+                continue
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+            minimum = value if minimum is None or value < minimum else minimum
+            maximum = value if maximum is None or value > maximum else maximum
+        if count:
+            stats[field] = (count, mean, m2, minimum, maximum)
+    return stats
+
+def merge_stats(a, b):
+    """Une dos resultados de batch_stats (fórmula de Chan para mean/m2)"""
+    merged = dict(a)
+    for field, (count_b, mean_b, m2_b, min_b, max_b) in b.items():
+        if field not in merged:
+            merged[field] = (count_b, mean_b, m2_b, min_b, max_b)
+            continue
+        count_a, mean_a, m2_a, min_a, max_a = merged[field]
+        count = count_a + count_b
+        delta = mean_b - mean_a
+        merged[field] = (
+            count,
+            mean_a + delta * count_b / count,
+            m2_a + m2_b + delta * delta * count_a * count_b / count,
+            min(min_a, min_b),
+            max(max_a, max_b)
+        )
+    return merged
+
+def summary_document(count, mean, m2, minimum, maximum):
+    """Subdocumento summary.<campo> tal como lo deja stats_update"""
+    return {
+        'count': count,
+        'mean': mean,
+        'm2': m2,
+        'variance': m2 / (count - 1) if count > 1 else 0,
+        'min': minimum,
+        'max': maximum
+    }
+
+def stats_update(stats):
+    """Update con pipeline que une el lote con summary.<campo> en el servidor (misma
+    fórmula que merge_stats), atómico aunque escriban varios subscribers. También sube
+    data_version: la cabecera se escribe antes, y un /stats leído entre las dos escrituras
+    quedaría en cache con el resumen viejo bajo la versión nueva"""
+    fields = {'data_version': {'$add': [{'$ifNull': ['$data_version', 0]}, 1]}}
+    for field, (count, mean, m2, minimum, maximum) in stats.items():
+        fields[f'summary.{field}'] = {'$let': {
+            'vars': {'a': {'$ifNull': [f'$summary.{field}', {'count': 0, 'mean': 0, 'm2': 0}]}},
+            'in': {'$let': {
+                'vars': {
+                    'n': {'$add': ['$$a.count', count]},
+                    'delta': {'$subtract': [mean, '$$a.mean']}
+                },
+                'in': {'$let': {
+                    'vars': {'m2': {'$add': [
+                        '$$a.m2', m2,
+                        {'$divide': [{'$multiply': ['$$delta', '$$delta', '$$a.count', count]}, '$$n']}
+                    ]}},
+                    'in': {
+                        'count': '$$n',
+                        'mean': {'$add': ['$$a.mean', {'$divide': [{'$multiply': ['$$delta', count]}, '$$n']}]},
+                        'm2': '$$m2',
+                        # Varianza muestral; 0 con un solo valor
+                        'variance': {'$cond': [{'$gt': ['$$n', 1]}, {'$divide': ['$$m2', {'$subtract': ['$$n', 1]}]}, 0]},
+                        'min': {'$min': ['$$a.min', minimum]},
+                        'max': {'$max': ['$$a.max', maximum]}
+                    }
+                }}
+            }}
+        }}
+    return [{'$set': fields}]
+
+def build_bucket_operations(launch_id, points, bucket_span):
+    """Una operación UpdateOne (upsert) por bucket (launch_id, bucket_start) tocado por los puntos.
+    Devuelve [(operación, puntos)] para poder reintentar solo los buckets que fallen"""
+    buckets = {}
+    for point in points:
+        buckets.setdefault(bucket_start_for(point.get('timestamp'), bucket_span), []).append(point)
+
+    operations = []
+    for bucket_start, bucket_points in buckets.items():
+        timestamps = [p['timestamp'] for p in bucket_points if p.get('timestamp') is not None]
+        update = {
+            '$push': {'variables': {'$each': bucket_points}},
+            '$inc': {'count': len(bucket_points)}
+        }
+        if timestamps:
+            update['$min'] = {'min_timestamp': min(timestamps)}
+            update['$max'] = {'max_timestamp': max(timestamps)}
+        operations.append((
+            UpdateOne({'launch_id': launch_id, 'bucket_start': bucket_start}, update, upsert=True),
+            bucket_points
+        ))
+    return operations
+
+def header_update(entry, include_points, bucketed=False):
+    """Update del documento del lanzamiento para una entrada {'points': [...], 'set': {...}}:
+    campos de cabecera, versión, resumen y (si include_points) los puntos con $push"""
+    update = summary_update(entry['points']) if entry['points'] else {'$inc': {}}
+    if include_points and entry['points']:
+        update['$push'] = {'variables': {'$each': entry['points']}}
+    fields = dict(entry['set'])
+    if bucketed:
+        fields['layout'] = 'bucketed'
+    if fields:
+        update['$set'] = fields
+    # Versión de datos: la API la usa para invalidar caches de renders
+    update['$inc']['data_version'] = 1
+
+    # Valores por defecto solo si el documento no existe todavía
+    on_insert = {
+        field: None for field in ('start_date', 'end_date')
+        if field not in entry['set']
+    }
+    if on_insert:
+        update['$setOnInsert'] = on_insert
+    return update
+
+class LaunchWriteBuffer:
+    """Buffer de escritura diferida: acumula puntos por lanzamiento y los envía a MongoDB
+    con $push/$each en un solo bulk_write, por tamaño o por antigüedad.
+
+    Con bucket_collection los puntos van a documentos bucket de tamaño fijo
+    (launch_id, bucket_start) y el documento del lanzamiento queda solo como cabecera."""
+
+    def __init__(self, collection, max_points=50, max_age=0.25, bucket_collection=None, bucket_span=60000):
+        self.collection = collection
+        self.max_points = max_points
+        self.max_age = max_age  # segundos
+        self.bucket_collection = bucket_collection
+        self.bucket_span = bucket_span
+
+        # launch_id -> {'points': [...], 'set': {...}}
+        self.pending = {}
+        self.pending_points = 0
+        self.oldest_pending = None
+        # launch_id -> batch_stats ya contados en la cabecera pero sin unir a 'summary' (reintento)
+        self.pending_stats = {}
+
+    def _entry(self, launch_id):
+        entry = self.pending.get(launch_id)
+        if entry is None:
+            entry = {'points': [], 'set': {}}
+            self.pending[launch_id] = entry
+        if self.oldest_pending is None:
+            self.oldest_pending = time.monotonic()
+        return entry
+
+    def add_point(self, launch_id, point):
+        """Agrega un punto al buffer y hace flush si se alcanzó el tamaño máximo"""
+        self._entry(launch_id)['points'].append(point)
+        self.pending_points += 1
+
+        if self.pending_points >= self.max_points:
+            self.flush()
+
+    def set_fields(self, launch_id, fields):
+        """Registra campos de cabecera (start_date, end_date) para el próximo flush"""
+        self._entry(launch_id)['set'].update(fields)
+
+    def is_due(self):
+        """Indica si el dato pendiente más antiguo superó la antigüedad máxima"""
+        if self.oldest_pending is None:
+            return False
+        return time.monotonic() - self.oldest_pending >= self.max_age
+
+    def time_until_due(self):
+        """Segundos que faltan para el próximo flush por antigüedad"""
+        if self.oldest_pending is None:
+            return self.max_age
+        return max(0.0, self.max_age - (time.monotonic() - self.oldest_pending))
+
+    def flush_if_due(self):
+        if self.is_due():
+            return self.flush()
+        return 0
+
+    def build_header_update(self, entry, include_points):
+        """Update del documento del lanzamiento: campos de cabecera, versión, resumen y (si aplica) puntos"""
+        return header_update(entry, include_points, self.bucket_collection is not None)
+
+    def build_operations(self, pending):
+        """Construye una operación UpdateOne (upsert) por lanzamiento"""
+        return [
+            UpdateOne({'launch_id': launch_id},
+                      self.build_header_update(entry, self.bucket_collection is None),
+                      upsert=True)
+            for launch_id, entry in pending.items()
+        ]
+
+    def _bulk_write(self, collection, operations, items):
+        """bulk_write desordenado; devuelve los items (launch_id, puntos, campos) de las operaciones que fallaron"""
+        if not operations:
+            return []
+        try:
+            collection.bulk_write(operations, ordered=False)
+            return []
+        except BulkWriteError as e:
+            # Solo se reintentan las operaciones que fallaron
+            failed = [items[error['index']] for error in e.details.get('writeErrors', [])]
+            print(f"❌ Bulk write failed for launches {sorted({item[0] for item in failed})}: {e}")
+            return failed
+        except Exception as e:
+            print(f"❌ Error flushing to MongoDB: {e}")
+            return items
+
+    def flush(self):
+        """Envía todo lo pendiente. Devuelve la cantidad de puntos escritos"""
+        if not self.pending:
+            self.oldest_pending = None
+            # Estadísticas de un flush anterior que fallaron: se reintentan aunque no haya puntos
+            if self.pending_stats:
+                self.write_stats({}, set())
+            return 0
+
+        pending = self.pending
+        written_points = self.pending_points
+
+        self.pending = {}
+        self.pending_points = 0
+        self.oldest_pending = None
+
+        failed = []
+        if self.bucket_collection is not None:
+            bucket_operations, bucket_items = [], []
+            for launch_id, entry in pending.items():
+                for operation, points in build_bucket_operations(launch_id, entry['points'], self.bucket_span):
+                    bucket_operations.append(operation)
+                    bucket_items.append((launch_id, points, {}))
+            failed_buckets = self._bulk_write(self.bucket_collection, bucket_operations, bucket_items)
+            failed += failed_buckets
+
+            # El resumen de la cabecera solo cuenta los puntos que sí quedaron en buckets
+            failed_lists = {id(points) for _, points, _ in failed_buckets}
+            header_pending = {launch_id: {'points': [], 'set': entry['set']} for launch_id, entry in pending.items()}
+            for launch_id, points, _ in bucket_items:
+                if id(points) not in failed_lists:
+                    header_pending[launch_id]['points'].extend(points)
+            header_items = [(launch_id, [], entry['set']) for launch_id, entry in pending.items()]
+        else:
+            header_pending = pending
+            header_items = [(launch_id, entry['points'], entry['set']) for launch_id, entry in pending.items()]
+
+        failed_headers = self._bulk_write(self.collection, self.build_operations(header_pending), header_items)
+        failed += failed_headers
+        self.write_stats(header_pending, {launch_id for launch_id, _, _ in failed_headers})
+
+        if failed:
+            self._requeue(failed)
+            written_points -= sum(len(points) for _, points, _ in failed)
+        if written_points:
+            print(f"✅ Flushed {written_points} points for {len(pending)} launch(es) to MongoDB")
+        return written_points
+
+    def write_stats(self, header_pending, failed_launches):
+        """Une a 'summary' las estadísticas de los puntos que la cabecera ya contó. Si falla se
+        guardan para el próximo flush (no se reintenta la cabecera: duplicaría puntos)"""
+        for launch_id, entry in header_pending.items():
+            if launch_id not in failed_launches and entry['points']:
+                stats = batch_stats(entry['points'])
+                if stats:
+                    self.pending_stats[launch_id] = merge_stats(self.pending_stats.get(launch_id, {}), stats)
+
+        pending_stats, self.pending_stats = self.pending_stats, {}
+        items = list(pending_stats.items())
+        operations = [UpdateOne({'launch_id': launch_id}, stats_update(stats)) for launch_id, stats in items]
+        for launch_id, stats in self._bulk_write(self.collection, operations, items):
+            self.pending_stats[launch_id] = merge_stats(stats, self.pending_stats.get(launch_id, {}))
+        # Sin puntos nuevos, el reintento lo dispara el flush por antigüedad
+        if self.pending_stats and self.oldest_pending is None:
+            self.oldest_pending = time.monotonic()
+
+    def _requeue(self, failed):
+        """Devuelve al buffer lo que no se pudo escribir, delante de lo nuevo"""
+        for launch_id, points, fields in failed:
+            current = self.pending.get(launch_id)
+            entry = {'points': list(points), 'set': dict(fields)}
+            if current is not None:
+                entry['points'].extend(current['points'])
+                entry['set'].update(current['set'])
+            self.pending[launch_id] = entry
+            self.pending_points += len(points)
+
+        self.oldest_pending = time.monotonic()
@@ -1,5 +1,6 @@
 // app.component.ts
-import { Component, OnInit } from '@angular/core';
+import { Component, OnInit, OnDestroy } from '@angular/core';
+import { Subscription } from 'rxjs';
 import { Router, NavigationEnd } from '@angular/router';
 import { HeaderComponent } from './components/header/header.component';
 import { LaunchSelectorComponent } from './components/launch-selector/launch-selector.component';
@@ -9,7 +10,7 @@ import { DataTableComponent } from './components/data-table/data-table.component
 import { FooterComponent } from './components/footer/footer.component';
 import { CommonModule } from '@angular/common';
 import { LaunchService } from './services/launch.service';
-import { Launch } from './models/launch.model';
+import { Launch, LivePacket, LaunchStatsSummary, VariableStats } from './models/launch.model';
 import { ChartData } from './models/launch.model';
 import { GpsMapComponent } from './components/gps/gps-map.component';
 import { TimeService } from './services/time.service';
@@ -76,8 +77,21 @@ import { TimeService } from './services/time.service';
               
               <div class="info-item">
                 <span class="label">Datos Registrados:</span>
-                <span class="value">{{ selectedLaunch.variables.length }} puntos</span>
+                <span class="value">{{ statsSummary?.point_count ?? selectedLaunch.variables.length }} puntos</span>
               </div>
+
+              <!-- Estadísticas de la variable activa mantenidas por el subscriber (/stats) -->
+              <ng-container *ngIf="getActiveStats() as stats">
+                <div class="info-item">
+                  <span class="label">{{ getActiveTabName() }} mín / máx:</span>
+                  <span class="value">{{ stats.min | number:'1.2-2' }} / {{ stats.max | number:'1.2-2' }}</span>
+                </div>
+
+                <div class="info-item">
+                  <span class="label">{{ getActiveTabName() }} promedio:</span>
+                  <span class="value">{{ stats.mean | number:'1.2-2' }} ± {{ stats.std | number:'1.2-2' }}</span>
+                </div>
+              </ng-container>
               
               <div class="info-item">
                 <span class="label">Zona Horaria:</span>
@@ -98,12 +112,12 @@ import { TimeService } from './services/time.service';
               ></app-chart>
               
               <app-data-table 
-                *ngIf="chartData.length > 0"
-                [data]="chartData"
+                *ngIf="tableData.length > 0"
+                [data]="tableData"
                 [type]="activeTab"
               ></app-data-table>
 
-              <div *ngIf="chartData.length === 0" class="no-chart-data">
+              <div *ngIf="tableData.length === 0" class="no-chart-data">
                 <div class="no-data-content">
                   <i class="icon">📈</i>
                   <h3>No hay datos disponibles</h3>
@@ -116,6 +130,7 @@ import { TimeService } from './services/time.service';
             <app-gps-map 
               *ngIf="activeTab === 'gps' && selectedLaunch"
               [launch]="selectedLaunch"
+              [altitudeStats]="statsSummary?.stats?.['altitude'] ?? null"
             ></app-gps-map>
           </div>
         </div>
@@ -136,14 +151,20 @@ import { TimeService } from './services/time.service';
   `,
   styleUrls: ['./app.component.scss']
 })
-export class AppComponent implements OnInit {
+export class AppComponent implements OnInit, OnDestroy {
+  // Puntos por gráfico: series más largas se piden al servidor reducidas con LTTB (?max_points)
+  static readonly CHART_MAX_POINTS = 1000;
+
   showNav = false;
   activeTab = 'humidity';
   selectedLaunchId: number | null = null;
   selectedLaunch: Launch | null = null;
   chartData: ChartData[] = [];
+  tableData: ChartData[] = [];
   launchDuration: any = { duration: 'N/A', status: 'No disponible', isInProgress: false };
-  launchStats: any = null;
+  statsSummary: LaunchStatsSummary | null = null;
+  private liveSubscription: Subscription | null = null;
+  private chartSubscription: Subscription | null = null;
 
   constructor(
     private launchService: LaunchService,
@@ -160,6 +181,11 @@ export class AppComponent implements OnInit {
     this.parseUrlParams();
   }
 
+  ngOnDestroy() {
+    this.stopLiveUpdates();
+    this.chartSubscription?.unsubscribe();
+  }
+
   parseUrlParams() {
     const url = new URL(window.location.href);
     const launchId = url.searchParams.get('id_launch');
@@ -171,9 +197,11 @@ export class AppComponent implements OnInit {
       this.loadLaunchData();
     } else {
       // Si no hay launchId en la URL, resetear todo
+      this.stopLiveUpdates();
       this.selectedLaunchId = null;
       this.selectedLaunch = null;
       this.chartData = [];
+      this.tableData = [];
       this.showNav = false;
     }
 
@@ -198,9 +226,11 @@ export class AppComponent implements OnInit {
       this.loadLaunchData();
     } else {
       // Si selecciona "Seleccione un lanzamiento" (opción vacía)
+      this.stopLiveUpdates();
       this.selectedLaunchId = null;
       this.selectedLaunch = null;
       this.chartData = [];
+      this.tableData = [];
       this.showNav = false;
       this.router.navigate(['/']);
     }
@@ -238,40 +268,97 @@ export class AppComponent implements OnInit {
 
   loadLaunchData() {
     if (this.selectedLaunchId) {
+      this.stopLiveUpdates();
       this.launchService.getLaunchById(this.selectedLaunchId)
         .subscribe({
           next: (launch) => {
             this.selectedLaunch = launch;
             this.updateLaunchInfo();
+            this.loadStatsSummary(launch.launch_id);
             // Solo cargar datos de chart si el tab activo no es GPS
             if (this.activeTab !== 'gps') {
               this.loadChartData();
             }
+            // Lanzamiento en curso: los puntos nuevos llegan por SSE en vez de recargar todo
+            if (this.launchDuration.isInProgress) {
+              this.startLiveUpdates(launch.launch_id);
+            }
           },
           error: (error) => {
             console.error('Error loading launch data:', error);
             this.selectedLaunch = null;
             this.chartData = [];
+            this.tableData = [];
             this.launchDuration = { duration: 'N/A', status: 'Error', isInProgress: false };
-            this.launchStats = null;
+            this.statsSummary = null;
           }
         });
     }
   }
 
+  startLiveUpdates(launchId: number) {
+    this.liveSubscription = this.launchService.streamLaunch(launchId)
+      .subscribe((packet: LivePacket) => this.onLivePacket(packet));
+  }
+
+  stopLiveUpdates() {
+    this.liveSubscription?.unsubscribe();
+    this.liveSubscription = null;
+  }
+
+  onLivePacket(packet: LivePacket) {
+    if (!this.selectedLaunch || packet.launch_id !== this.selectedLaunch.launch_id) {
+      return;
+    }
+
+    if (packet.action === 'end') {
+      // Recargar una vez el documento final (end_date, puntos pendientes)
+      this.loadLaunchData();
+      return;
+    }
+
+    const variables = this.selectedLaunch.variables;
+    const last = variables[variables.length - 1];
+    // Ignorar paquetes que ya venían en la carga inicial
+    if (packet.action !== 'launch' || (last && packet.timestamp <= last.timestamp)) {
+      return;
+    }
+
+    const { launch_id, action, received_at, ...variable } = packet;
+    variables.push(variable);
+    this.updateLaunchInfo();
+    if (this.activeTab !== 'gps') {
+      this.loadChartData(true);
+    }
+  }
+
   updateLaunchInfo() {
     if (this.selectedLaunch) {
       // Actualizar información de duración usando timestamps de Arduino
       this.launchDuration = this.calculateLaunchDuration(this.selectedLaunch);
       
-      // Actualizar estadísticas
-      this.launchStats = this.launchService.getLaunchStats(this.selectedLaunch);
     } else {
       this.launchDuration = { duration: 'N/A', status: 'No disponible', isInProgress: false };
-      this.launchStats = null;
     }
   }
 
+  // Resumen precalculado en el servidor: sin recorrer los puntos en el cliente
+  loadStatsSummary(launchId: number) {
+    this.launchService.getLaunchStatsSummary(launchId).subscribe({
+      next: (summary: LaunchStatsSummary) => {
+        this.statsSummary = summary;
+      },
+      error: (error) => {
+        console.error('Error loading launch stats:', error);
+        this.statsSummary = null;
+      }
+    });
+  }
+
+  getActiveStats(): VariableStats | null {
+    return this.statsSummary?.stats?.[this.activeTab] ?? null;
+  }
+
   calculateLaunchDuration(launch: any): any {
     if (!launch.variables || launch.variables.length < 2) {
         return { duration: 'N/A', status: 'Sin datos', isInProgress: false };
@@ -320,12 +407,41 @@ export class AppComponent implements OnInit {
   }
   
 
-  loadChartData() {
-    if (this.selectedLaunch && this.activeTab && this.activeTab !== 'gps') {
-      this.chartData = this.launchService.getChartData(this.selectedLaunch, this.activeTab);
-    } else {
+  // La tabla usa los puntos ya cargados; el gráfico, si la serie supera CHART_MAX_POINTS,
+  // la serie reducida del servidor. Con live=true no se pide otra mientras haya una en curso
+  loadChartData(live = false) {
+    if (!this.selectedLaunch || !this.activeTab || this.activeTab === 'gps') {
+      this.chartSubscription?.unsubscribe();
       this.chartData = [];
+      this.tableData = [];
+      return;
+    }
+
+    this.tableData = this.launchService.getFormattedTableData(this.selectedLaunch, this.activeTab);
+    if (this.tableData.length <= AppComponent.CHART_MAX_POINTS) {
+      this.chartSubscription?.unsubscribe();
+      this.chartData = this.tableData;
+      return;
     }
+    if (live && this.chartSubscription && !this.chartSubscription.closed) {
+      return;
+    }
+
+    this.chartSubscription?.unsubscribe();
+    if (!live) {
+      this.chartData = [];  // no mostrar la serie de otra variable mientras llega la nueva
+    }
+    this.chartSubscription = this.launchService
+      .getLaunchVariables(this.selectedLaunch.launch_id, this.activeTab, AppComponent.CHART_MAX_POINTS)
+      .subscribe({
+        next: (data: ChartData[]) => {
+          this.chartData = data;
+        },
+        error: (error) => {
+          console.error('Error loading downsampled series:', error);
+          this.chartData = this.tableData;
+        }
+      });
   }
 
   formatLaunchDate(dateString: string | null): string {
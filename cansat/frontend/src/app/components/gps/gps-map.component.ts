@@ -1,8 +1,14 @@
 // gps-map.component.ts
-import { Component, Input, OnChanges } from '@angular/core';
+import { Component, Input, OnChanges, OnDestroy, ViewChild, ElementRef } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { HttpClient } from '@angular/common/http';
-import { Launch, Variable } from '../../models/launch.model';
+import { Subscription } from 'rxjs';
+import * as d3 from 'd3';
+import { Launch, Variable, Trajectory, VariableStats } from '../../models/launch.model';
+import { LaunchService } from '../../services/launch.service';
+
+// Puntos pedidos a /trajectory para dibujar en el cliente (el servidor reduce con LTTB)
+const TRAJECTORY_MAX_POINTS = 5000;
 
 @Component({
   selector: 'app-gps-map',
@@ -33,6 +39,24 @@ import { Launch, Variable } from '../../models/launch.model';
         </div>
       </div>
 
+      <!-- Trayectoria 3D dibujada en el cliente desde /trajectory (columnas binarias) -->
+      <div class="visualization-3d-section" *ngIf="trajectory">
+        <h3>Trayectoria 3D interactiva</h3>
+        <canvas
+          #trajectoryCanvas
+          class="trajectory-canvas"
+          width="800"
+          height="500"
+          (pointerdown)="startRotation($event)"
+          (pointermove)="rotate($event)"
+          (pointerup)="stopRotation()"
+          (pointerleave)="stopRotation()"
+        ></canvas>
+        <div class="plot-info">
+          <p>Arrastre para rotar · {{ trajectory.timestamp.length }} puntos · color según el tiempo</p>
+        </div>
+      </div>
+
       <!-- Visualización 3D desde el backend -->
       <div class="visualization-3d-section">
         <h3>Visualización 3D - Trayectoria (Latitud, Longitud, Altitud)</h3>
@@ -93,21 +117,132 @@ import { Launch, Variable } from '../../models/launch.model';
   `,
   styleUrls: ['./gps-map.component.scss']
 })
-export class GpsMapComponent implements OnChanges {
+export class GpsMapComponent implements OnChanges, OnDestroy {
   @Input() launch: Launch | null = null;
+  // Resumen de /stats; sin él (lanzamientos anteriores) se calcula con los puntos
+  @Input() altitudeStats: VariableStats | null = null;
 
   gpsData: any[] = [];
   plotImage: string | null = null;
   loadingPlot = false;
   plotError: string | null = null;
 
-  constructor(private http: HttpClient) {}
+  trajectory: Trajectory | null = null;
+  private trajectorySubscription: Subscription | null = null;
+  private canvas: HTMLCanvasElement | null = null;
+  // Vista inicial como la del gráfico de Matplotlib (view_init(elev=30, azim=45))
+  private azimuth = Math.PI / 4;
+  private elevation = Math.PI / 6;
+  private dragStart: { x: number, y: number } | null = null;
+
+  // El canvas aparece con *ngIf cuando llega la trayectoria
+  @ViewChild('trajectoryCanvas') set trajectoryCanvas(canvas: ElementRef<HTMLCanvasElement> | undefined) {
+    this.canvas = canvas?.nativeElement ?? null;
+    this.drawTrajectory();
+  }
+
+  constructor(
+    private http: HttpClient,
+    private launchService: LaunchService
+  ) {}
 
   ngOnChanges() {
     if (this.launch) {
       this.gpsData = this.getGPSData(this.launch);
       this.plotImage = null;
       this.plotError = null;
+      this.loadTrajectory(this.launch.launch_id);
+    }
+  }
+
+  ngOnDestroy() {
+    this.trajectorySubscription?.unsubscribe();
+  }
+
+  private loadTrajectory(launchId: number) {
+    this.trajectorySubscription?.unsubscribe();
+    this.trajectory = null;
+    this.trajectorySubscription = this.launchService.getTrajectory(launchId, 'f32', TRAJECTORY_MAX_POINTS)
+      .subscribe({
+        next: (trajectory: Trajectory) => {
+          this.trajectory = trajectory.timestamp.length > 1 ? trajectory : null;
+          this.drawTrajectory();
+        },
+        error: (error) => {
+          console.error('Error loading trajectory:', error);
+        }
+      });
+  }
+
+  startRotation(event: PointerEvent) {
+    this.dragStart = { x: event.clientX, y: event.clientY };
+  }
+
+  rotate(event: PointerEvent) {
+    if (!this.dragStart) return;
+    this.azimuth += (event.clientX - this.dragStart.x) * 0.01;
+    this.elevation = Math.max(-Math.PI / 2, Math.min(Math.PI / 2,
+      this.elevation + (event.clientY - this.dragStart.y) * 0.01));
+    this.dragStart = { x: event.clientX, y: event.clientY };
+    this.drawTrajectory();
+  }
+
+  stopRotation() {
+    this.dragStart = null;
+  }
+
+  // Proyección ortográfica con cada eje normalizado a su rango (como los ejes de Matplotlib),
+  // rotada en azimut sobre la vertical e inclinada en elevación; color según el tiempo
+  private drawTrajectory() {
+    const canvas = this.canvas;
+    const trajectory = this.trajectory;
+    const context = canvas?.getContext('2d');
+    if (!canvas || !trajectory || !context) return;
+
+    const count = trajectory.timestamp.length;
+    const axes = [trajectory.longitude, trajectory.latitude, trajectory.altitude].map((column) => {
+      const [min, max] = d3.extent(column) as [number, number];
+      const half = (max - min) / 2 || 1;
+      return { center: min + half, half };
+    });
+    const [sinA, cosA] = [Math.sin(this.azimuth), Math.cos(this.azimuth)];
+    const [sinE, cosE] = [Math.sin(this.elevation), Math.cos(this.elevation)];
+
+    const xs = new Float64Array(count);
+    const ys = new Float64Array(count);
+    for (let i = 0; i < count; i++) {
+      const east = (trajectory.longitude[i] - axes[0].center) / axes[0].half;
+      const north = (trajectory.latitude[i] - axes[1].center) / axes[1].half;
+      const up = (trajectory.altitude[i] - axes[2].center) / axes[2].half;
+      const depth = east * sinA + north * cosA;
+      xs[i] = east * cosA - north * sinA;
+      ys[i] = up * cosE + depth * sinE;
+    }
+
+    // El cubo normalizado rotado cabe en un radio de sqrt(3)
+    const scale = Math.min(canvas.width, canvas.height) / (2 * Math.sqrt(3));
+    const toCanvas = (i: number): [number, number] =>
+      [canvas.width / 2 + xs[i] * scale, canvas.height / 2 - ys[i] * scale];
+
+    context.clearRect(0, 0, canvas.width, canvas.height);
+    context.lineWidth = 2;
+    for (let i = 1; i < count; i++) {
+      context.strokeStyle = d3.interpolateViridis(i / (count - 1));
+      context.beginPath();
+      context.moveTo(...toCanvas(i - 1));
+      context.lineTo(...toCanvas(i));
+      context.stroke();
+    }
+
+    // Punto inicial y final
+    for (const [index, color] of [[0, 'green'], [count - 1, 'red']] as [number, string][]) {
+      const [x, y] = toCanvas(index);
+      context.fillStyle = color;
+      context.strokeStyle = 'white';
+      context.beginPath();
+      context.arc(x, y, 7, 0, 2 * Math.PI);
+      context.fill();
+      context.stroke();
     }
   }
 
@@ -157,10 +292,12 @@ export class GpsMapComponent implements OnChanges {
 
   // Métodos de utilidad para las estadísticas
   getMaxAltitude(): number {
+    if (this.altitudeStats) return this.altitudeStats.max;
     return this.gpsData.length > 0 ? Math.max(...this.gpsData.map(d => d.altitude)) : 0;
   }
 
   getMinAltitude(): number {
+    if (this.altitudeStats) return this.altitudeStats.min;
     return this.gpsData.length > 0 ? Math.min(...this.gpsData.map(d => d.altitude)) : 0;
   }
 
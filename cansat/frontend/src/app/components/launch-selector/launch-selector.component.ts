@@ -1,7 +1,7 @@
 import { Component, Output, EventEmitter, OnInit } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { LaunchService } from '../../services/launch.service';
-import { Launch } from '../../models/launch.model';
+import { LaunchSummary, LaunchPage } from '../../models/launch.model';
 
 @Component({
   selector: 'app-launch-selector',
@@ -25,6 +25,15 @@ import { Launch } from '../../models/launch.model';
             Lanzamiento {{ launch.launch_id }} - {{ launch.start_date }}
           </option>
         </select>
+        <button
+          *ngIf="nextCursor"
+          type="button"
+          class="load-more"
+          (click)="loadLaunches()"
+          [disabled]="loading"
+        >
+          {{ loading ? 'Cargando...' : 'Cargar lanzamientos anteriores' }}
+        </button>
       </div>
     </div>
   `,
@@ -32,8 +41,11 @@ import { Launch } from '../../models/launch.model';
 })
 export class LaunchSelectorComponent implements OnInit {
   @Output() launchSelected = new EventEmitter<number | null>();
-  launches: Launch[] = [];
+  launches: LaunchSummary[] = [];
   selectedLaunchId: number | null = null;
+  // Cursor de la página siguiente de /launches; null cuando ya no hay más
+  nextCursor: string | null = null;
+  loading = false;
 
   constructor(private launchService: LaunchService) {}
 
@@ -41,14 +53,21 @@ export class LaunchSelectorComponent implements OnInit {
     this.loadLaunches();
   }
 
+  // Carga la primera página y, en cada llamada siguiente, la página anterior a la última cargada
   loadLaunches() {
-    this.launchService.getLaunches().subscribe({
-      next: (launches: Launch[]) => {
-        this.launches = launches;
+    if (this.loading) {
+      return;
+    }
+    this.loading = true;
+    this.launchService.getLaunchesPage(this.nextCursor ?? undefined).subscribe({
+      next: (page: LaunchPage) => {
+        this.launches = this.launches.concat(page.launches);
+        this.nextCursor = page.nextCursor;
+        this.loading = false;
       },
       error: (error: any) => {
         console.error('Error loading launches:', error);
-        this.launches = [];
+        this.loading = false;
       }
     });
   }
@@ -6,6 +6,23 @@ export interface Launch {
   variables: Variable[];
 }
 
+// Resumen devuelto por /launches (sin el array variables)
+export interface LaunchSummary {
+  launch_id: number;
+  start_date: string;
+  end_date: string;
+  point_count: number;
+  bounds?: {
+    [field: string]: { min?: number; max?: number };
+  };
+}
+
+// Una página de /launches; nextCursor (header X-Next-Cursor) es null en la última
+export interface LaunchPage {
+  launches: LaunchSummary[];
+  nextCursor: string | null;
+}
+
 export interface Variable {
   timestamp: number;
   temperature?: number;
@@ -15,6 +32,39 @@ export interface Variable {
   altitude?: number;
 }
 
+// Paquete recibido por /launch/<id>/live (Server-Sent Events)
+export interface LivePacket extends Variable {
+  launch_id: number;
+  action: string;
+  received_at: number;
+}
+
+// Trayectoria en columnas de /launch/<id>/trajectory (vistas sobre el mismo ArrayBuffer)
+export interface Trajectory {
+  timestamp: Float64Array;
+  latitude: Float32Array | Float64Array;
+  longitude: Float32Array | Float64Array;
+  altitude: Float32Array | Float64Array;
+}
+
+// /launch/<id>/stats: estadísticas por variable mantenidas por el subscriber
+export interface VariableStats {
+  count: number;
+  min: number;
+  max: number;
+  mean: number;
+  variance: number;
+  std: number;
+}
+
+export interface LaunchStatsSummary {
+  launch_id: number;
+  start_date: string;
+  end_date: string;
+  point_count: number;
+  stats: { [field: string]: VariableStats };
+}
+
 export interface ChartData {
   timestamp: number;
   value: number;
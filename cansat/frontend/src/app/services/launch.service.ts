@@ -1,7 +1,7 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpResponse } from '@angular/common/http';
 import { Observable, map } from 'rxjs';
-import { Launch, Variable, ChartData } from '../models/launch.model';
+import { Launch, LaunchSummary, LaunchPage, Variable, ChartData, LivePacket, Trajectory, LaunchStatsSummary } from '../models/launch.model';
 import { environment } from '../enviroments/enviroment';
 import { TimeService } from './time.service';
 
@@ -16,14 +16,36 @@ export class LaunchService {
     private timeService: TimeService
   ) {}
 
-  getLaunches(): Observable<Launch[]> {
-    return this.http.get<Launch[]>(`${this.apiUrl}/launches`);
+  // Una página de /launches (las más recientes primero); before es el X-Next-Cursor de la anterior
+  getLaunchesPage(before?: string): Observable<LaunchPage> {
+    return this.http.get<LaunchSummary[]>(`${this.apiUrl}/launches`, {
+      params: before ? { before } : {},
+      observe: 'response'
+    }).pipe(
+      map((response: HttpResponse<LaunchSummary[]>) => ({
+        launches: response.body ?? [],
+        nextCursor: response.headers.get('X-Next-Cursor')
+      }))
+    );
   }
 
   getLaunchById(id: number): Observable<Launch> {
     return this.http.get<Launch>(`${this.apiUrl}/launch/${id}`);
   }
 
+  // Paquetes en vivo desde Redis (SSE). EventSource reconecta solo; el evento 'dropped'
+  // indica cuántos paquetes descartó el servidor porque el cliente no los consumía a tiempo
+  streamLaunch(launchId: number): Observable<LivePacket> {
+    return new Observable<LivePacket>((subscriber) => {
+      const source = new EventSource(`${this.apiUrl}/launch/${launchId}/live`);
+      source.onmessage = (event: MessageEvent) => subscriber.next(JSON.parse(event.data));
+      source.addEventListener('dropped', (event: Event) => {
+        console.warn(`Live feed dropped ${(event as MessageEvent).data} packets`);
+      });
+      return () => source.close();
+    });
+  }
+
   // Método para obtener datos para gráficos
   getChartData(launch: Launch, type: string): ChartData[] {
     if (!launch || !launch.variables) {
@@ -86,13 +108,55 @@ export class LaunchService {
     return this.getChartData(launch, type);
   }
 
-  // Método para compatibilidad
-  getLaunchVariables(launchId: number, type: string): Observable<ChartData[]> {
-    return this.getLaunchById(launchId).pipe(
-      map((launch: Launch) => this.getChartData(launch, type))
+  // Serie de una variable filtrada en el servidor; maxPoints la reduce con LTTB (~1k puntos para gráficos)
+  getLaunchVariables(launchId: number, type: string, maxPoints?: number): Observable<ChartData[]> {
+    const params: { [param: string]: string } = { type };
+    if (maxPoints) {
+      params['max_points'] = String(maxPoints);
+    }
+
+    return this.http.get<ChartData[]>(`${this.apiUrl}/launch/${launchId}/variables`, { params }).pipe(
+      map((data: ChartData[]) => this.timeService.convertChartDataToRelative(
+        [...data].sort((a: ChartData, b: ChartData) => a.timestamp - b.timestamp)
+      ))
+    );
+  }
+
+  // Trayectoria binaria para dibujar en el cliente: header de 16 bytes (magic 'CTRJ', versión,
+  // bytes por coordenada, n) y columnas little-endian alineadas (ver api/trajectory_format.py)
+  getTrajectory(launchId: number, precision: 'f32' | 'f64' = 'f32', maxPoints?: number): Observable<Trajectory> {
+    const params: { [param: string]: string } = { precision };
+    if (maxPoints) {
+      params['max_points'] = String(maxPoints);
+    }
+
+    return this.http.get(`${this.apiUrl}/launch/${launchId}/trajectory`, { params, responseType: 'arraybuffer' }).pipe(
+      map((buffer: ArrayBuffer) => {
+        const header = new DataView(buffer, 0, 16);
+        const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+        if (magic !== 'CTRJ' || header.getUint8(4) !== 1) {
+          throw new Error(`Unsupported trajectory payload: ${magic} v${header.getUint8(4)}`);
+        }
+        const coordinateSize = header.getUint8(5);
+        const count = header.getUint32(8, true);
+        const Coordinates = coordinateSize === 4 ? Float32Array : Float64Array;
+        const start = 16 + 8 * count;
+
+        return {
+          timestamp: new Float64Array(buffer, 16, count),
+          latitude: new Coordinates(buffer, start, count),
+          longitude: new Coordinates(buffer, start + coordinateSize * count, count),
+          altitude: new Coordinates(buffer, start + 2 * coordinateSize * count, count)
+        };
+      })
     );
   }
 
+  // count/min/max/mean/variance por variable sin descargar los puntos
+  getLaunchStatsSummary(launchId: number): Observable<LaunchStatsSummary> {
+    return this.http.get<LaunchStatsSummary>(`${this.apiUrl}/launch/${launchId}/stats`);
+  }
+
   // Obtener información de duración del lanzamiento
   getLaunchDuration(launch: Launch): { duration: string, status: string, isInProgress: boolean } {
     if (!launch) {
@@ -124,27 +188,6 @@ export class LaunchService {
     return { duration, status, isInProgress };
   }
 
-  // Obtener estadísticas del lanzamiento
-  getLaunchStats(launch: Launch): any {
-    if (!launch || !launch.variables) {
-      return null;
-    }
-
-    const sortedVars = [...launch.variables].sort((a, b) => a.timestamp - b.timestamp);
-    const startTime = sortedVars[0]?.timestamp;
-    const endTime = sortedVars[sortedVars.length - 1]?.timestamp;
-    
-    return {
-      totalDataPoints: launch.variables.length,
-      startTimestamp: startTime || 0,
-      endTimestamp: endTime || 0,
-      dataPointsWithTemp: launch.variables.filter(v => v.temperature != null).length,
-      dataPointsWithHumidity: launch.variables.filter(v => v.humidity != null).length,
-      dataPointsWithGPS: launch.variables.filter(v => v.latitude != null && v.longitude != null).length,
-      duration: this.timeService.calculateDurationFromVariables(launch.variables)
-    };
-  }
-
   getGPSDataWithLocalTime(launch: Launch): any[] {
     if (!launch || !launch.variables) {
       return [];
@@ -1,5 +1,11 @@
 import serial
 import time
+import sys
+import os
+
+# xor_cipher.py está en lab2/, compartido por todos los ejercicios
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from xor_cipher import XOR_KEYS, xor_text
 
 puerto = "COM4"
 baudrate = 115200
@@ -7,13 +13,8 @@ llave_proteccion = "6969"
 ser = serial.Serial(port=puerto, baudrate=baudrate, timeout=2)
 
 # ========== CIFRADO XOR MEJORADO ==========
-XOR_KEYS = [0x2A, 0x4F, 0x31, 0x5C]  # *, O, 1, \ (MISMA CLAVE QUE ARDUINO)
-
 def cifrar_xor(texto):
-    resultado = ""
-    for i, char in enumerate(texto):
-        resultado += chr(ord(char) ^ XOR_KEYS[i % 4])
-    return resultado
+    return xor_text(texto, XOR_KEYS)
 
 def descifrar_xor(texto_cifrado):
     return cifrar_xor(texto_cifrado)  # XOR es simétrico
@@ -2,6 +2,11 @@ import serial
 import threading
 import time
 import sys
+import os
+
+# xor_cipher.py está en lab2/, compartido por todos los ejercicios
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from xor_cipher import XOR_KEYS, xor_text
 
 class LoraChatNodo:
     def __init__(self, puerto, id, baudrate=115200):
@@ -14,13 +19,10 @@ class LoraChatNodo:
         self.receive_thread = None
         
         # ========== CIFRADO XOR MEJORADO ==========
-        self.XOR_KEYS = [0x2A, 0x4F, 0x31, 0x5C]  # *, O, 1, \ (MISMA CLAVE QUE ARDUINO)
+        self.XOR_KEYS = XOR_KEYS  # *, O, 1, \ (MISMA CLAVE QUE ARDUINO)
         
     def cifrar_xor(self, texto):
-        resultado = ""
-        for i, char in enumerate(texto):
-            resultado += chr(ord(char) ^ self.XOR_KEYS[i % 4])
-        return resultado
+        return xor_text(texto, self.XOR_KEYS)
     
     def descifrar_xor(self, texto_cifrado):
         return self.cifrar_xor(texto_cifrado)